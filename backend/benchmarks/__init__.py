@@ -0,0 +1,5 @@
+"""
+MRIS Benchmarks
+Offline timing and memory benchmarks of the pipeline stages (benchmarks.run)
+and an HTTP load test of a running server (benchmarks.load).
+"""
@@ -0,0 +1,374 @@
+"""
+HTTP Load Test
+Replays a configurable mix of user traffic against a running MRIS server
+and reports throughput, latency percentiles, error rate and cache hit rate
+per endpoint.
+
+Each virtual user loops over weighted actions with a think time between
+them: analyses of a popularity-skewed index (Zipf), slider drags that
+nudge the threshold of the current view, custom date ranges, portfolio
+checks, index listings and live-stream subscriptions (timed to the first
+data event).
+
+Start the server with an offline price source so the numbers measure MRIS
+rather than the upstream provider, then run from backend/:
+
+    MRIS_PRICE_SOURCE=synthetic uvicorn main:app --workers 2
+    python -m benchmarks.load --users 50 --duration 60
+    python -m benchmarks.load --mix analyze=50,slider=30,stream=20 --skew 1.5
+
+Requires httpx (requirements-dev.txt).
+"""
+
+import sys
+import json
+import math
+import time
+import random
+import asyncio
+import logging
+import argparse
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Optional
+
+import httpx
+
+from config import INDICES, VALID_PERIODS
+
+logger = logging.getLogger("benchmarks.load")
+
+DEFAULT_MIX = "analyze=40,slider=25,custom_range=10,portfolio=10,indices=10,stream=5"
+THRESHOLD_RANGE = (0.3, 0.9)
+DATA_EVENTS = ("update", "snapshot")
+
+
+# ── Statistics ──────────────────────────────────────────────────────
+
+@dataclass
+class EndpointStats:
+    """Outcomes of one endpoint's requests."""
+    latencies: list = field(default_factory=list)
+    errors: Counter = field(default_factory=Counter)
+    cache: Counter = field(default_factory=Counter)
+
+    def record(self, seconds: float, error: Optional[str] = None, cache_status: Optional[str] = None):
+        self.latencies.append(seconds)
+        if error:
+            self.errors[error] += 1
+        if cache_status:
+            self.cache[cache_status] += 1
+
+    def summary(self, elapsed: float) -> dict:
+        requests = len(self.latencies)
+        errors = sum(self.errors.values())
+        looked_up = sum(self.cache.values())
+        ordered = sorted(self.latencies)
+        return {
+            "requests": requests,
+            "throughput_rps": round(requests / elapsed, 2) if elapsed else 0.0,
+            "error_rate": round(errors / requests, 4) if requests else 0.0,
+            "errors": dict(self.errors),
+            "p50_ms": _percentile(ordered, 50),
+            "p95_ms": _percentile(ordered, 95),
+            "p99_ms": _percentile(ordered, 99),
+            "max_ms": round(ordered[-1] * 1000, 1) if ordered else None,
+            "cache": dict(self.cache),
+            # STALE is served from cache too (revalidated in the background)
+            "cache_hit_rate": (
+                round((self.cache["HIT"] + self.cache["STALE"]) / looked_up, 4) if looked_up else None
+            ),
+        }
+
+
+def _percentile(ordered: list[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile of sorted seconds, in milliseconds."""
+    if not ordered:
+        return None
+    rank = max(0, math.ceil(pct / 100 * len(ordered)) - 1)
+    return round(ordered[rank] * 1000, 1)
+
+
+# ── Traffic Model ───────────────────────────────────────────────────
+
+@dataclass
+class Scenario:
+    """Traffic mix and shape shared by all virtual users."""
+    weights: dict[str, float]
+    indices: list[str]
+    skew: float
+    slider_step: float
+    think: float
+    stream_events: int
+    timeout: float
+
+
+def parse_mix(text: str) -> dict[str, float]:
+    """'analyze=40,slider=25' → {action: weight}; unknown actions are rejected."""
+    weights = {}
+    for part in text.split(","):
+        if not part.strip():
+            continue
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ACTIONS:
+            raise argparse.ArgumentTypeError(f"unknown action '{name}' (choose from {', '.join(ACTIONS)})")
+        weights[name] = float(weight or 1)
+    if not weights or sum(weights.values()) <= 0:
+        raise argparse.ArgumentTypeError("mix needs at least one positive weight")
+    return weights
+
+
+class VirtualUser:
+    """
+    One simulated client. Keeps a current view (index, time range,
+    threshold) so slider actions change only the threshold of what the
+    user is already looking at, the way the frontend does.
+    """
+
+    def __init__(self, scenario: Scenario, client: httpx.AsyncClient, stats, rng: random.Random):
+        self.scenario = scenario
+        self.client = client
+        self.stats = stats
+        self.rng = rng
+        # Zipf popularity: the r-th index is requested ∝ 1 / r^skew
+        self._index_weights = [1 / (rank + 1) ** scenario.skew for rank in range(len(scenario.indices))]
+        self._actions = list(scenario.weights)
+        self._action_weights = list(scenario.weights.values())
+        self.view = self._new_view()
+
+    async def run(self, deadline: float):
+        while time.monotonic() < deadline:
+            action = self.rng.choices(self._actions, self._action_weights)[0]
+            await ACTIONS[action](self)
+            if self.scenario.think:
+                await asyncio.sleep(self.rng.expovariate(1 / self.scenario.think))
+
+    # ── View ────────────────────────────────────────────────────────
+
+    def _pick_index(self) -> str:
+        return self.rng.choices(self.scenario.indices, self._index_weights)[0]
+
+    def _new_view(self, custom_range: bool = False) -> dict:
+        view = {"index": self._pick_index(), "threshold": round(self.rng.uniform(*THRESHOLD_RANGE) * 20) / 20}
+        if custom_range:
+            end = date.today() - timedelta(days=self.rng.randint(0, 60))
+            start = end - timedelta(days=self.rng.randint(30, 540))
+            view.update(start_date=start.isoformat(), end_date=end.isoformat())
+        else:
+            view["period"] = self.rng.choice(VALID_PERIODS)
+        return view
+
+    # ── Actions ─────────────────────────────────────────────────────
+
+    async def analyze(self):
+        self.view = self._new_view()
+        await self._post_analyze()
+
+    async def custom_range(self):
+        self.view = self._new_view(custom_range=True)
+        await self._post_analyze()
+
+    async def slider(self):
+        """Drag the threshold slider: a few quick steps in one direction."""
+        direction = self.rng.choice((-1, 1))
+        for _ in range(self.rng.randint(1, 4)):
+            threshold = round(self.view["threshold"] + direction * self.scenario.slider_step, 2)
+            if not THRESHOLD_RANGE[0] <= threshold <= THRESHOLD_RANGE[1]:
+                break
+            self.view["threshold"] = threshold
+            await self._post_analyze()
+
+    async def portfolio(self):
+        tickers = INDICES.get(self._pick_index()) or []
+        if len(tickers) < 2:
+            return
+        body = {
+            "tickers": self.rng.sample(tickers, self.rng.randint(2, min(8, len(tickers)))),
+            "period": self.rng.choice(VALID_PERIODS),
+        }
+        await self._request("portfolio/check", "POST", "/api/portfolio/check", json=body)
+
+    async def indices(self):
+        await self._request("indices", "GET", "/api/indices")
+
+    async def stream(self):
+        """Subscribe to a live view; latency is the time to its first data event."""
+        params = {"index": self._pick_index(), "threshold": self.view["threshold"]}
+        params["period"] = self.rng.choice(VALID_PERIODS)
+        start = time.perf_counter()
+        first, error, received = None, None, 0
+        try:
+            async with self.client.stream(
+                "GET", "/api/live/stream", params=params,
+                headers={"Accept": "text/event-stream"}, timeout=self.scenario.timeout,
+            ) as response:
+                if response.status_code >= 400:
+                    error = f"HTTP {response.status_code}"
+                else:
+                    async for line in response.aiter_lines():
+                        if line.startswith("event:") and line[6:].strip() in DATA_EVENTS:
+                            first = first or time.perf_counter() - start
+                            received += 1
+                            if received >= self.scenario.stream_events:
+                                break
+        except httpx.HTTPError as e:
+            error = type(e).__name__
+        self.stats["live/stream"].record(first if first is not None else time.perf_counter() - start, error)
+
+    async def _post_analyze(self):
+        await self._request("analyze", "POST", "/api/analyze", json=self.view)
+
+    async def _request(self, endpoint: str, method: str, path: str, **kwargs):
+        start = time.perf_counter()
+        error, cache_status = None, None
+        try:
+            response = await self.client.request(method, path, **kwargs)
+            cache_status = response.headers.get("x-cache")
+            if response.status_code >= 400:
+                error = f"HTTP {response.status_code}"
+        except httpx.HTTPError as e:
+            error = type(e).__name__
+        self.stats[endpoint].record(time.perf_counter() - start, error, cache_status)
+
+
+ACTIONS = {
+    "analyze": VirtualUser.analyze,
+    "slider": VirtualUser.slider,
+    "custom_range": VirtualUser.custom_range,
+    "portfolio": VirtualUser.portfolio,
+    "indices": VirtualUser.indices,
+    "stream": VirtualUser.stream,
+}
+
+
+# ── Runner ──────────────────────────────────────────────────────────
+
+async def wait_ready(client: httpx.AsyncClient, timeout: float):
+    """Block until the server has finished warming up (/health/startup)."""
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            response = await client.get("/health/startup")
+            if response.status_code == 200 and response.json().get("ready"):
+                return
+        except httpx.HTTPError:
+            pass
+        if time.monotonic() > deadline:
+            raise RuntimeError(f"Server at {client.base_url} not ready after {timeout:.0f}s")
+        await asyncio.sleep(0.5)
+
+
+async def run_load(
+    url: str, scenario: Scenario, users: int, duration: float, ramp_up: float, seed: int
+) -> dict:
+    """
+    Drive the server with users virtual users for duration seconds.
+
+    Returns:
+        Report with per-endpoint summaries and the run's settings
+    """
+    stats: dict[str, EndpointStats] = defaultdict(EndpointStats)
+    limits = httpx.Limits(max_connections=users * 2, max_keepalive_connections=users)
+    async with httpx.AsyncClient(base_url=url, timeout=scenario.timeout, limits=limits) as client:
+        await wait_ready(client, scenario.timeout)
+        served = (await client.get("/api/indices")).json()["indices"]
+        available = {entry["name"] for entry in served}
+        scenario.indices = [name for name in scenario.indices if name in available] or sorted(available)
+
+        start = time.monotonic()
+        deadline = start + duration
+
+        async def user(i: int):
+            await asyncio.sleep(ramp_up * i / users)
+            await VirtualUser(scenario, client, stats, random.Random(seed + i)).run(deadline)
+
+        await asyncio.gather(*(user(i) for i in range(users)))
+        elapsed = time.monotonic() - start
+
+    endpoints = {name: stats[name].summary(elapsed) for name in sorted(stats)}
+    requests = sum(s["requests"] for s in endpoints.values())
+    return {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "url": url,
+            "users": users,
+            "duration": round(elapsed, 2),
+            "mix": scenario.weights,
+            "skew": scenario.skew,
+            "indices": scenario.indices,
+            "seed": seed,
+        },
+        "total": {
+            "requests": requests,
+            "throughput_rps": round(requests / elapsed, 2) if elapsed else 0.0,
+            "errors": sum(sum(stats[name].errors.values()) for name in endpoints),
+        },
+        "endpoints": endpoints,
+    }
+
+
+def print_report(report: dict):
+    meta, total = report["meta"], report["total"]
+    print(
+        f"\n{total['requests']} requests from {meta['users']} users in {meta['duration']}s "
+        f"({total['throughput_rps']} req/s, {total['errors']} errors)\n"
+    )
+    print(f"{'endpoint':<18}{'reqs':>7}{'req/s':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>9}{'cache hit':>11}")
+    for name, s in report["endpoints"].items():
+        hit = f"{s['cache_hit_rate']:.1%}" if s["cache_hit_rate"] is not None else "-"
+        print(
+            f"{name:<18}{s['requests']:>7}{s['throughput_rps']:>9}{s['p50_ms'] or '-':>10}"
+            f"{s['p95_ms'] or '-':>10}{s['p99_ms'] or '-':>10}{s['error_rate']:>9.1%}{hit:>11}"
+        )
+
+
+# ── CLI ─────────────────────────────────────────────────────────────
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Load-test a running MRIS server with a realistic traffic mix.")
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="server base URL")
+    parser.add_argument("--users", type=int, default=20, help="concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=30.0, help="test length in seconds")
+    parser.add_argument("--ramp-up", type=float, default=5.0, help="seconds over which users start")
+    parser.add_argument("--think", type=float, default=0.5, help="mean think time between actions (seconds)")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX),
+                        help=f"action weights (default {DEFAULT_MIX})")
+    parser.add_argument("--indices", default=",".join(INDICES),
+                        help="comma-separated indices, most popular first")
+    parser.add_argument("--skew", type=float, default=1.2, help="Zipf exponent of index popularity (0 = uniform)")
+    parser.add_argument("--slider-step", type=float, default=0.05, help="threshold change per slider step")
+    parser.add_argument("--stream-events", type=int, default=1, help="data events to read per live subscription")
+    parser.add_argument("--timeout", type=float, default=120.0, help="per-request timeout (seconds)")
+    parser.add_argument("--seed", type=int, default=1, help="random seed of the traffic")
+    parser.add_argument("--output", help="write the JSON report here")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING, format="%(message)s")
+
+    scenario = Scenario(
+        weights=args.mix,
+        indices=[name for name in args.indices.split(",") if name],
+        skew=args.skew,
+        slider_step=args.slider_step,
+        think=args.think,
+        stream_events=args.stream_events,
+        timeout=args.timeout,
+    )
+    try:
+        report = asyncio.run(run_load(args.url, scenario, args.users, args.duration, args.ramp_up, args.seed))
+    except (RuntimeError, httpx.HTTPError) as e:
+        logger.error(f"Load test failed: {e}")
+        return 2
+
+    print_report(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReport written to {args.output}")
+    return 1 if report["total"]["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,280 @@
+"""
+Pipeline Benchmarks
+Times every pipeline stage and the full run_analysis_pipeline on seeded
+synthetic prices across universe sizes, history lengths and thresholds,
+and compares the results with a stored baseline.
+
+Runs offline (synthetic price source, no price store, no worker pool).
+From backend/:
+
+    python -m benchmarks.run                          # full sweep, compare with baseline
+    python -m benchmarks.run --sizes 30,100 --repeat 5
+    python -m benchmarks.run --save-baseline          # record this machine's baseline
+
+Exits with status 1 when a stage is slower (or uses more memory) than the
+baseline by more than the tolerance.
+"""
+
+import os
+
+# Offline, in-process and uncached before any MRIS module reads its config
+os.environ["MRIS_PRICE_SOURCE"] = "synthetic"
+os.environ["MRIS_PRICE_STORE"] = "0"
+os.environ["MRIS_PIPELINE_WORKERS"] = "0"
+os.environ["MRIS_CACHE_BACKEND"] = "memory"
+
+import sys
+import json
+import time
+import logging
+import argparse
+import platform
+import statistics
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import Any, Callable, Optional
+
+import numpy as np
+import pandas as pd
+
+from config import INDICES, SECTORS, LARGE_UNIVERSE_MIN_TICKERS, SYNTHETIC_SEED
+from models import AnalysisRequest
+from services import price_sources
+from services.price_sources import SyntheticSource
+from services.preprocessor import compute_log_returns, clean_data, standardize_returns
+from services.correlation_engine import (
+    compute_correlation_matrix, apply_threshold, threshold_correlation_blocked,
+)
+from services.graph_builder import build_graph, compute_centrality
+from services.clustering import detect_communities
+from services.sector_analyzer import compute_sector_heatmap
+from routes.analysis import run_analysis_pipeline
+
+logger = logging.getLogger("benchmarks")
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+DEFAULT_OUTPUT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results.json")
+
+END_DATE = pd.Timestamp("2024-12-31")  # fixed, so runs on different days see the same data
+NOISE_FLOOR = 0.002  # seconds; smaller slowdowns are never reported as regressions
+
+
+# ── Data ────────────────────────────────────────────────────────────
+
+def universe(size: int) -> list[str]:
+    """Real tickers (with their sectors) first, then synthetic names."""
+    known = list(SECTORS)[:size]
+    return known + [f"SYN{i:05d}" for i in range(size - len(known))]
+
+
+def synthetic_prices(source: SyntheticSource, tickers: list[str], days: int) -> pd.DataFrame:
+    """days + 1 closes (days returns) ending at END_DATE."""
+    calendar = pd.bdate_range(end=END_DATE, periods=days + 1)
+    return source.download(
+        tickers,
+        start=calendar[0].date().isoformat(),
+        end=(END_DATE + timedelta(days=1)).date().isoformat(),
+    )
+
+
+# ── Measurement ─────────────────────────────────────────────────────
+
+def measure(func: Callable[[], Any], repeat: int, memory: bool) -> tuple[dict, Any]:
+    """
+    Median/min wall time over repeat runs, then (optionally) the peak
+    traced allocation of one more run under tracemalloc.
+    """
+    times, result = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+
+    stats = {"seconds": statistics.median(times), "min_seconds": min(times)}
+    if memory:
+        tracemalloc.start()
+        try:
+            func()
+            stats["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return stats, result
+
+
+def run_case(
+    source: SyntheticSource, size: int, days: int, thresholds: list[float], repeat: int, memory: bool
+) -> list[dict]:
+    """All stage benchmarks for one (universe size, history length)."""
+    tickers = universe(size)
+    prices = synthetic_prices(source, tickers, days)
+    results = []
+
+    def record(stage: str, func: Callable[[], Any], threshold: Optional[float] = None):
+        stats, result = measure(func, repeat, memory)
+        results.append({"stage": stage, "size": size, "days": days, "threshold": threshold, **stats})
+        logger.info(
+            f"{stage:<16} n={size:<5} days={days:<4} threshold={threshold if threshold is not None else '-':<4} "
+            f"{stats['seconds'] * 1000:9.1f} ms"
+            + (f"  peak {stats['peak_bytes'] / 1e6:8.1f} MB" if "peak_bytes" in stats else "")
+        )
+        return result
+
+    returns = record("preprocess", lambda: clean_data(compute_log_returns(prices)))
+    large = returns.shape[1] > LARGE_UNIVERSE_MIN_TICKERS
+
+    if large:
+        standardized = record("correlation", lambda: standardize_returns(returns))
+        corr_matrix = None
+    else:
+        corr_matrix = record("correlation", lambda: compute_correlation_matrix(returns))
+
+    dense = corr_matrix
+    if dense is None:
+        values = np.clip(standardized @ standardized.T, -1.0, 1.0).astype(float)
+        np.fill_diagonal(values, 1.0)
+        dense = pd.DataFrame(values, index=returns.columns, columns=returns.columns)
+    sector_map = {t: source.sector(t) for t in returns.columns}
+    record("sector_heatmap", lambda: compute_sector_heatmap(dense, sector_map))
+    del dense
+
+    name = f"benchmark-{size}"
+    INDICES[name] = tickers
+    calendar = pd.bdate_range(end=END_DATE, periods=days + 1)
+
+    for threshold in thresholds:
+        if large:
+            adjacency = record(
+                "threshold",
+                lambda: threshold_correlation_blocked(standardized, returns.columns.tolist(), threshold),
+                threshold,
+            )
+        else:
+            adjacency = record("threshold", lambda: apply_threshold(corr_matrix, threshold), threshold)
+
+        G = record("build_graph", lambda: build_graph(adjacency), threshold)
+        record("centrality", lambda: compute_centrality(G, mode="auto"), threshold)
+        record("clustering", lambda: detect_communities(G), threshold)
+
+        request = AnalysisRequest(
+            index=name,
+            start_date=calendar[0].date().isoformat(),
+            end_date=(END_DATE + timedelta(days=1)).date().isoformat(),
+            threshold=threshold,
+        )
+        record("pipeline", lambda: run_analysis_pipeline(request, cached=False), threshold)
+
+    INDICES.pop(name, None)
+    return results
+
+
+# ── Baseline ────────────────────────────────────────────────────────
+
+def _key(result: dict) -> tuple:
+    return result["stage"], result["size"], result["days"], result["threshold"]
+
+
+def compare(results: list[dict], baseline: list[dict], tolerance: float) -> list[dict]:
+    """
+    Cases whose median time (or peak memory) exceeds the baseline by more
+    than tolerance (a fraction, e.g. 0.25 = 25%).
+    """
+    reference = {_key(r): r for r in baseline}
+    regressions = []
+    for result in results:
+        base = reference.get(_key(result))
+        if base is None:
+            continue
+        slower = (
+            result["seconds"] > base["seconds"] * (1 + tolerance)
+            and result["seconds"] - base["seconds"] > NOISE_FLOOR
+        )
+        heavier = (
+            "peak_bytes" in result and "peak_bytes" in base
+            and result["peak_bytes"] > base["peak_bytes"] * (1 + tolerance)
+        )
+        if slower or heavier:
+            regressions.append({
+                **result,
+                "baseline_seconds": base["seconds"],
+                "baseline_peak_bytes": base.get("peak_bytes"),
+            })
+    return regressions
+
+
+# ── CLI ─────────────────────────────────────────────────────────────
+
+def _numbers(kind):
+    return lambda text: [kind(v) for v in text.split(",") if v]
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark MRIS pipeline stages on synthetic data.")
+    parser.add_argument("--sizes", type=_numbers(int), default=[30, 100, 500, 2000], help="universe sizes")
+    parser.add_argument("--days", type=_numbers(int), default=[63, 252], help="history lengths (trading days)")
+    parser.add_argument("--thresholds", type=_numbers(float), default=[0.5, 0.7], help="correlation thresholds")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per case (median reported)")
+    parser.add_argument("--seed", type=int, default=SYNTHETIC_SEED, help="synthetic price seed")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc peak-memory run")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="results JSON path")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline JSON path")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown vs baseline (0.25 = 25%%)")
+    parser.add_argument("--save-baseline", action="store_true", help="write the results as the new baseline")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING, format="%(message)s")
+    logger.setLevel(logging.INFO)
+
+    # The pipeline rows fetch through the process-wide source: make it this one,
+    # so every row is measured on the same prices
+    source = SyntheticSource(seed=args.seed)
+    with price_sources._source_lock:
+        price_sources._source = source
+    results = []
+    for size in args.sizes:
+        for days in args.days:
+            results += run_case(source, size, days, args.thresholds, args.repeat, not args.no_memory)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "seed": args.seed,
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    logger.info(f"Results written to {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        logger.info(f"Baseline written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        logger.info("No baseline found; run with --save-baseline to record one")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)["results"]
+    regressions = compare(results, baseline, args.tolerance)
+    for r in regressions:
+        logger.warning(
+            f"REGRESSION {r['stage']} n={r['size']} days={r['days']} threshold={r['threshold']}: "
+            f"{r['seconds'] * 1000:.1f} ms vs {r['baseline_seconds'] * 1000:.1f} ms"
+            + (
+                f", peak {r['peak_bytes'] / 1e6:.1f} MB vs {r['baseline_peak_bytes'] / 1e6:.1f} MB"
+                if r.get("peak_bytes") and r.get("baseline_peak_bytes") else ""
+            )
+        )
+    logger.info(f"{len(regressions)} regression(s) against {args.baseline} (tolerance {args.tolerance:.0%})")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,6 +3,8 @@ MRIS Backend Configuration
 Stock index definitions, default parameters, and cache settings.
 """
 
+import os
+
 # ── Index Definitions ───────────────────────────────────────────────
 # Each index maps to a list of Yahoo Finance tickers
 
@@ -51,11 +53,114 @@ INDICES = {
     ],
 }
 
+# ── Large Universes ─────────────────────────────────────────────────
+# Extra universes (e.g. S&P 500, Russell 1000, NSE 500) are loaded from
+# text/CSV files, one Yahoo ticker per line (first CSV column; '#' lines
+# and a symbol/ticker header are skipped). The index name is the file
+# stem with underscores as spaces, or a leading "# name: ..." line.
+
+UNIVERSE_DIR = os.environ.get(
+    "MRIS_UNIVERSE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "universes")
+)
+
+
+def _load_universes(directory: str) -> dict:
+    universes = {}
+    if not os.path.isdir(directory):
+        return universes
+    for filename in sorted(os.listdir(directory)):
+        stem, ext = os.path.splitext(filename)
+        if ext.lower() not in (".txt", ".csv"):
+            continue
+        name, tickers = stem.replace("_", " "), []
+        with open(os.path.join(directory, filename), encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line.lower().startswith("# name:"):
+                    name = line[7:].strip()
+                    continue
+                symbol = line.split(",")[0].strip().strip('"').upper()
+                if symbol and not symbol.startswith("#") and symbol not in ("SYMBOL", "TICKER"):
+                    tickers.append(symbol)
+        if tickers:
+            universes[name] = list(dict.fromkeys(tickers))
+    return universes
+
+
+INDICES.update(_load_universes(UNIVERSE_DIR))
+
+# ── Sector Classification ───────────────────────────────────────────
+# Ticker → sector, used for the sector heatmap. Unlisted tickers map to "Other".
+
+SECTORS = {
+    # NIFTY 50
+    "RELIANCE.NS": "Energy", "TCS.NS": "IT", "HDFCBANK.NS": "Banking", "INFY.NS": "IT",
+    "ICICIBANK.NS": "Banking", "HINDUNILVR.NS": "FMCG", "ITC.NS": "FMCG", "SBIN.NS": "Banking",
+    "BHARTIARTL.NS": "Telecom", "KOTAKBANK.NS": "Banking", "LT.NS": "Industrials",
+    "AXISBANK.NS": "Banking", "ASIANPAINT.NS": "Consumer", "MARUTI.NS": "Automobile",
+    "HCLTECH.NS": "IT", "SUNPHARMA.NS": "Pharma", "TITAN.NS": "Consumer",
+    "BAJFINANCE.NS": "Financial Services", "WIPRO.NS": "IT", "ULTRACEMCO.NS": "Materials",
+    "NESTLEIND.NS": "FMCG", "NTPC.NS": "Utilities", "POWERGRID.NS": "Utilities",
+    "M&M.NS": "Automobile", "TATAMOTORS.NS": "Automobile", "ADANIENT.NS": "Industrials",
+    "ADANIPORTS.NS": "Industrials", "ONGC.NS": "Energy", "JSWSTEEL.NS": "Metals & Mining",
+    "TATASTEEL.NS": "Metals & Mining", "TECHM.NS": "IT", "INDUSINDBK.NS": "Banking",
+    "HINDALCO.NS": "Metals & Mining", "DRREDDY.NS": "Pharma", "DIVISLAB.NS": "Pharma",
+    "CIPLA.NS": "Pharma", "BAJAJFINSV.NS": "Financial Services", "BRITANNIA.NS": "FMCG",
+    "EICHERMOT.NS": "Automobile", "APOLLOHOSP.NS": "Healthcare",
+    "COALINDIA.NS": "Metals & Mining", "BPCL.NS": "Energy", "GRASIM.NS": "Materials",
+    "TATACONSUM.NS": "FMCG", "HEROMOTOCO.NS": "Automobile", "SBILIFE.NS": "Financial Services",
+    "HDFCLIFE.NS": "Financial Services", "UPL.NS": "Materials", "BAJAJ-AUTO.NS": "Automobile",
+    "LTIM.NS": "IT",
+    # S&P 500 (Top 50)
+    "AAPL": "IT", "MSFT": "IT", "AMZN": "Consumer", "NVDA": "IT", "GOOGL": "Media & Internet",
+    "META": "Media & Internet", "TSLA": "Automobile", "BRK-B": "Financial Services",
+    "UNH": "Healthcare", "JNJ": "Pharma", "XOM": "Energy", "JPM": "Banking",
+    "V": "Financial Services", "PG": "FMCG", "MA": "Financial Services", "HD": "Consumer",
+    "CVX": "Energy", "MRK": "Pharma", "ABBV": "Pharma", "LLY": "Pharma", "PEP": "FMCG",
+    "KO": "FMCG", "AVGO": "IT", "COST": "Consumer", "WMT": "Consumer", "TMO": "Healthcare",
+    "MCD": "Consumer", "CSCO": "IT", "ACN": "IT", "ABT": "Healthcare", "CRM": "IT",
+    "DHR": "Healthcare", "LIN": "Materials", "NEE": "Utilities", "TXN": "IT", "AMD": "IT",
+    "PM": "FMCG", "UPS": "Industrials", "MS": "Financial Services", "ORCL": "IT",
+    "LOW": "Consumer", "INTC": "IT", "HON": "Industrials", "UNP": "Industrials", "QCOM": "IT",
+    "BA": "Industrials", "AMGN": "Pharma", "SBUX": "Consumer", "IBM": "IT", "GE": "Industrials",
+    # FTSE 100 (Top 30)
+    "SHEL.L": "Energy", "AZN.L": "Pharma", "HSBA.L": "Banking", "ULVR.L": "FMCG",
+    "BP.L": "Energy", "GSK.L": "Pharma", "RIO.L": "Metals & Mining", "BATS.L": "FMCG",
+    "DGE.L": "FMCG", "REL.L": "Media & Internet", "LSEG.L": "Financial Services",
+    "AAL.L": "Metals & Mining", "NG.L": "Utilities", "VOD.L": "Telecom",
+    "GLEN.L": "Metals & Mining", "CPG.L": "Consumer", "PRU.L": "Financial Services",
+    "ABF.L": "FMCG", "RKT.L": "FMCG", "CRH.L": "Materials", "EXPN.L": "Industrials",
+    "SSE.L": "Utilities", "AHT.L": "Industrials", "SGE.L": "IT", "BKG.L": "Real Estate",
+    "MNDI.L": "Materials", "BNZL.L": "Industrials", "SVT.L": "Utilities",
+    "HLMA.L": "Industrials", "INF.L": "Media & Internet",
+    # DAX 40 (Top 30)
+    "SAP.DE": "IT", "SIE.DE": "Industrials", "ALV.DE": "Financial Services",
+    "DTE.DE": "Telecom", "AIR.DE": "Industrials", "BAS.DE": "Materials", "MBG.DE": "Automobile",
+    "BMW.DE": "Automobile", "MUV2.DE": "Financial Services", "IFX.DE": "IT",
+    "ADS.DE": "Consumer", "DHL.DE": "Industrials", "BAYN.DE": "Pharma", "VOW3.DE": "Automobile",
+    "HEN3.DE": "FMCG", "DB1.DE": "Financial Services", "RWE.DE": "Utilities",
+    "FRE.DE": "Healthcare", "BEI.DE": "FMCG", "HEI.DE": "Materials", "MTX.DE": "Industrials",
+    "MRK.DE": "Pharma", "SHL.DE": "Healthcare", "PAH3.DE": "Automobile",
+    "ENR.DE": "Industrials", "CON.DE": "Automobile", "SRT3.DE": "Healthcare",
+    "QIA.DE": "Healthcare", "ZAL.DE": "Consumer", "PUM.DE": "Consumer",
+    # Hang Seng (Top 30)
+    "0005.HK": "Banking", "0700.HK": "Media & Internet", "9988.HK": "Media & Internet",
+    "0941.HK": "Telecom", "1299.HK": "Financial Services", "0388.HK": "Financial Services",
+    "0002.HK": "Utilities", "0003.HK": "Utilities", "0011.HK": "Banking",
+    "0016.HK": "Real Estate", "0001.HK": "Industrials", "0066.HK": "Industrials",
+    "0006.HK": "Utilities", "0012.HK": "Real Estate", "0017.HK": "Real Estate",
+    "0027.HK": "Consumer", "0883.HK": "Energy", "1038.HK": "Utilities", "1044.HK": "FMCG",
+    "1093.HK": "Pharma", "1109.HK": "Real Estate", "1177.HK": "Pharma", "1398.HK": "Banking",
+    "1928.HK": "Consumer", "2007.HK": "Real Estate", "2018.HK": "IT", "2269.HK": "Pharma",
+    "2313.HK": "Consumer", "2318.HK": "Financial Services", "2388.HK": "Banking",
+}
+
 # ── Default Parameters ──────────────────────────────────────────────
 
 DEFAULT_THRESHOLD = 0.6
 DEFAULT_PERIOD = "3mo"
 VALID_PERIODS = ["1mo", "3mo", "6mo", "1y"]
+TIMESERIES_MAX_WINDOWS = 500  # cap on windows per /analyze/timeseries request
 
 # ── Influence Score Weights ─────────────────────────────────────────
 
@@ -65,8 +170,100 @@ INFLUENCE_WEIGHTS = {
     "closeness": 0.3,
 }
 
+# ── Centrality Settings ─────────────────────────────────────────────
+
+CENTRALITY_MODES = ("auto", "exact", "approximate")
+CENTRALITY_EXACT_MAX_NODES = 300  # auto mode switches to sampled betweenness above this
+CENTRALITY_SAMPLES = 100  # pivot nodes for approximate betweenness
+CENTRALITY_SEED = 42
+
+# ── Rolling Correlation Settings ────────────────────────────────────
+
+ROLLING_RESYNC_EVERY = 250  # incremental updates between exact recomputations
+ROLLING_MAX_ENGINES = 20  # (universe, window) engines kept in memory
+
+# ── Portfolio Settings ──────────────────────────────────────────────
+
+PORTFOLIO_BATCH_MAX = 10000  # portfolios per /portfolio/batch request
+PORTFOLIO_BATCH_MAX_TICKERS = 500  # distinct tickers across one batch
+PORTFOLIO_BATCH_CHUNK = 500  # portfolios scored per streamed chunk
+
+# ── Large-Universe Settings ─────────────────────────────────────────
+
+LARGE_UNIVERSE_MIN_TICKERS = 300  # above this, correlations are thresholded blockwise, never dense
+CORRELATION_BLOCK_SIZE = 512  # tickers per side of one correlation tile
+FETCH_CHUNK_SIZE = 100  # tickers per yfinance download call
+FETCH_CONCURRENCY = 4  # chunk downloads in flight at once
+FETCH_RETRIES = 2  # extra attempts per failed chunk
+FETCH_RETRY_BACKOFF = 1.0  # seconds, doubled after each failed attempt
+
 # ── Cache Settings ──────────────────────────────────────────────────
 
 CACHE_TTL_SECONDS = 600  # 10 minutes
 CACHE_MAX_SIZE = 50
+DATA_CACHE_MAX_SIZE = 20  # threshold-independent returns + correlation entries
+
+# Cache backend shared by the response and market-data caches:
+# memory (per-process LRU), redis (shared across hosts) or sqlite (shared
+# by the worker processes of one host)
+CACHE_BACKEND = os.environ.get("MRIS_CACHE_BACKEND", "memory")
+CACHE_REDIS_URL = os.environ.get("MRIS_REDIS_URL", "redis://localhost:6379/0")
+CACHE_SQLITE_PATH = os.environ.get(
+    "MRIS_CACHE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "mris.sqlite3")
+)
+
+# Stale-while-revalidate and refresh scheduling for the response cache
+CACHE_STALE_SECONDS = 1800  # expired entries are still served (while recomputed) this long
+CACHE_REFRESH_AHEAD = 60  # popular entries are recomputed this many seconds before expiry
+CACHE_REFRESH_TOP_N = 10  # most requested keys kept warm by the scheduler
+CACHE_REFRESH_INTERVAL = 30  # seconds between scheduler passes
+CACHE_POPULARITY_HALFLIFE = 1800  # seconds for a request's popularity weight to halve
+CACHE_PREWARM = os.environ.get("MRIS_CACHE_PREWARM", "1") != "0"  # INDICES × VALID_PERIODS at startup
+
+COMPRESS_MIN_BYTES = 1024  # cached bodies smaller than this are not compressed
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+
+# ── Live Stream Settings ────────────────────────────────────────────
+
+LIVE_REFRESH_INTERVAL = 60  # seconds between pipeline refreshes per live topic
+LIVE_HEARTBEAT_INTERVAL = 15  # seconds between SSE ping events
+LIVE_QUEUE_MAX_SIZE = 16  # pending events per client before it is resynced/dropped as too slow
+LIVE_DELTA_TOLERANCE = 1e-3  # smallest weight/metric change reported in delta patches
+
+# ── Price Source Settings ───────────────────────────────────────────
+
+# Where prices come from: yfinance (network), local (one CSV/Parquet file per
+# ticker in PRICE_SOURCE_DIR) or synthetic (seeded factor model, offline)
+PRICE_SOURCE = os.environ.get("MRIS_PRICE_SOURCE", "yfinance")
+PRICE_SOURCE_DIR = os.environ.get(
+    "MRIS_PRICE_SOURCE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "prices")
+)
+SYNTHETIC_SEED = int(os.environ.get("MRIS_SYNTHETIC_SEED", "42"))
+SYNTHETIC_EPOCH = "2000-01-03"  # first synthetic trading day; later prices do not depend on the range asked for
+
+# ── Price Store Settings ────────────────────────────────────────────
+
+# Used by network sources only; each source gets its own subdirectory
+PRICE_STORE_ENABLED = os.environ.get("MRIS_PRICE_STORE", "1") != "0"
+PRICE_STORE_DIR = os.environ.get(
+    "MRIS_PRICE_STORE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".price_store")
+)
+PRICE_STORE_MAX_STALENESS = 900  # seconds before today's (still moving) bar is re-fetched
+
+# ── Worker Pool Settings ────────────────────────────────────────────
+
+# Worker processes for CPU-bound pipeline stages; 0 runs them in-process
+PIPELINE_WORKERS = int(os.environ.get("MRIS_PIPELINE_WORKERS", "2"))
+
+# ── Admin & Profiling Settings ──────────────────────────────────────
 
+# Token for admin-only features (per-request profiling); unset disables them
+ADMIN_TOKEN = os.environ.get("MRIS_ADMIN_TOKEN") or None
+PROFILE_DIR = os.environ.get(
+    "MRIS_PROFILE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".profiles")
+)
+PROFILE_SAMPLE_INTERVAL = 0.002  # seconds between stack samples of the profiled thread
+PROFILE_TOP_ALLOCATIONS = 15  # allocation sites listed per profile
+PROFILE_KEEP = 50  # newest profiles kept on disk
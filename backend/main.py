@@ -3,11 +3,23 @@ MRIS Backend — FastAPI Application Entry Point
 Market Relationship Intelligence System
 """
 
+import time
+
+_IMPORT_START = time.perf_counter()
+
+import asyncio
 import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from routes.analysis import router as analysis_router
-from routes.portfolio import router as portfolio_router
+from fastapi.responses import PlainTextResponse
+from config import PRICE_SOURCE
+from routes.indices import router as indices_router
+from routes.admin import router as admin_router
+from services.executor import start_pool, shutdown_pool
+from services.warmup import Warmup, WarmupGate, heavy_modules
+from services.metrics import REGISTRY
 
 # ── Logging ─────────────────────────────────────────────────────────
 
@@ -16,6 +28,56 @@ logging.basicConfig(
     format="%(asctime)s | %(levelname)-7s | %(name)s | %(message)s",
     datefmt="%H:%M:%S",
 )
+logger = logging.getLogger(__name__)
+
+# ── Lifecycle ───────────────────────────────────────────────────────
+# Startup only binds the port: the scientific stack, the pipeline routers,
+# the worker pool and the cache refresher are brought up by a background
+# warm-up task. Until it finishes, WarmupGate holds every request except
+# the lightweight routes below.
+
+warmup = Warmup(started=_IMPORT_START)
+
+_PIPELINE_ROUTES = ("routes.analysis", "routes.portfolio", "routes.live")
+
+
+async def _load_pipeline(app: FastAPI):
+    try:
+        await run_in_threadpool(warmup.import_modules, (*heavy_modules(PRICE_SOURCE), *_PIPELINE_ROUTES))
+        warmup.mark("imports")
+
+        from routes.analysis import router as analysis_router, start_background_refresh
+        from routes.portfolio import router as portfolio_router
+        from routes.live import router as live_router
+        app.include_router(analysis_router)
+        app.include_router(portfolio_router)
+        app.include_router(live_router)
+        app.openapi_schema = None
+    except Exception as e:
+        logger.error(f"Warm-up failed: {e}", exc_info=True)
+        warmup.finish(error=str(e))
+        return
+
+    # Requests are served from here on; CPU stages run inline until the pool is up
+    warmup.finish()
+    await run_in_threadpool(start_pool)
+    warmup.mark("pool")
+    start_background_refresh()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    warmup.reset()
+    task = asyncio.get_running_loop().create_task(_load_pipeline(app))
+    warmup.mark("serving")
+    yield
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+    if warmup.ready and warmup.error is None:
+        from routes.analysis import stop_background_refresh
+        await stop_background_refresh()
+    shutdown_pool()
+
 
 # ── App ─────────────────────────────────────────────────────────────
 
@@ -23,6 +85,13 @@ app = FastAPI(
     title="MRIS — Market Relationship Intelligence System",
     description="Network analysis and visualization of structural stock market relationships.",
     version="3.0.0",
+    lifespan=lifespan,
+)
+
+app.add_middleware(
+    WarmupGate,
+    warmup=warmup,
+    open_paths=("/", "/health", "/health/startup", "/metrics", "/api/indices"),
 )
 
 app.add_middleware(
@@ -33,8 +102,8 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-app.include_router(analysis_router)
-app.include_router(portfolio_router)
+app.include_router(indices_router)
+app.include_router(admin_router)
 
 
 @app.get("/")
@@ -47,6 +116,21 @@ async def health():
     return {"status": "ok"}
 
 
+@app.get("/health/startup")
+async def startup_report():
+    """Warm-up progress and where startup time went (seconds since app import)."""
+    return warmup.report()
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Pipeline, fetch and cache metrics in the Prometheus text format."""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+
+warmup.mark("app")
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
@@ -12,6 +12,25 @@ class AnalysisRequest(BaseModel):
     start_date: Optional[str] = Field(None, description="Custom start date (YYYY-MM-DD)")
     end_date: Optional[str] = Field(None, description="Custom end date (YYYY-MM-DD)")
     threshold: float = Field(0.6, ge=0.1, le=0.95, description="Correlation threshold")
+    centrality_mode: str = Field(
+        "auto",
+        pattern="^(auto|exact|approximate)$",
+        description="Centrality accuracy: exact, approximate (sampled betweenness) or auto by graph size",
+    )
+
+
+class TimeSeriesRequest(BaseModel):
+    index: str = Field(..., description="Stock index name, e.g. 'NIFTY 50'")
+    start_date: str = Field(..., description="Start of the analysed span (YYYY-MM-DD)")
+    end_date: str = Field(..., description="End of the analysed span (YYYY-MM-DD)")
+    window: int = Field(63, ge=10, le=504, description="Trading days per window")
+    step: int = Field(5, ge=1, le=252, description="Trading days between window starts")
+    threshold: float = Field(0.6, ge=0.1, le=0.95, description="Correlation threshold")
+    centrality_mode: str = Field(
+        "auto",
+        pattern="^(auto|exact|approximate)$",
+        description="Centrality accuracy: exact, approximate (sampled betweenness) or auto by graph size",
+    )
 
 
 class CentralityMetrics(BaseModel):
@@ -65,10 +84,54 @@ class GraphResponse(BaseModel):
     start_date: Optional[str] = None
     end_date: Optional[str] = None
     threshold: float
+    centrality_mode: str = Field("exact", description="Centrality mode actually used: exact or approximate")
     timestamp: str = Field(..., description="ISO timestamp of when the analysis was computed")
     insights: list[InsightItem] = Field(default_factory=list, description="Auto-generated market insights")
 
 
+class WindowStats(BaseModel):
+    start_date: str
+    end_date: str
+    total_edges: int
+    density: float
+    avg_degree: float
+    modularity: float
+    num_clusters: int
+    mean_correlation: float
+
+
+class TimeSeriesResponse(BaseModel):
+    index: str
+    window: int
+    step: int
+    threshold: float
+    tickers: list[str]
+    windows: list[WindowStats]
+    influence: list[list[float]] = Field(
+        ..., description="Per-window influence scores, aligned with tickers"
+    )
+    timestamp: str = Field(..., description="ISO timestamp of when the analysis was computed")
+
+
+class SectorStats(BaseModel):
+    sector: str
+    size: int
+    intra_correlation: float = Field(..., description="Mean pairwise correlation within the sector")
+    inter_correlation: float = Field(..., description="Mean correlation with stocks outside the sector")
+
+
+class SectorHeatmapResponse(BaseModel):
+    sectors: list[str]
+    matrix: list[list[float]] = Field(..., description="Mean sector-to-sector correlation, aligned with sectors")
+    sector_stocks: dict[str, list[str]]
+    sector_stats: list[SectorStats]
+    index: str
+    period: Optional[str] = None
+    start_date: Optional[str] = None
+    end_date: Optional[str] = None
+    timestamp: str = Field(..., description="ISO timestamp of when the analysis was computed")
+
+
 class IndexInfo(BaseModel):
     name: str
     stock_count: int
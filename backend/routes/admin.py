@@ -0,0 +1,40 @@
+"""
+MRIS Admin Routes
+Saved request profiles (see services.profiler). Every endpoint requires
+the X-Admin-Token header; with no MRIS_ADMIN_TOKEN configured they all
+answer 403.
+"""
+
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+
+from services.profiler import admin_authorized, list_profiles, load_profile
+
+router = APIRouter(prefix="/api/admin", tags=["admin"])
+
+
+def _require_admin(x_admin_token: Optional[str] = Header(None)):
+    if not admin_authorized(x_admin_token):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+
+@router.get("/profiles", dependencies=[Depends(_require_admin)])
+async def get_profiles():
+    """Saved profiles, newest first."""
+    return {"profiles": list_profiles()}
+
+
+@router.get("/profiles/{profile_id}", dependencies=[Depends(_require_admin)])
+async def get_profile(profile_id: str, format: str = Query("json", pattern="^(json|folded)$")):
+    """
+    One saved profile: the JSON report (stage wall/CPU times, peak memory,
+    top allocation sites), or with format=folded the sampled stacks in
+    folded format for flamegraph.pl / speedscope.
+    """
+    profile = load_profile(profile_id, folded=format == "folded")
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Unknown profile")
+    if format == "folded":
+        return PlainTextResponse(profile)
+    return profile
@@ -5,120 +5,300 @@ Supports both preset periods and custom date ranges.
 """
 
 import time
+import asyncio
 import hashlib
 import json
 import logging
-from datetime import datetime
-from collections import OrderedDict
-from fastapi import APIRouter, HTTPException
+from functools import partial
+from itertools import islice
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
+import numpy as np
+import pandas as pd
 
 from models import (
     AnalysisRequest, GraphResponse, NodeData, EdgeData,
     CentralityMetrics, ClusterInfo, NetworkStats,
-    IndexInfo, IndicesResponse,
+    TimeSeriesRequest, TimeSeriesResponse, WindowStats,
+    SectorHeatmapResponse,
 )
-from config import INDICES, VALID_PERIODS, CACHE_TTL_SECONDS, CACHE_MAX_SIZE
+from config import (
+    INDICES, SECTORS, VALID_PERIODS, DEFAULT_PERIOD, TIMESERIES_MAX_WINDOWS, PIPELINE_WORKERS,
+    CACHE_TTL_SECONDS, CACHE_MAX_SIZE, DATA_CACHE_MAX_SIZE, LARGE_UNIVERSE_MIN_TICKERS,
+    DEFAULT_THRESHOLD, CACHE_STALE_SECONDS, CACHE_REFRESH_AHEAD, CACHE_REFRESH_TOP_N,
+    CACHE_REFRESH_INTERVAL, CACHE_POPULARITY_HALFLIFE, CACHE_PREWARM,
+)
+from services.cache import make_cache
+from services.serialization import negotiate, encode_response, MEDIA_JSON
+from services.response_cache import CachedResponse, cached_response
+from services.singleflight import SingleFlight
+from services.refresh import RefreshScheduler
 from services.insights_generator import generate_insights
 from services.data_fetcher import fetch_prices, fetch_prices_by_dates
-from services.preprocessor import compute_log_returns, clean_data
-from services.correlation_engine import compute_correlation_matrix, apply_threshold
-from services.graph_builder import build_graph, compute_centrality, compute_influence_scores
-from services.clustering import detect_communities
+from services.preprocessor import compute_log_returns, clean_data, standardize_returns
+from services.correlation_engine import compute_correlation_matrix, compute_rolling_correlations
+from services.rolling_correlation import rolling_correlation
+from services.network_analysis import analyze_network, analyze_standardized, summarize_window
+from services.sector_analyzer import compute_sector_heatmap
+from services.executor import run_cpu, map_cpu
+from services.profiler import profile_requested, profile_call
+from services.metrics import GRAPH_NODES, GRAPH_EDGES, UNIVERSE_SIZE, StageTimer, stage, observe_stages
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api", tags=["analysis"])
 
-# ── In-Memory Cache ─────────────────────────────────────────────────
+# ── Caches ──────────────────────────────────────────────────────────
+# Two layers: market data (cleaned returns + correlation matrix) depends only
+# on the index and date range, so threshold changes reuse it and only re-run
+# thresholding onward. Full responses are keyed additionally by threshold and
+# stored pre-serialized and pre-compressed (CachedResponse). The backend
+# (per-process memory, Redis or SQLite) is set by config.CACHE_BACKEND.
+#
+# Responses are fresh for CACHE_TTL_SECONDS and kept CACHE_STALE_SECONDS
+# longer: a stale entry is served at once (X-Cache: STALE) while it is
+# recomputed in the background, and the most requested keys are recomputed
+# before they go stale at all.
+
+_data_cache = make_cache("market data", DATA_CACHE_MAX_SIZE, CACHE_TTL_SECONDS)
+_cache = make_cache("response", CACHE_MAX_SIZE, CACHE_TTL_SECONDS + CACHE_STALE_SECONDS)
+
+# Concurrent identical requests share one in-flight pipeline run
+_inflight = SingleFlight("analysis")
+
+_scheduler = RefreshScheduler(
+    "response", _cache, _inflight,
+    ttl=CACHE_TTL_SECONDS,
+    ahead=CACHE_REFRESH_AHEAD,
+    top_n=CACHE_REFRESH_TOP_N,
+    interval=CACHE_REFRESH_INTERVAL,
+    halflife=CACHE_POPULARITY_HALFLIFE,
+)
+_prewarm_task: Optional[asyncio.Task] = None
 
-_cache: OrderedDict[str, tuple[float, GraphResponse]] = OrderedDict()
 
+async def _cached(key: str) -> Optional[CachedResponse]:
+    """Response cache lookup; shared backends do I/O, so run them off the event loop."""
+    if not _cache.shared:
+        return _cache.get(key)
+    return await run_in_threadpool(_cache.get, key)
 
-def _cache_key(req: AnalysisRequest) -> str:
-    raw = json.dumps({
-        "index": req.index,
-        "period": req.period,
-        "start_date": req.start_date,
-        "end_date": req.end_date,
-        "threshold": req.threshold,
-    }, sort_keys=True)
+
+async def _serve_cached(key: str, compute, refresh) -> tuple[CachedResponse, str]:
+    """
+    Cached entry for key with its X-Cache status, computing it on a miss.
+
+    Stale entries are returned as-is and revalidated in the background.
+
+    Args:
+        key: Response cache key
+        compute: Zero-argument function that computes and caches the entry
+        refresh: Like compute, but re-fetching market data (background refreshes)
+
+    Returns:
+        (entry, "HIT" | "STALE" | "MISS")
+    """
+    _scheduler.record(key, refresh)
+    entry = await _cached(key)
+    if entry is None:
+        return await _inflight.run(key, compute), "MISS"
+    if entry.age >= CACHE_TTL_SECONDS:
+        _scheduler.revalidate(key)
+        return entry, "STALE"
+    return entry, "HIT"
+
+
+@dataclass
+class MarketData:
+    """
+    Threshold-independent pipeline output for one (index, date range).
+
+    Large universes keep standardized float32 returns instead of a dense
+    correlation matrix; correlation() builds (sub-)matrices on demand.
+    """
+    returns: pd.DataFrame
+    corr_matrix: Optional[pd.DataFrame] = None
+    standardized: Optional[np.ndarray] = None
+
+    @property
+    def tickers(self) -> list[str]:
+        return self.returns.columns.tolist()
+
+    def correlation(self, tickers: Optional[list[str]] = None) -> pd.DataFrame:
+        """Dense correlation matrix, restricted to tickers if given."""
+        tickers = self.tickers if tickers is None else tickers
+        if self.corr_matrix is not None:
+            return self.corr_matrix.loc[tickers, tickers]
+        rows = self.standardized[self.returns.columns.get_indexer(tickers)]
+        values = np.clip(rows @ rows.T, -1.0, 1.0).astype(float)
+        np.fill_diagonal(values, 1.0)
+        return pd.DataFrame(values, index=tickers, columns=tickers)
+
+
+def _date_params(req: AnalysisRequest) -> dict:
+    """Normalized date selection of a request (custom range or preset period)."""
+    if req.start_date and req.end_date:
+        return {"period": None, "start_date": req.start_date, "end_date": req.end_date}
+    return {"period": req.period or DEFAULT_PERIOD, "start_date": None, "end_date": None}
+
+
+def _hash_key(params: dict) -> str:
+    raw = json.dumps(params, sort_keys=True)
     return hashlib.md5(raw.encode()).hexdigest()
 
 
-def _get_cached(key: str) -> GraphResponse | None:
-    if key in _cache:
-        ts, data = _cache[key]
-        if time.time() - ts < CACHE_TTL_SECONDS:
-            _cache.move_to_end(key)
-            logger.info(f"Cache hit: {key}")
-            return data
-        else:
-            del _cache[key]
-    return None
+def _data_key(req: AnalysisRequest) -> str:
+    return _hash_key({"index": req.index, **_date_params(req)})
 
 
-def _set_cached(key: str, data: GraphResponse):
-    _cache[key] = (time.time(), data)
-    while len(_cache) > CACHE_MAX_SIZE:
-        _cache.popitem(last=False)
+def _cache_key(req: AnalysisRequest) -> str:
+    return _hash_key({
+        "index": req.index,
+        **_date_params(req),
+        "threshold": req.threshold,
+        "centrality_mode": req.centrality_mode,
+    })
 
 
-# ── Pipeline Helper ─────────────────────────────────────────────────
+# ── Pipeline Helpers ────────────────────────────────────────────────
 
-def run_analysis_pipeline(request: AnalysisRequest) -> GraphResponse:
-    """
-    Execute the full analysis pipeline and return a GraphResponse.
-    Shared between the /analyze endpoint and the SSE live stream.
-    """
-    # Validate index
+def _validate_request(request: AnalysisRequest):
+    """Reject unknown indices and periods with a 400."""
     if request.index not in INDICES:
         raise HTTPException(
             status_code=400,
             detail=f"Unknown index '{request.index}'. Available: {list(INDICES.keys())}",
         )
 
-    # Determine date mode
-    use_custom_dates = bool(request.start_date and request.end_date)
+    period = _date_params(request)["period"]
+    if period is not None and period not in VALID_PERIODS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid period '{period}'. Valid: {VALID_PERIODS}",
+        )
+
 
-    if not use_custom_dates:
-        period = request.period or "3mo"
-        if period not in VALID_PERIODS:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Invalid period '{period}'. Valid: {VALID_PERIODS}",
-            )
+def load_market_data(request: AnalysisRequest, refresh: bool = False, cached: bool = True) -> MarketData:
+    """
+    Fetch prices, clean returns and compute the correlation matrix.
 
+    Results are cached per (index, date range) so that threshold changes
+    skip the download and correlation stages.
+
+    Args:
+        request: Analysis request (threshold is ignored)
+        refresh: Bypass the cached entry and recompute (the result is still cached)
+        cached: Use shared state at all (False neither reads nor stores the
+            market-data cache, nor updates the rolling correlation engine)
+
+    Returns:
+        MarketData with cleaned returns and correlation matrix
+    """
+    key = _data_key(request)
+    if cached and not refresh:
+        data = _data_cache.get(key)
+        if data is not None:
+            return data
+
+    dates = _date_params(request)
     tickers = INDICES[request.index]
 
-    try:
-        # 1. Fetch prices
-        if use_custom_dates:
-            prices = fetch_prices_by_dates(tickers, request.start_date, request.end_date)
+    # 1. Fetch prices
+    with stage("analysis", "fetch"):
+        if dates["period"] is None:
+            prices = fetch_prices_by_dates(tickers, dates["start_date"], dates["end_date"])
         else:
-            prices = fetch_prices(tickers, request.period or "3mo")
+            prices = fetch_prices(tickers, dates["period"])
 
-        # 2. Preprocessing
+    # 2. Preprocessing
+    with stage("analysis", "preprocess"):
         returns = compute_log_returns(prices)
         returns = clean_data(returns)
 
-        if returns.shape[1] < 3:
-            raise HTTPException(
-                status_code=422,
-                detail="Too few stocks with valid data. Try a different index or period.",
-            )
+    if returns.shape[1] < 3:
+        raise HTTPException(
+            status_code=422,
+            detail="Too few stocks with valid data. Try a different index or period.",
+        )
+
+    # 3. Correlation — large universes only standardize the returns (edges
+    # are thresholded blockwise later); refreshes (live stream) usually add a
+    # single new bar, so they update the rolling engine incrementally
+    with stage("analysis", "correlation"):
+        if returns.shape[1] > LARGE_UNIVERSE_MIN_TICKERS:
+            returns = returns.loc[:, returns.std() > 0]
+            data = MarketData(returns=returns, standardized=standardize_returns(returns))
+        elif refresh and cached:
+            data = MarketData(returns=returns, corr_matrix=rolling_correlation(key, returns))
+        else:
+            data = MarketData(returns=returns, corr_matrix=run_cpu(compute_correlation_matrix, returns))
+
+    if cached:
+        _data_cache.set(key, data)
+    return data
+
+
+def cached_market_data(
+    tickers: list[str],
+    period: Optional[str] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+) -> list[MarketData]:
+    """
+    Cached index-level market data for a date selection that includes any
+    of the given tickers, most overlapping first. Never fetches.
 
-        # 3. Correlation
-        corr_matrix = compute_correlation_matrix(returns)
-        adj_matrix = apply_threshold(corr_matrix, request.threshold)
+    Args:
+        tickers: Ticker symbols of interest
+        period / start_date / end_date: Date selection, as in AnalysisRequest
+
+    Returns:
+        List of cached MarketData entries (possibly empty)
+    """
+    wanted = set(tickers)
+    found = []
+    for name, universe in INDICES.items():
+        overlap = len(wanted.intersection(universe))
+        if not overlap:
+            continue
+        req = AnalysisRequest(index=name, period=period, start_date=start_date, end_date=end_date)
+        data = _data_cache.get(_data_key(req))
+        if data is not None:
+            found.append((overlap, data))
+    found.sort(key=lambda item: item[0], reverse=True)
+    return [data for _, data in found]
+
+
+def run_analysis_pipeline(
+    request: AnalysisRequest, refresh: bool = False, cached: bool = True
+) -> GraphResponse:
+    """
+    Execute the full analysis pipeline and return a GraphResponse.
+    Shared between the /analyze endpoint and the SSE live stream.
 
-        # 4. Build graph
-        G = build_graph(adj_matrix)
+    Args:
+        request: Analysis request
+        refresh: Re-fetch market data instead of using the cached correlation matrix
+        cached: Read and store the market-data cache (False for profiled runs)
+    """
+    _validate_request(request)
+    use_custom_dates = _date_params(request)["period"] is None
 
-        # 5. Centrality
-        centralities = compute_centrality(G)
-        influence_scores = compute_influence_scores(centralities)
+    try:
+        data = load_market_data(request, refresh=refresh, cached=cached)
 
-        # 6. Community detection
-        partition, modularity = detect_communities(G)
+        # 4-6. Threshold → graph → centrality → clustering (worker pool)
+        if data.corr_matrix is None:
+            result = run_cpu(
+                analyze_standardized, data.standardized, data.tickers,
+                request.threshold, request.centrality_mode,
+            )
+        else:
+            result = run_cpu(
+                analyze_network, data.corr_matrix, request.threshold, request.centrality_mode
+            )
 
     except HTTPException:
         raise
@@ -126,31 +306,39 @@ def run_analysis_pipeline(request: AnalysisRequest) -> GraphResponse:
         logger.error(f"Analysis pipeline error: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
 
+    observe_stages("analysis", result.timings, result.cpu_timings)
+    UNIVERSE_SIZE.set(len(data.tickers), index=request.index)
+    GRAPH_NODES.set(result.number_of_nodes, index=request.index)
+    GRAPH_EDGES.set(result.number_of_edges, index=request.index)
+
     # ── Build response ──────────────────────────────────────────────
+    timer = StageTimer()
 
     nodes = []
-    for node in G.nodes():
-        cent = centralities.get(node, {"degree": 0, "betweenness": 0, "closeness": 0})
+    for node, degree in zip(result.nodes, result.degrees.tolist()):
+        cent = result.centralities.get(node, {"degree": 0, "betweenness": 0, "closeness": 0})
         nodes.append(
             NodeData(
                 id=node,
                 symbol=node,
-                influence_score=influence_scores.get(node, 0),
-                cluster_id=partition.get(node, 0),
+                influence_score=result.influence_scores.get(node, 0),
+                cluster_id=result.partition.get(node, 0),
                 centrality=CentralityMetrics(**cent),
-                connections=G.degree(node),
+                connections=degree,
             )
         )
 
     nodes.sort(key=lambda n: n.influence_score, reverse=True)
 
     edges = [
-        EdgeData(source=u, target=v, weight=round(d["weight"], 4))
-        for u, v, d in G.edges(data=True)
+        EdgeData(source=result.nodes[u], target=result.nodes[v], weight=round(w, 4))
+        for u, v, w in zip(
+            result.edge_rows.tolist(), result.edge_cols.tolist(), result.edge_weights.tolist()
+        )
     ]
 
     cluster_map: dict[int, list[str]] = {}
-    for node, cid in partition.items():
+    for node, cid in result.partition.items():
         cluster_map.setdefault(cid, []).append(node)
 
     clusters = [
@@ -158,16 +346,18 @@ def run_analysis_pipeline(request: AnalysisRequest) -> GraphResponse:
         for cid, members in sorted(cluster_map.items())
     ]
 
-    n = G.number_of_nodes()
+    n = result.number_of_nodes
     stats = NetworkStats(
         total_nodes=n,
-        total_edges=G.number_of_edges(),
-        density=round(float(G.number_of_edges()) / max(1, n * (n - 1) / 2), 4) if n > 1 else 0,
-        avg_degree=round(sum(dict(G.degree()).values()) / max(1, n), 2),
-        modularity=modularity,
+        total_edges=result.number_of_edges,
+        density=round(float(result.number_of_edges) / max(1, n * (n - 1) / 2), 4) if n > 1 else 0,
+        avg_degree=round(int(result.degrees.sum()) / max(1, n), 2),
+        modularity=result.modularity,
         num_clusters=len(clusters),
     )
 
+    timer.lap("response")
+
     # ── Generate insights ────────────────────────────────────────────
     try:
         node_dicts = [n.model_dump() for n in nodes]
@@ -178,6 +368,8 @@ def run_analysis_pipeline(request: AnalysisRequest) -> GraphResponse:
     except Exception as e:
         logger.warning(f"Insights generation failed: {e}")
         insights = []
+    timer.lap("insights")
+    observe_stages("analysis", timer.timings, timer.cpu_timings)
 
     return GraphResponse(
         nodes=nodes,
@@ -189,6 +381,7 @@ def run_analysis_pipeline(request: AnalysisRequest) -> GraphResponse:
         start_date=request.start_date if use_custom_dates else None,
         end_date=request.end_date if use_custom_dates else None,
         threshold=request.threshold,
+        centrality_mode=result.centrality_mode,
         timestamp=datetime.utcnow().isoformat() + "Z",
         insights=insights,
     )
@@ -196,32 +389,248 @@ def run_analysis_pipeline(request: AnalysisRequest) -> GraphResponse:
 
 # ── Endpoints ───────────────────────────────────────────────────────
 
-@router.get("/indices", response_model=IndicesResponse)
-async def get_indices():
-    """Return available stock indices."""
-    return IndicesResponse(
-        indices=[
-            IndexInfo(name=name, stock_count=len(tickers))
-            for name, tickers in INDICES.items()
-        ]
-    )
-
-
 @router.post("/analyze", response_model=GraphResponse)
-async def analyze(request: AnalysisRequest):
+async def analyze(request: AnalysisRequest, http_request: Request):
     """
     Run the full analysis pipeline:
     1. Fetch prices → 2. Log returns → 3. Correlation → 4. Graph → 5. Centrality → 6. Clustering
 
     Supports preset periods (period field) or custom date ranges (start_date + end_date).
+    The body is JSON unless the Accept header asks for application/msgpack or
+    application/vnd.apache.arrow.stream (columnar layout, see services.serialization).
+    Responses carry a strong ETag and are served compressed per Accept-Encoding.
+
+    With ?profile=1 and an admin token the pipeline runs uncached and
+    in-process under the profiler; the JSON response carries the saved
+    profile's id in X-Profile-Id.
     """
-    # Check cache
+    if profile_requested(http_request):
+        _validate_request(request)
+        response, report = await run_in_threadpool(
+            profile_call, "analyze", request.model_dump(), run_analysis_pipeline, request, False, False
+        )
+        return Response(
+            content=response.model_dump_json(),
+            media_type=MEDIA_JSON,
+            headers={"X-Profile-Id": report.id, "X-Cache": "BYPASS"},
+        )
+
     key = _cache_key(request)
-    cached = _get_cached(key)
-    if cached:
-        return cached
+    entry, status = await _serve_cached(
+        key,
+        partial(_analyze_and_cache, request, key),
+        partial(_analyze_and_cache, request, key, refresh=True),
+    )
+
+    media_type = negotiate(http_request.headers.get("accept"))
+    if media_type == MEDIA_JSON:
+        body = entry.variant(MEDIA_JSON)
+    else:
+        body = await run_in_threadpool(entry.variant, media_type, _graph_encoder(media_type))
+    return cached_response(body, http_request, status)
+
+
+def _analyze_and_cache(request: AnalysisRequest, key: str, refresh: bool = False) -> CachedResponse:
+    """Run the pipeline off the event loop and cache the response before waiters resume."""
+    entry = CachedResponse.from_model(run_analysis_pipeline(request, refresh=refresh))
+    _cache.set(key, entry)
+    return entry
 
-    response = run_analysis_pipeline(request)
 
-    _set_cached(key, response)
-    return response
+def _graph_encoder(media_type: str):
+    """Encoder from cached GraphResponse JSON bytes to another media type."""
+    def encode(data: bytes) -> bytes:
+        return encode_response(GraphResponse.model_validate_json(data), media_type)
+    return encode
+
+
+@router.post("/analyze/timeseries", response_model=TimeSeriesResponse)
+async def analyze_timeseries(request: TimeSeriesRequest, http_request: Request):
+    """
+    Rolling-window network analysis over a date span.
+
+    Prices are fetched and cleaned once; all window correlation matrices
+    come from one batched pass over the returns array, and each window's
+    threshold → centrality → clustering runs across the worker pool.
+    """
+    key = _hash_key({"timeseries": request.model_dump()})
+    compute = partial(_timeseries_and_cache, request, key)
+    entry, status = await _serve_cached(key, compute, compute)
+    return cached_response(entry.variant(MEDIA_JSON), http_request, status)
+
+
+def _timeseries_and_cache(request: TimeSeriesRequest, key: str) -> CachedResponse:
+    entry = CachedResponse.from_model(run_timeseries_pipeline(request))
+    _cache.set(key, entry)
+    return entry
+
+
+def run_timeseries_pipeline(request: TimeSeriesRequest) -> TimeSeriesResponse:
+    """Compute per-window network stats and influence for a TimeSeriesRequest."""
+    if request.index not in INDICES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown index '{request.index}'. Available: {list(INDICES.keys())}",
+        )
+
+    try:
+        start, end = date.fromisoformat(request.start_date), date.fromisoformat(request.end_date)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Dates must be in YYYY-MM-DD format")
+    if start >= end:
+        raise HTTPException(status_code=400, detail="start_date must be before end_date")
+
+    try:
+        prices = fetch_prices_by_dates(INDICES[request.index], request.start_date, request.end_date)
+        returns = clean_data(compute_log_returns(prices))
+    except Exception as e:
+        logger.error(f"Time series fetch error: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
+
+    num_windows = (len(returns) - request.window) // request.step + 1
+    if returns.shape[1] < 3 or num_windows < 1:
+        raise HTTPException(
+            status_code=422,
+            detail="Not enough data for one window. Widen the date span or shorten the window.",
+        )
+    if returns.shape[1] > LARGE_UNIVERSE_MIN_TICKERS:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Time series supports up to {LARGE_UNIVERSE_MIN_TICKERS} tickers per window.",
+        )
+    if num_windows > TIMESERIES_MAX_WINDOWS:
+        raise HTTPException(
+            status_code=422,
+            detail=f"{num_windows} windows requested; the maximum is {TIMESERIES_MAX_WINDOWS}. Increase the step.",
+        )
+
+    tickers = returns.columns.tolist()
+    dates = [d.strftime("%Y-%m-%d") for d in returns.index]
+    matrices = compute_rolling_correlations(returns.to_numpy(), request.window, request.step)
+
+    # Feed the pool a bounded batch at a time so only a few n×n matrices are alive
+    batch_size = max(1, PIPELINE_WORKERS) * 4
+    windows, influence = [], []
+    try:
+        while batch := list(islice(matrices, batch_size)):
+            starts = [start for start, _ in batch]
+            summaries = map_cpu(
+                summarize_window,
+                [corr for _, corr in batch],
+                [tickers] * len(batch),
+                [request.threshold] * len(batch),
+                [request.centrality_mode] * len(batch),
+            )
+            for start, summary in zip(starts, summaries):
+                influence.append(summary.pop("influence"))
+                windows.append(WindowStats(
+                    start_date=dates[start],
+                    end_date=dates[start + request.window - 1],
+                    **summary,
+                ))
+    except Exception as e:
+        logger.error(f"Time series pipeline error: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
+
+    return TimeSeriesResponse(
+        index=request.index,
+        window=request.window,
+        step=request.step,
+        threshold=request.threshold,
+        tickers=tickers,
+        windows=windows,
+        influence=influence,
+        timestamp=datetime.utcnow().isoformat() + "Z",
+    )
+
+
+@router.get("/sectors", response_model=SectorHeatmapResponse)
+async def sector_heatmap(
+    http_request: Request,
+    index: str,
+    period: Optional[str] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+):
+    """
+    Sector-level correlation heatmap with per-sector stats.
+
+    Aggregates the cached correlation matrix for the (index, date range), so
+    it shares the fetch and correlation stages with /analyze.
+    """
+    request = AnalysisRequest(index=index, period=period, start_date=start_date, end_date=end_date)
+    _validate_request(request)
+
+    key = _hash_key({"sectors": request.index, **_date_params(request)})
+    entry, status = await _serve_cached(
+        key,
+        partial(_sectors_and_cache, request, key),
+        partial(_sectors_and_cache, request, key, refresh=True),
+    )
+    return cached_response(entry.variant(MEDIA_JSON), http_request, status)
+
+
+def _sectors_and_cache(request: AnalysisRequest, key: str, refresh: bool = False) -> CachedResponse:
+    try:
+        data = load_market_data(request, refresh=refresh)
+        heatmap = compute_sector_heatmap(data.correlation(), SECTORS)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Sector heatmap error: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
+
+    dates = _date_params(request)
+    response = SectorHeatmapResponse(
+        **heatmap,
+        index=request.index,
+        period=dates["period"],
+        start_date=dates["start_date"],
+        end_date=dates["end_date"],
+        timestamp=datetime.utcnow().isoformat() + "Z",
+    )
+    entry = CachedResponse.from_model(response)
+    _cache.set(key, entry)
+    return entry
+
+
+# ── Background Refresh ──────────────────────────────────────────────
+
+async def prewarm_cache():
+    """
+    Compute the default view of every index and preset period (at
+    DEFAULT_THRESHOLD) so first requests hit the cache. Runs one
+    pipeline at a time; entries already cached (e.g. in a shared
+    backend) are skipped.
+    """
+    start = time.perf_counter()
+    warmed = 0
+    for index in INDICES:
+        for period in VALID_PERIODS:
+            request = AnalysisRequest(index=index, period=period, threshold=DEFAULT_THRESHOLD)
+            key = _cache_key(request)
+            try:
+                if await _cached(key) is not None:
+                    continue
+                await _inflight.run(key, _analyze_and_cache, request, key)
+                warmed += 1
+            except Exception as e:
+                logger.warning(f"Prewarm of {index} {period} failed: {e}")
+    logger.info(f"Prewarmed {warmed} response(s) in {time.perf_counter() - start:.1f}s")
+
+
+def start_background_refresh():
+    """Start the refresh scheduler and, if enabled, the startup prewarm."""
+    global _prewarm_task
+    _scheduler.start()
+    if CACHE_PREWARM and _prewarm_task is None:
+        _prewarm_task = asyncio.get_running_loop().create_task(prewarm_cache())
+
+
+async def stop_background_refresh():
+    global _prewarm_task
+    if _prewarm_task is not None:
+        _prewarm_task.cancel()
+        await asyncio.gather(_prewarm_task, return_exceptions=True)
+        _prewarm_task = None
+    await _scheduler.stop()
@@ -0,0 +1,23 @@
+"""
+MRIS API Routes
+Index listing. Kept free of the scientific stack so it is served while
+the pipeline modules are still loading.
+"""
+
+from fastapi import APIRouter
+
+from models import IndexInfo, IndicesResponse
+from config import INDICES
+
+router = APIRouter(prefix="/api", tags=["analysis"])
+
+
+@router.get("/indices", response_model=IndicesResponse)
+async def get_indices():
+    """Return available stock indices."""
+    return IndicesResponse(
+        indices=[
+            IndexInfo(name=name, stock_count=len(tickers))
+            for name, tickers in INDICES.items()
+        ]
+    )
@@ -1,43 +1,94 @@
 """
 MRIS Live Data Routes
 Server-Sent Events (SSE) endpoint for real-time network analysis updates.
+Clients watching the same view share one refresh task through the live hub.
 """
 
 import asyncio
-import json
 import logging
 from typing import Optional
-from datetime import datetime
-from fastapi import APIRouter, HTTPException, Request
+from fastapi import APIRouter, Header, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import StreamingResponse
 
 from models import AnalysisRequest
-from config import INDICES, LIVE_REFRESH_INTERVAL, LIVE_HEARTBEAT_INTERVAL
-from routes.analysis import run_analysis_pipeline
+from config import (
+    INDICES, LIVE_REFRESH_INTERVAL, LIVE_HEARTBEAT_INTERVAL, LIVE_QUEUE_MAX_SIZE,
+    LIVE_DELTA_TOLERANCE,
+)
+from routes.analysis import run_analysis_pipeline, _cache_key
+from services.graph_diff import diff_snapshots
+from services.live_hub import LiveHub, encode_event
+from services.profiler import profile_requested, profile_call
+from services.serialization import negotiate, MEDIA_MSGPACK, MEDIA_MSGPACK_FRAMES
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/live", tags=["live"])
 
+hub = LiveHub(heartbeat=LIVE_HEARTBEAT_INTERVAL, max_queue=LIVE_QUEUE_MAX_SIZE)
+
+
+def _make_producer(analysis_request: AnalysisRequest):
+    async def produce() -> dict:
+        # Run analysis pipeline (blocking call wrapped for async),
+        # re-fetching market data so each update sees the latest bars
+        loop = asyncio.get_running_loop()
+        response = await loop.run_in_executor(
+            None, run_analysis_pipeline, analysis_request, True
+        )
+        logger.info(
+            f"Live update computed: {analysis_request.index} | "
+            f"{response.stats.total_nodes} nodes, "
+            f"{response.stats.total_edges} edges"
+        )
+        return response.model_dump(mode="json")
+
+    return produce
+
+
+def _diff(prev: dict, curr: dict) -> dict:
+    return diff_snapshots(prev, curr, LIVE_DELTA_TOLERANCE)
+
 
 @router.get("/stream")
 async def live_stream(
-    request: Request,
+    http_request: Request,
     index: str,
     threshold: float = 0.6,
     period: Optional[str] = None,
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
     interval: Optional[int] = None,
+    mode: str = Query("full", pattern="^(full|delta)$"),
+    last_event_id: Optional[str] = Header(None),
+    accept: Optional[str] = Header(None),
 ):
     """
     Server-Sent Events endpoint for live analysis updates.
 
-    Opens a persistent connection, runs the analysis pipeline immediately,
-    then re-runs it at the configured interval, streaming updated GraphResponse
-    events to the client.
+    Subscribes the client to the shared topic for this view. The topic runs
+    the analysis pipeline immediately, then re-runs it at the configured
+    interval and fans the result out to all subscribers.
+
+    The first event is `subscribed` with the subscription id. In full mode
+    every refresh is an `update` event carrying the whole GraphResponse. In
+    delta mode the client gets one `snapshot`, then `patch` events listing
+    only added/removed/reweighted edges, changed nodes and cluster
+    reassignments. Every event carries its sequence number as the SSE id; a
+    reconnect whose Last-Event-ID is not current, a lagging client, or a
+    POST to /api/live/resync/{subscription_id} triggers a fresh snapshot.
+
+    Clients that accept application/vnd.mris.msgpack-frames (or
+    application/msgpack) get the same events as length-prefixed MessagePack
+    frames instead of SSE text.
+
+    With ?profile=1 and an admin token (admin_token query parameter, as
+    EventSource cannot set headers) one refresh of this view is profiled
+    before subscribing and sent first as a `profile` event with the report.
     """
     if index not in INDICES:
         raise HTTPException(status_code=400, detail=f"Unknown index: {index}")
+    profile = profile_requested(http_request)
 
     refresh_interval = interval if interval and 30 <= interval <= 600 else LIVE_REFRESH_INTERVAL
 
@@ -48,58 +99,55 @@ async def live_stream(
         end_date=end_date,
         threshold=threshold,
     )
+    key = f"{_cache_key(analysis_request)}:{refresh_interval}"
+    last_seq = int(last_event_id) if last_event_id and last_event_id.isdigit() else None
+    media_type = negotiate(accept, ("text/event-stream", MEDIA_MSGPACK_FRAMES, MEDIA_MSGPACK))
+    wire = "sse" if media_type == "text/event-stream" else "msgpack"
 
     async def event_generator():
-        """Generate SSE events with analysis updates."""
-        heartbeat_counter = 0
-
-        while True:
-            # Check if client disconnected
-            if await request.is_disconnected():
-                logger.info(f"Live stream client disconnected: {index}")
-                break
-
-            try:
-                # Run analysis pipeline (blocking call wrapped for async)
-                loop = asyncio.get_event_loop()
-                response = await loop.run_in_executor(
-                    None, run_analysis_pipeline, analysis_request
-                )
-
-                # Send data event
-                data = response.model_dump_json()
-                yield f"event: update\ndata: {data}\n\n"
-                logger.info(
-                    f"Live update sent: {index} | "
-                    f"{response.stats.total_nodes} nodes, "
-                    f"{response.stats.total_edges} edges"
-                )
-
-            except Exception as e:
-                error_data = json.dumps({"error": str(e)})
-                yield f"event: error\ndata: {error_data}\n\n"
-                logger.error(f"Live stream error: {e}")
-
-            # Wait for refresh interval, sending heartbeats
-            elapsed = 0
-            while elapsed < refresh_interval:
-                if await request.is_disconnected():
-                    return
-
-                await asyncio.sleep(min(LIVE_HEARTBEAT_INTERVAL, refresh_interval - elapsed))
-                elapsed += LIVE_HEARTBEAT_INTERVAL
-                heartbeat_counter += 1
-
-                # Send heartbeat ping
-                ts = datetime.utcnow().isoformat() + "Z"
-                yield f"event: ping\ndata: {{\"ts\":\"{ts}\",\"next_in\":{max(0, refresh_interval - elapsed)}}}\n\n"
+        """Relay the topic's encoded events until the client disconnects."""
+        if profile:
+            yield await _profile_refresh(analysis_request, wire)
+
+        sub = hub.subscribe(
+            key, _make_producer(analysis_request), _diff, refresh_interval,
+            mode=mode, last_seq=last_seq, wire=wire,
+        )
+        try:
+            async for event in sub.events():
+                yield event
+        finally:
+            hub.unsubscribe(sub)
+            logger.info(f"Live stream client left: {index}{' (dropped)' if sub.dropped else ''}")
 
     return StreamingResponse(
         event_generator(),
-        media_type="text/event-stream",
+        media_type="text/event-stream" if wire == "sse" else MEDIA_MSGPACK_FRAMES,
         headers={
+            "Vary": "Accept",
             "Cache-Control": "no-cache",
             "Connection": "keep-alive",
             "X-Accel-Buffering": "no",
         },
     )
+
+
+async def _profile_refresh(analysis_request: AnalysisRequest, wire: str) -> bytes:
+    """Profile one live refresh of the view (uncached) and encode the report as an event."""
+    try:
+        _, report = await run_in_threadpool(
+            profile_call, "live", analysis_request.model_dump(),
+            run_analysis_pipeline, analysis_request, False, False,
+        )
+        data = report.summary()
+    except Exception as e:
+        data = {"error": str(e)}
+    return encode_event("profile", data, wire=wire)
+
+
+@router.post("/resync/{subscription_id}")
+async def resync(subscription_id: str):
+    """Ask the hub to send a fresh snapshot to one live subscriber."""
+    if not hub.resync(subscription_id):
+        raise HTTPException(status_code=404, detail="Unknown or closed subscription")
+    return {"status": "ok"}
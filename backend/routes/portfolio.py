@@ -4,19 +4,31 @@ Analyzes correlation between user-selected stocks and provides
 diversification scores and suggestions.
 """
 
+import json
+import hashlib
 import numpy as np
 import pandas as pd
 import logging
 from datetime import datetime
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Iterator, Optional
+from config import PORTFOLIO_BATCH_MAX, PORTFOLIO_BATCH_MAX_TICKERS, PORTFOLIO_BATCH_CHUNK
 from services.data_fetcher import fetch_prices, fetch_prices_by_dates
 from services.preprocessor import compute_log_returns, clean_data
+from services.singleflight import SingleFlight
+from services.metrics import stage
+from services.profiler import profile_requested, profile_call
+from routes.analysis import cached_market_data
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/portfolio", tags=["portfolio"])
 
+# Concurrent checks of the same ticker set share one price download
+_fetch_inflight = SingleFlight("portfolio fetch")
+
 
 class PortfolioRequest(BaseModel):
     tickers: list[str] = Field(..., min_length=2, max_length=20, description="List of ticker symbols")
@@ -45,43 +57,77 @@ class PortfolioResponse(BaseModel):
     timestamp: str
 
 
+class BatchPortfolio(BaseModel):
+    id: str = Field(..., description="Client identifier echoed back with the score")
+    tickers: list[str] = Field(..., min_length=2, max_length=50, description="List of ticker symbols")
+
+
+class BatchPortfolioRequest(BaseModel):
+    portfolios: list[BatchPortfolio] = Field(..., min_length=1, max_length=PORTFOLIO_BATCH_MAX)
+    period: Optional[str] = Field("3mo", description="Time period")
+    start_date: Optional[str] = None
+    end_date: Optional[str] = None
+
+
+class PortfolioScore(BaseModel):
+    id: str
+    tickers_found: list[str]
+    tickers_missing: list[str]
+    diversification_score: Optional[float] = None
+    risk_level: Optional[str] = None
+    avg_correlation: Optional[float] = None
+    max_correlation: Optional[StockCorrelation] = None
+    error: Optional[str] = None
+
+
 @router.post("/check", response_model=PortfolioResponse)
-async def check_portfolio(request: PortfolioRequest):
-    """Analyze portfolio diversification and risk."""
+async def check_portfolio(request: PortfolioRequest, http_request: Request):
+    """
+    Analyze portfolio diversification and risk.
+
+    With ?profile=1 and an admin token the check runs uncached under the
+    profiler; the saved profile's id is returned in the X-Profile-Id header.
+    """
     logger.info(f"Portfolio check: {len(request.tickers)} tickers")
+    profile = profile_requested(http_request)
 
     try:
         # Normalize tickers (add .NS suffix if no suffix present, for Indian stocks)
-        tickers = []
-        for t in request.tickers:
-            t = t.strip().upper()
-            if t:
-                tickers.append(t)
+        tickers = _normalize(request.tickers)
 
         if len(tickers) < 2:
             raise HTTPException(status_code=400, detail="At least 2 tickers required")
 
-        # Fetch prices
-        if request.start_date and request.end_date:
-            prices = fetch_prices_by_dates(tickers, request.start_date, request.end_date)
-        else:
-            prices = fetch_prices(tickers, request.period or "3mo")
+        if profile:
+            response, report = await run_in_threadpool(
+                profile_call, "portfolio/check", request.model_dump(), _check_uncached, tickers, request
+            )
+            return JSONResponse(response.model_dump(mode="json"), headers={"X-Profile-Id": report.id})
 
-        # Track which tickers were found
-        found = [c for c in prices.columns]
-        missing = [t for t in tickers if t not in found]
+        # Correlations (from cached index data where it covers the tickers)
+        corr_matrix = await _load_correlation(tickers, request)
+        return _portfolio_response(tickers, corr_matrix)
 
-        if len(found) < 2:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Only {len(found)} ticker(s) found. Need at least 2."
-            )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Portfolio check error: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Portfolio analysis failed: {e}")
 
-        # Compute returns and correlations
-        returns = compute_log_returns(prices)
-        returns = clean_data(returns)
-        corr_matrix = returns.corr()
 
+def _portfolio_response(tickers: list[str], corr_matrix: pd.DataFrame) -> PortfolioResponse:
+    """Score a portfolio from the correlation matrix of its tickers with data."""
+    # Track which tickers were found
+    found = corr_matrix.columns.tolist()
+    missing = [t for t in tickers if t not in found]
+
+    if len(found) < 2:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Only {len(found)} ticker(s) found. Need at least 2."
+        )
+
+    with stage("portfolio", "score"):
         # Extract pairwise correlations
         correlations = []
         corr_values = []
@@ -105,24 +151,7 @@ async def check_portfolio(request: PortfolioRequest):
         div_score = max(0.0, min(100.0, (1.0 - avg_corr) * 100))
 
         # Risk level
-        if div_score >= 70:
-            risk_level = "Low Risk"
-            risk_desc = (
-                "Your portfolio is well-diversified! These stocks move independently, "
-                "so a drop in one is unlikely to drag down the others."
-            )
-        elif div_score >= 40:
-            risk_level = "Moderate Risk"
-            risk_desc = (
-                "Your portfolio has moderate diversification. Some stocks move together, "
-                "which means partial correlation risk. Consider adding stocks from different sectors."
-            )
-        else:
-            risk_level = "High Risk"
-            risk_desc = (
-                "Your portfolio is highly concentrated! Most of these stocks move together, "
-                "meaning if one falls, they all likely fall. You need stocks from different sectors."
-            )
+        risk_level, risk_desc = _risk_profile(div_score)
 
         # Generate suggestions
         suggestions = _generate_suggestions(correlations, labels, avg_corr, div_score)
@@ -130,25 +159,246 @@ async def check_portfolio(request: PortfolioRequest):
         # Build matrix for frontend
         matrix_data = corr_matrix.round(3).values.tolist()
 
-        return PortfolioResponse(
+    return PortfolioResponse(
+        tickers_found=[_clean(t) for t in found],
+        tickers_missing=missing,
+        diversification_score=round(div_score, 1),
+        risk_level=risk_level,
+        risk_description=risk_desc,
+        avg_correlation=round(avg_corr, 3),
+        correlations=correlations,
+        correlation_matrix=matrix_data,
+        matrix_labels=labels,
+        suggestions=suggestions,
+        timestamp=datetime.utcnow().isoformat(),
+    )
+
+
+def _check_uncached(tickers: list[str], request: PortfolioRequest) -> PortfolioResponse:
+    """Portfolio check that skips cached index data and shared fetches (profiled requests)."""
+    with stage("portfolio", "fetch"):
+        prices = _fetch_portfolio_prices(tickers, request)
+    with stage("portfolio", "preprocess"):
+        returns = clean_data(compute_log_returns(prices))
+    with stage("portfolio", "correlation"):
+        corr_matrix = returns.corr()
+    return _portfolio_response(tickers, corr_matrix)
+
+
+@router.post("/batch")
+async def check_portfolio_batch(request: BatchPortfolioRequest):
+    """
+    Score many portfolios against one shared correlation matrix.
+
+    Prices for the union of all tickers are fetched once and correlated
+    once; every portfolio is then scored by slicing its sub-matrix out of
+    that matrix. Results stream back as NDJSON, one PortfolioScore per line,
+    in request order.
+    """
+    portfolios = [(p.id, _normalize(p.tickers)) for p in request.portfolios]
+    universe = sorted({t for _, tickers in portfolios for t in tickers})
+    logger.info(f"Portfolio batch: {len(portfolios)} portfolios, {len(universe)} distinct tickers")
+
+    if len(universe) > PORTFOLIO_BATCH_MAX_TICKERS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"{len(universe)} distinct tickers; the maximum per batch is {PORTFOLIO_BATCH_MAX_TICKERS}",
+        )
+
+    try:
+        corr_matrix = await _load_correlation(universe, request)
+    except Exception as e:
+        logger.error(f"Portfolio batch error: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Portfolio analysis failed: {e}")
+
+    return StreamingResponse(
+        _stream_scores(corr_matrix, portfolios),
+        media_type="application/x-ndjson",
+    )
+
+
+def _stream_scores(corr_matrix: pd.DataFrame, portfolios: list[tuple[str, list[str]]]) -> Iterator[bytes]:
+    """Score portfolios in chunks and yield one NDJSON block per chunk."""
+    for start in range(0, len(portfolios), PORTFOLIO_BATCH_CHUNK):
+        chunk = portfolios[start:start + PORTFOLIO_BATCH_CHUNK]
+        with stage("portfolio", "batch_score"):
+            scores = _score_portfolios(corr_matrix, chunk)
+        yield "".join(score.model_dump_json(exclude_none=True) + "\n" for score in scores).encode()
+
+
+def _score_portfolios(
+    corr_matrix: pd.DataFrame, portfolios: list[tuple[str, list[str]]]
+) -> list[PortfolioScore]:
+    """
+    Score a chunk of portfolios with one gather over the correlation matrix.
+
+    Each portfolio's member indices are padded to a common length m, so
+    corr[idx[:, :, None], idx[:, None, :]] is a (k × m × m) stack of
+    sub-matrices; masking padding, the diagonal and NaN pairs gives every
+    mean and maximum off-diagonal correlation in a few array operations.
+
+    Args:
+        corr_matrix: Correlation matrix over the batch's ticker union
+        portfolios: (id, normalized tickers) pairs
+
+    Returns:
+        One PortfolioScore per portfolio, in order
+    """
+    labels = corr_matrix.columns.tolist()
+    position = {t: i for i, t in enumerate(labels)}
+    members = [[position[t] for t in tickers if t in position] for _, tickers in portfolios]
+
+    m = max(2, max(len(idx) for idx in members))
+    padded = np.full((len(members), m), -1)
+    for row, idx in enumerate(members):
+        padded[row, :len(idx)] = idx
+    present = padded >= 0
+
+    values = corr_matrix.to_numpy(dtype=float)
+    safe = np.where(present, padded, 0)
+    sub = values[safe[:, :, None], safe[:, None, :]]
+    mask = present[:, :, None] & present[:, None, :] & ~np.eye(m, dtype=bool) & ~np.isnan(sub)
+
+    counts = mask.sum(axis=(1, 2))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        means = np.where(mask, sub, 0.0).sum(axis=(1, 2)) / counts
+    flat = np.where(mask, sub, -np.inf).reshape(len(members), -1).argmax(axis=1)
+    top_i, top_j = np.unravel_index(flat, (m, m))
+
+    scores = []
+    for row, ((pid, tickers), idx) in enumerate(zip(portfolios, members)):
+        found = [labels[i] for i in idx]
+        missing = [t for t in tickers if t not in position]
+        if len(found) < 2 or counts[row] == 0:
+            scores.append(PortfolioScore(
+                id=pid,
+                tickers_found=[_clean(t) for t in found],
+                tickers_missing=missing,
+                error=f"Only {len(found)} ticker(s) found. Need at least 2.",
+            ))
+            continue
+
+        avg_corr = float(means[row])
+        div_score = max(0.0, min(100.0, (1.0 - avg_corr) * 100))
+        u, v = padded[row, top_i[row]], padded[row, top_j[row]]
+        scores.append(PortfolioScore(
+            id=pid,
             tickers_found=[_clean(t) for t in found],
             tickers_missing=missing,
             diversification_score=round(div_score, 1),
-            risk_level=risk_level,
-            risk_description=risk_desc,
+            risk_level=_risk_profile(div_score)[0],
             avg_correlation=round(avg_corr, 3),
-            correlations=correlations,
-            correlation_matrix=matrix_data,
-            matrix_labels=labels,
-            suggestions=suggestions,
-            timestamp=datetime.utcnow().isoformat(),
+            max_correlation=StockCorrelation(
+                ticker1=_clean(labels[u]),
+                ticker2=_clean(labels[v]),
+                correlation=round(float(values[u, v]), 3),
+            ),
+        ))
+
+    return scores
+
+
+async def _load_correlation(
+    tickers: list[str], request: PortfolioRequest | BatchPortfolioRequest
+) -> pd.DataFrame:
+    """
+    Correlation matrix over the tickers that have usable data.
+
+    Index-level market data cached by /analyze for the same dates is used
+    first: if one entry covers every ticker its correlation matrix is simply
+    sliced. Otherwise the cached returns of the covered tickers are joined
+    with freshly fetched returns of the rest (which the price store usually
+    serves from disk) and correlated.
+    """
+    custom = bool(request.start_date and request.end_date)
+    cached = await run_in_threadpool(
+        cached_market_data,
+        tickers,
+        period=None if custom else request.period or "3mo",
+        start_date=request.start_date if custom else None,
+        end_date=request.end_date if custom else None,
+    )
+
+    for data in cached:
+        if set(tickers).issubset(data.tickers):
+            logger.info(f"Portfolio correlation sliced from cached index data ({len(tickers)} tickers)")
+            with stage("portfolio", "correlation"):
+                return data.correlation(tickers)
+
+    parts, covered = [], set()
+    for data in cached:
+        columns = [t for t in tickers if t in data.returns.columns and t not in covered]
+        if columns:
+            parts.append(data.returns[columns])
+            covered.update(columns)
+
+    uncovered = [t for t in tickers if t not in covered]
+    if uncovered:
+        try:
+            with stage("portfolio", "fetch"):
+                prices = await _fetch_inflight.run(
+                    _fetch_key(uncovered, request), _fetch_portfolio_prices, uncovered, request
+                )
+        except ValueError as e:
+            # None of the uncovered tickers has data: they are reported as missing
+            logger.warning(f"No price data for uncovered tickers {uncovered}: {e}")
+            prices = pd.DataFrame()
+        if not prices.empty:
+            with stage("portfolio", "preprocess"):
+                parts.append(clean_data(compute_log_returns(prices)))
+
+    if not parts:
+        return pd.DataFrame()
+
+    logger.info(
+        f"Portfolio correlation: {len(covered)} cached, {len(uncovered)} fetched tickers"
+    )
+    with stage("portfolio", "correlation"):
+        returns = pd.concat(parts, axis=1, join="inner")
+        order = [t for t in tickers if t in returns.columns]
+        return returns[order].corr()
+
+
+def _normalize(tickers: list[str]) -> list[str]:
+    """Strip and upper-case ticker symbols, dropping blanks and duplicates."""
+    return list(dict.fromkeys(t.strip().upper() for t in tickers if t.strip()))
+
+
+def _risk_profile(div_score: float) -> tuple[str, str]:
+    """Risk level and description for a diversification score."""
+    if div_score >= 70:
+        return "Low Risk", (
+            "Your portfolio is well-diversified! These stocks move independently, "
+            "so a drop in one is unlikely to drag down the others."
         )
-
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Portfolio check error: {e}", exc_info=True)
-        raise HTTPException(status_code=500, detail=f"Portfolio analysis failed: {e}")
+    if div_score >= 40:
+        return "Moderate Risk", (
+            "Your portfolio has moderate diversification. Some stocks move together, "
+            "which means partial correlation risk. Consider adding stocks from different sectors."
+        )
+    return "High Risk", (
+        "Your portfolio is highly concentrated! Most of these stocks move together, "
+        "meaning if one falls, they all likely fall. You need stocks from different sectors."
+    )
+
+
+def _fetch_key(tickers: list[str], request: PortfolioRequest | BatchPortfolioRequest) -> str:
+    custom = bool(request.start_date and request.end_date)
+    raw = json.dumps({
+        "tickers": sorted(set(tickers)),
+        "period": None if custom else request.period or "3mo",
+        "start_date": request.start_date if custom else None,
+        "end_date": request.end_date if custom else None,
+    }, sort_keys=True)
+    return hashlib.md5(raw.encode()).hexdigest()
+
+
+def _fetch_portfolio_prices(
+    tickers: list[str], request: PortfolioRequest | BatchPortfolioRequest
+) -> pd.DataFrame:
+    if request.start_date and request.end_date:
+        return fetch_prices_by_dates(tickers, request.start_date, request.end_date)
+    return fetch_prices(tickers, request.period or "3mo")
 
 
 def _generate_suggestions(correlations, labels, avg_corr, div_score):
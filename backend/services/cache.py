@@ -0,0 +1,272 @@
+"""
+Cache Module
+TTL caches behind one small interface (get / set / clear / len):
+a thread-safe in-process LRU (default), a Redis backend shared across
+processes and hosts, and a SQLite file backend shared by the worker
+processes of one host. Shared backends store pickled entries, so they
+must only be reachable by trusted MRIS processes.
+"""
+
+import os
+import time
+import pickle
+import sqlite3
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Optional
+
+from config import CACHE_BACKEND, CACHE_REDIS_URL, CACHE_SQLITE_PATH
+from services.metrics import CACHE_REQUESTS, CACHE_EVICTIONS
+
+logger = logging.getLogger(__name__)
+
+try:
+    import redis
+except ImportError:  # pragma: no cover - optional dependency
+    redis = None
+
+
+class TTLCache:
+    """
+    Least-recently-used cache whose entries expire after a fixed TTL.
+
+    Args:
+        name: Label used in log messages
+        max_size: Maximum number of entries kept
+        ttl: Seconds an entry stays valid
+    """
+
+    shared = False  # lookups are in-process and never block
+
+    def __init__(self, name: str, max_size: int, ttl: float):
+        self.name = name
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            if key in self._entries:
+                ts, value = self._entries[key]
+                if time.time() - ts < self.ttl:
+                    self._entries.move_to_end(key)
+                    CACHE_REQUESTS.inc(cache=self.name, result="hit")
+                    logger.info(f"Cache hit ({self.name}): {key}")
+                    return value
+                del self._entries[key]
+                CACHE_EVICTIONS.inc(cache=self.name)
+        CACHE_REQUESTS.inc(cache=self.name, result="miss")
+        return None
+
+    def set(self, key: str, value: Any):
+        with self._lock:
+            self._entries[key] = (time.time(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                CACHE_EVICTIONS.inc(cache=self.name)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def _dumps(value: Any) -> bytes:
+    return pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+class RedisCache:
+    """
+    Cache stored in Redis (or any Redis-protocol server), shared by every
+    process that points at the same server. Expiry uses the server's TTL;
+    size is bounded by the server's maxmemory/eviction policy rather than
+    an entry count. Server errors are logged and treated as misses.
+
+    Args:
+        name: Label used in log messages and the key namespace
+        ttl: Seconds an entry stays valid
+        url: Redis connection URL
+        prefix: Key prefix shared by all MRIS caches
+    """
+
+    shared = True
+
+    def __init__(self, name: str, ttl: float, url: str = CACHE_REDIS_URL, prefix: str = "mris"):
+        self.name = name
+        self.ttl = ttl
+        self.namespace = f"{prefix}:{name.replace(' ', '_')}:"
+        self._client = redis.Redis.from_url(url, socket_timeout=2, socket_connect_timeout=2)
+
+    def get(self, key: str) -> Optional[Any]:
+        try:
+            raw = self._client.get(self.namespace + key)
+        except redis.RedisError as e:
+            logger.warning(f"Cache get failed ({self.name}): {e}")
+            CACHE_REQUESTS.inc(cache=self.name, result="miss")
+            return None
+        if raw is None:
+            CACHE_REQUESTS.inc(cache=self.name, result="miss")
+            return None
+        CACHE_REQUESTS.inc(cache=self.name, result="hit")
+        logger.info(f"Cache hit ({self.name}): {key}")
+        return pickle.loads(raw)
+
+    def set(self, key: str, value: Any):
+        try:
+            self._client.set(self.namespace + key, _dumps(value), px=int(self.ttl * 1000))
+        except redis.RedisError as e:
+            logger.warning(f"Cache set failed ({self.name}): {e}")
+
+    def _keys(self) -> list:
+        return list(self._client.scan_iter(match=self.namespace + "*", count=500))
+
+    def clear(self):
+        try:
+            keys = self._keys()
+            if keys:
+                self._client.delete(*keys)
+        except redis.RedisError as e:
+            logger.warning(f"Cache clear failed ({self.name}): {e}")
+
+    def __len__(self) -> int:
+        try:
+            return len(self._keys())
+        except redis.RedisError:
+            return 0
+
+
+class SQLiteCache:
+    """
+    Cache stored in a SQLite file (WAL mode), shared by the processes of
+    one host. Entries carry an expiry and a last-access time; expired rows
+    are purged and the least recently used rows evicted on insert.
+    Database errors are logged and treated as misses.
+
+    Args:
+        name: Label used in log messages; also separates caches in the file
+        max_size: Maximum number of entries kept for this cache
+        ttl: Seconds an entry stays valid
+        path: SQLite database file
+    """
+
+    shared = True
+
+    def __init__(self, name: str, max_size: int, ttl: float, path: str = CACHE_SQLITE_PATH):
+        self.name = name
+        self.max_size = max_size
+        self.ttl = ttl
+        self.path = path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " cache TEXT NOT NULL, key TEXT NOT NULL, expires REAL NOT NULL,"
+                " accessed REAL NOT NULL, value BLOB NOT NULL, PRIMARY KEY (cache, key))"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        """One connection per thread (connections are not shared across threads)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        try:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT value FROM entries WHERE cache = ? AND key = ? AND expires > ?",
+                (self.name, key, now),
+            ).fetchone()
+            if row is None:
+                CACHE_REQUESTS.inc(cache=self.name, result="miss")
+                return None
+            conn.execute(
+                "UPDATE entries SET accessed = ? WHERE cache = ? AND key = ?", (now, self.name, key)
+            )
+        except sqlite3.Error as e:
+            logger.warning(f"Cache get failed ({self.name}): {e}")
+            CACHE_REQUESTS.inc(cache=self.name, result="miss")
+            return None
+        CACHE_REQUESTS.inc(cache=self.name, result="hit")
+        logger.info(f"Cache hit ({self.name}): {key}")
+        return pickle.loads(row[0])
+
+    def set(self, key: str, value: Any):
+        now = time.time()
+        try:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)",
+                    (self.name, key, now + self.ttl, now, _dumps(value)),
+                )
+                expired = conn.execute(
+                    "DELETE FROM entries WHERE cache = ? AND expires <= ?", (self.name, now)
+                ).rowcount
+                evicted = conn.execute(
+                    "DELETE FROM entries WHERE cache = ? AND key IN ("
+                    " SELECT key FROM entries WHERE cache = ? ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                    (self.name, self.name, self.max_size),
+                ).rowcount
+                conn.execute("COMMIT")
+                if expired + evicted > 0:
+                    CACHE_EVICTIONS.inc(expired + evicted, cache=self.name)
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        except sqlite3.Error as e:
+            logger.warning(f"Cache set failed ({self.name}): {e}")
+
+    def clear(self):
+        try:
+            self._connect().execute("DELETE FROM entries WHERE cache = ?", (self.name,))
+        except sqlite3.Error as e:
+            logger.warning(f"Cache clear failed ({self.name}): {e}")
+
+    def __len__(self) -> int:
+        try:
+            row = self._connect().execute(
+                "SELECT COUNT(*) FROM entries WHERE cache = ? AND expires > ?", (self.name, time.time())
+            ).fetchone()
+            return row[0]
+        except sqlite3.Error:
+            return 0
+
+
+def make_cache(name: str, max_size: int, ttl: float, backend: str = CACHE_BACKEND):
+    """
+    Create a cache with the configured backend (memory, redis or sqlite),
+    falling back to the in-process LRU when the backend is unavailable.
+
+    Args:
+        name: Label used in log messages and key namespaces
+        max_size: Maximum number of entries (memory and sqlite backends)
+        ttl: Seconds an entry stays valid
+        backend: memory, redis or sqlite
+
+    Returns:
+        TTLCache, RedisCache or SQLiteCache
+    """
+    if backend == "redis":
+        if redis is not None:
+            logger.info(f"Cache '{name}': redis backend at {CACHE_REDIS_URL}")
+            return RedisCache(name, ttl)
+        logger.warning("redis package not installed; using the in-memory cache")
+    elif backend == "sqlite":
+        logger.info(f"Cache '{name}': sqlite backend at {CACHE_SQLITE_PATH}")
+        return SQLiteCache(name, max_size, ttl)
+    elif backend != "memory":
+        logger.warning(f"Unknown cache backend '{backend}'; using the in-memory cache")
+    return TTLCache(name, max_size, ttl)
@@ -5,11 +5,45 @@ Computes correlation matrix and applies threshold filtering.
 
 import numpy as np
 import pandas as pd
+import scipy.sparse as sp
 import logging
+from dataclasses import dataclass
+
+from config import CORRELATION_BLOCK_SIZE
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class SparseAdjacency:
+    """
+    Thresholded correlation graph as an upper-triangular (i < j) CSR matrix
+    of signed correlations, with the tickers labelling its rows/columns.
+    Memory scales with the number of edges, not with the universe squared.
+    """
+    matrix: sp.csr_matrix
+    tickers: list[str]
+
+    @property
+    def edge_count(self) -> int:
+        return int(self.matrix.nnz)
+
+
+def _upper_adjacency(rows: list, cols: list, weights: list, tickers: list[str]) -> SparseAdjacency:
+    n = len(tickers)
+    matrix = sp.csr_matrix(
+        (
+            np.concatenate(weights) if weights else np.zeros(0),
+            (
+                np.concatenate(rows) if rows else np.zeros(0, dtype=int),
+                np.concatenate(cols) if cols else np.zeros(0, dtype=int),
+            ),
+        ),
+        shape=(n, n),
+    )
+    return SparseAdjacency(matrix=matrix, tickers=tickers)
+
+
 def compute_correlation_matrix(returns: pd.DataFrame) -> pd.DataFrame:
     """
     Compute Pearson correlation matrix from log returns.
@@ -25,36 +59,123 @@ def compute_correlation_matrix(returns: pd.DataFrame) -> pd.DataFrame:
     return corr_matrix
 
 
-def apply_threshold(
-    corr_matrix: pd.DataFrame, threshold: float = 0.6
-) -> pd.DataFrame:
+def threshold_correlation_blocked(
+    standardized: np.ndarray,
+    tickers: list[str],
+    threshold: float = 0.6,
+    block_size: int = CORRELATION_BLOCK_SIZE,
+) -> SparseAdjacency:
     """
-    Apply correlation threshold to create adjacency matrix.
-    Only keeps absolute correlations above the threshold.
-    Diagonal is set to 0 (no self-loops).
+    Thresholded correlation edges without materializing the full matrix.
+
+    The correlation matrix is produced tile by tile as products of row
+    blocks of the standardized returns (upper-triangle tiles only); each
+    tile is thresholded immediately, so peak memory is one
+    block_size × block_size tile plus the retained edges.
 
     Args:
-        corr_matrix: Full correlation matrix
+        standardized: Unit-norm centered returns, shape (n, T), from
+            preprocessor.standardize_returns
+        tickers: Labels for the rows of standardized
         threshold: Minimum absolute correlation to keep
+        block_size: Tickers per tile side
 
     Returns:
-        Filtered adjacency matrix (symmetric, 0-diagonal)
+        SparseAdjacency holding the signed correlations that pass the threshold
     """
-    # Create a fully writable numpy copy to avoid read-only array issues
-    values = corr_matrix.to_numpy(copy=True).astype(float)
+    n = standardized.shape[0]
+    rows, cols, weights = [], [], []
+
+    for i0 in range(0, n, block_size):
+        left = standardized[i0:i0 + block_size]
+        for j0 in range(i0, n, block_size):
+            tile = left @ standardized[j0:j0 + block_size].T
+            keep = np.abs(tile) >= threshold
+            if i0 == j0:
+                keep &= np.triu(np.ones(keep.shape, dtype=bool), k=1)
+            r, c = np.nonzero(keep)
+            rows.append(r + i0)
+            cols.append(c + j0)
+            weights.append(np.clip(tile[r, c], -1.0, 1.0))
+
+    adj = _upper_adjacency(rows, cols, weights, tickers)
+    logger.info(f"Blocked threshold {threshold} over {n} tickers: {adj.edge_count} edges retained")
+    return adj
 
-    # Zero out correlations below threshold
-    abs_values = np.abs(values)
-    values[abs_values < threshold] = 0.0
 
-    # Remove self-loops (diagonal)
-    np.fill_diagonal(values, 0.0)
+def compute_rolling_correlations(
+    values: np.ndarray, window: int, step: int = 1, batch_size: int = 32
+):
+    """
+    Compute correlation matrices for strided windows over one returns array.
+
+    Windows are taken as strided views (no copies of the returns) and
+    processed in batches with stacked matrix products, so the whole series
+    is covered in a few BLAS calls instead of one DataFrame.corr() per window.
+
+    Args:
+        values: Cleaned returns, shape (T, n)
+        window: Rows per window
+        step: Rows between consecutive window starts
+        batch_size: Windows per stacked matrix product (bounds memory to
+            batch_size × n × n)
+
+    Yields:
+        Tuples of (window start row, correlation matrix of shape (n, n))
+    """
+    values = np.asarray(values, dtype=float)
+    windows = np.lib.stride_tricks.sliding_window_view(values, window, axis=0)[::step]
+    starts = np.arange(0, len(values) - window + 1, step)
+
+    for lo in range(0, len(windows), batch_size):
+        batch = windows[lo:lo + batch_size]  # (b, n, window)
+        centered = batch - batch.mean(axis=2, keepdims=True)
+        cov = np.matmul(centered, centered.transpose(0, 2, 1))  # (b, n, n)
+        std = np.sqrt(np.einsum("bii->bi", cov))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            corr = cov / (std[:, :, None] * std[:, None, :])
+        np.clip(corr, -1.0, 1.0, out=corr)
+
+        for offset, matrix in enumerate(corr):
+            yield int(starts[lo + offset]), matrix
+
+    logger.info(f"Computed {len(windows)} rolling correlation matrices (window={window}, step={step})")
+
+
+def apply_threshold(
+    corr_matrix: pd.DataFrame, threshold: float = 0.6, block_size: int = CORRELATION_BLOCK_SIZE
+) -> SparseAdjacency:
+    """
+    Apply correlation threshold to create a sparse adjacency matrix.
+    Only keeps absolute correlations at or above the threshold, upper
+    triangle only (no self-loops, each edge once).
+
+    The matrix is scanned a block of rows at a time, so besides the input
+    only one block-sized mask and the retained edges are ever allocated.
+
+    Args:
+        corr_matrix: Full correlation matrix
+        threshold: Minimum absolute correlation to keep
+        block_size: Rows scanned per pass
+
+    Returns:
+        SparseAdjacency holding the signed correlations of retained edges
+    """
+    values = corr_matrix.to_numpy()
+    n = values.shape[0]
+    rows, cols, weights = [], [], []
 
-    # Reconstruct DataFrame
-    adj_matrix = pd.DataFrame(values, index=corr_matrix.index, columns=corr_matrix.columns)
+    for i0 in range(0, n, block_size):
+        block = values[i0:i0 + block_size, i0:]
+        r, c = np.nonzero(np.abs(block) >= threshold)
+        upper = c > r
+        r, c = r[upper] + i0, c[upper] + i0
+        rows.append(r)
+        cols.append(c)
+        weights.append(values[r, c])
 
-    edge_count = int((adj_matrix != 0).sum().sum()) // 2
+    adj = _upper_adjacency(rows, cols, weights, corr_matrix.columns.tolist())
     logger.info(
-        f"Threshold {threshold} applied: {edge_count} edges retained"
+        f"Threshold {threshold} applied: {adj.edge_count} edges retained"
     )
-    return adj_matrix
+    return adj
@@ -1,44 +1,140 @@
 """
 Data Fetcher Module
-Downloads historical adjusted closing prices using yfinance.
+Fetches historical adjusted closing prices from the configured price
+source (yfinance, local files or synthetic; see services.price_sources).
 Supports both preset period strings and custom date ranges.
+Network sources are served through the on-disk price store when it is
+enabled, so only missing tickers and trailing days hit the network. Large
+ticker lists are downloaded in bounded-concurrency chunks with per-chunk retry.
 """
 
-import yfinance as yf
+import time
 import pandas as pd
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
 
-logger = logging.getLogger(__name__)
+from config import FETCH_CHUNK_SIZE, FETCH_CONCURRENCY, FETCH_RETRIES, FETCH_RETRY_BACKOFF
+from services.price_store import get_price_store, period_to_range
+from services.price_sources import get_price_source
+from services.metrics import FETCH_BYTES, FETCH_TICKERS, FETCH_CHUNK_FAILURES
 
+logger = logging.getLogger(__name__)
 
-def _extract_prices(data, tickers: list[str]) -> pd.DataFrame:
-    """Extract Close prices from yfinance download result."""
-    if isinstance(data.columns, pd.MultiIndex):
-        prices = data["Close"]
-    else:
-        prices = data[["Close"]]
-        prices.columns = tickers[:1]
 
+def _extract_prices(prices: pd.DataFrame, tickers: list[str]) -> pd.DataFrame:
+    """Drop empty tickers from a Close price frame and validate the result."""
     prices = prices.dropna(axis=1, how="all")
 
     if prices.empty:
+        FETCH_TICKERS.inc(len(tickers), result="failed")
         raise ValueError("No price data returned for the given tickers and period.")
 
     successful = len(prices.columns)
     failed = len(tickers) - successful
+    FETCH_TICKERS.inc(successful, result="ok")
     if failed > 0:
+        FETCH_TICKERS.inc(failed, result="failed")
         logger.warning(f"{failed}/{len(tickers)} tickers returned no data")
 
     logger.info(f"Fetched prices: {successful} tickers, {len(prices)} trading days")
     return prices
 
 
+def _download(tickers: list[str], **kwargs) -> pd.DataFrame:
+    """
+    Download Close prices, splitting long ticker lists into chunks that are
+    fetched FETCH_CONCURRENCY at a time. A chunk that still fails after its
+    retries is logged and left out; the call fails only if every chunk does.
+    """
+    if len(tickers) <= FETCH_CHUNK_SIZE:
+        return _download_chunk(tickers, **kwargs)
+
+    chunks = [tickers[i:i + FETCH_CHUNK_SIZE] for i in range(0, len(tickers), FETCH_CHUNK_SIZE)]
+    logger.info(f"Downloading {len(tickers)} tickers in {len(chunks)} chunks")
+
+    def fetch(chunk):
+        try:
+            return _download_chunk(chunk, **kwargs)
+        except RuntimeError:
+            return None
+
+    with ThreadPoolExecutor(max_workers=FETCH_CONCURRENCY) as pool:
+        frames = list(pool.map(fetch, chunks))
+
+    failed = [chunk for chunk, frame in zip(chunks, frames) if frame is None]
+    if len(failed) == len(chunks):
+        raise RuntimeError("Failed to fetch price data: every download chunk failed")
+    if failed:
+        logger.error(f"{len(failed)}/{len(chunks)} download chunks failed after retries")
+
+    frames = [frame for frame in frames if frame is not None and not frame.empty]
+    return pd.concat(frames, axis=1).sort_index() if frames else pd.DataFrame()
+
+
+def _download_chunk(tickers: list[str], **kwargs) -> pd.DataFrame:
+    """
+    Download one chunk, retrying with exponential backoff on errors and,
+    for sources whose misses may be transient (rate limits), re-requesting
+    only the tickers that came back missing or all-NaN.
+
+    A chunk that still has missing tickers after the last attempt counts
+    as a chunk failure; the tickers that did arrive are returned.
+
+    Raises:
+        RuntimeError: The source failed on the last attempt and no ticker
+            of the chunk was downloaded
+    """
+    retry_missing = get_price_source().transient_misses
+    frames, pending = [], list(tickers)
+
+    for attempt in range(FETCH_RETRIES + 1):
+        error = None
+        try:
+            prices = _download_once(pending, **kwargs).dropna(axis=1, how="all")
+        except RuntimeError as e:
+            error = e
+        else:
+            received = [t for t in pending if t in prices.columns]
+            if received:
+                frames.append(prices[received])
+            pending = [t for t in pending if t not in prices.columns]
+            if not pending or not retry_missing:
+                break
+
+        if attempt == FETCH_RETRIES:
+            FETCH_CHUNK_FAILURES.inc()
+            if error is not None and not frames:
+                raise error
+            break
+        delay = FETCH_RETRY_BACKOFF * 2 ** attempt
+        logger.warning(f"Retrying download of {len(pending)} tickers in {delay:.1f}s")
+        time.sleep(delay)
+
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, axis=1).sort_index() if len(frames) > 1 else frames[0]
+
+
+def _download_once(tickers: list[str], **kwargs) -> pd.DataFrame:
+    """Download Close prices from the configured price source."""
+    prices = get_price_source().download(tickers, **kwargs)
+    FETCH_BYTES.inc(int(prices.memory_usage(index=True).sum()))
+    return prices
+
+
+def _download_range(tickers: list[str], start: date, end: date) -> pd.DataFrame:
+    """Download closes for [start, end); used by the price store for top-ups."""
+    logger.info(f"Downloading {len(tickers)} tickers, start={start}, end={end}")
+    return _download(tickers, start=start.isoformat(), end=end.isoformat())
+
+
 def fetch_prices(tickers: list[str], period: str = "3mo") -> pd.DataFrame:
     """
     Fetch adjusted closing prices using a preset period string.
 
     Args:
-        tickers: List of Yahoo Finance ticker symbols
+        tickers: List of ticker symbols
         period: Time period string (1mo, 3mo, 6mo, 1y)
 
     Returns:
@@ -46,19 +142,16 @@ def fetch_prices(tickers: list[str], period: str = "3mo") -> pd.DataFrame:
     """
     logger.info(f"Fetching prices for {len(tickers)} tickers, period={period}")
 
-    try:
-        data = yf.download(
-            tickers=tickers,
-            period=period,
-            auto_adjust=True,
-            progress=False,
-            threads=True,
-        )
-    except Exception as e:
-        logger.error(f"yfinance download failed: {e}")
-        raise RuntimeError(f"Failed to fetch price data: {e}")
+    source = get_price_source()
+    store = get_price_store(source.name) if source.uses_store else None
+    date_range = period_to_range(period)
+
+    if store is not None and date_range is not None:
+        prices = store.get_prices(tickers, *date_range, _download_range)
+    else:
+        prices = _download(tickers, period=period)
 
-    return _extract_prices(data, tickers)
+    return _extract_prices(prices, tickers)
 
 
 def fetch_prices_by_dates(
@@ -68,7 +161,7 @@ def fetch_prices_by_dates(
     Fetch adjusted closing prices for a custom date range.
 
     Args:
-        tickers: List of Yahoo Finance ticker symbols
+        tickers: List of ticker symbols
         start_date: Start date string (YYYY-MM-DD)
         end_date: End date string (YYYY-MM-DD)
 
@@ -80,17 +173,13 @@ def fetch_prices_by_dates(
         f"start={start_date}, end={end_date}"
     )
 
-    try:
-        data = yf.download(
-            tickers=tickers,
-            start=start_date,
-            end=end_date,
-            auto_adjust=True,
-            progress=False,
-            threads=True,
-        )
-    except Exception as e:
-        logger.error(f"yfinance download failed: {e}")
-        raise RuntimeError(f"Failed to fetch price data: {e}")
-
-    return _extract_prices(data, tickers)
+    source = get_price_source()
+    store = get_price_store(source.name) if source.uses_store else None
+
+    if store is not None:
+        start, end = date.fromisoformat(start_date), date.fromisoformat(end_date)
+        prices = store.get_prices(tickers, start, end, _download_range)
+    else:
+        prices = _download(tickers, start=start_date, end=end_date)
+
+    return _extract_prices(prices, tickers)
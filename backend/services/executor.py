@@ -0,0 +1,129 @@
+"""
+Executor Module
+Process pool for the CPU-bound pipeline stages (correlation, graph,
+centrality, clustering), so they run outside the API process's GIL and
+event loop. Workers are spawned at startup with the scientific stack
+already imported.
+"""
+
+import os
+import time
+import logging
+import threading
+import multiprocessing
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Iterable, Optional
+
+from config import PIPELINE_WORKERS
+
+logger = logging.getLogger(__name__)
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+_local = threading.local()
+
+
+def _warm_worker():
+    """Worker initializer: import the heavy modules once per process."""
+    import numpy  # noqa: F401
+    import pandas  # noqa: F401
+    import networkx  # noqa: F401
+    import community  # noqa: F401
+    import scipy.sparse.csgraph  # noqa: F401
+    import services.correlation_engine  # noqa: F401
+    import services.network_analysis  # noqa: F401
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+def start_pool(workers: int = PIPELINE_WORKERS):
+    """
+    Create the worker pool and wait for every worker to finish warming up.
+    With workers=0 the pipeline stages run inline in the calling thread.
+    """
+    global _pool
+    if workers <= 0:
+        logger.info("Pipeline process pool disabled; CPU stages run in-process")
+        return
+
+    with _pool_lock:
+        if _pool is not None:
+            return
+        start = time.perf_counter()
+        _pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_warm_worker,
+        )
+        pids = {f.result() for f in [_pool.submit(_ping) for _ in range(workers * 2)]}
+
+    logger.info(
+        f"Pipeline process pool ready: {len(pids)} warm worker(s) "
+        f"in {time.perf_counter() - start:.2f}s"
+    )
+
+
+def shutdown_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+@contextmanager
+def run_inline():
+    """Run pipeline stages submitted from the current thread inline (e.g. to profile them)."""
+    previous = getattr(_local, "inline", False)
+    _local.inline = True
+    try:
+        yield
+    finally:
+        _local.inline = previous
+
+
+def _current_pool() -> Optional[ProcessPoolExecutor]:
+    return None if getattr(_local, "inline", False) else _pool
+
+
+def run_cpu(func: Callable[..., Any], *args) -> Any:
+    """
+    Run a CPU-bound, picklable function in the worker pool and block for the result.
+
+    Falls back to running inline when the pool is disabled, not started, or
+    broken (a crashed worker); a broken pool is replaced for later calls.
+    """
+    global _pool
+    pool = _current_pool()
+    if pool is None:
+        return func(*args)
+
+    try:
+        return pool.submit(func, *args).result()
+    except BrokenProcessPool:
+        logger.error("Pipeline process pool broke; restarting and running inline")
+        with _pool_lock:
+            if _pool is pool:
+                _pool = None
+        threading.Thread(target=start_pool, daemon=True).start()
+        return func(*args)
+
+
+def map_cpu(func: Callable[..., Any], *iterables: Iterable, chunksize: int = 1) -> list:
+    """
+    Map a CPU-bound, picklable function over argument iterables in the worker
+    pool, preserving order. Runs inline when the pool is unavailable.
+    """
+    pool = _current_pool()
+    if pool is None:
+        return list(map(func, *iterables))
+
+    try:
+        return list(pool.map(func, *iterables, chunksize=chunksize))
+    except BrokenProcessPool:
+        logger.error("Pipeline process pool broke during map; running inline")
+        return list(map(func, *iterables))
@@ -1,49 +1,162 @@
 """
 Graph Builder Module
-Constructs a NetworkX graph from adjacency matrix and computes centrality metrics.
+Constructs a NetworkX or array-backed graph from the adjacency matrix
+and computes centrality metrics.
 """
 
 import networkx as nx
 import numpy as np
 import pandas as pd
+import scipy.sparse as sp
+from scipy.sparse import csgraph
 import logging
-from config import INFLUENCE_WEIGHTS
+from dataclasses import dataclass
+from typing import Optional, Union
+from config import (
+    INFLUENCE_WEIGHTS, CENTRALITY_MODES, CENTRALITY_EXACT_MAX_NODES,
+    CENTRALITY_SAMPLES, CENTRALITY_SEED,
+)
+from services.correlation_engine import SparseAdjacency
 
 logger = logging.getLogger(__name__)
 
+Adjacency = Union[SparseAdjacency, pd.DataFrame, np.ndarray, sp.spmatrix]
 
-def build_graph(adj_matrix: pd.DataFrame) -> nx.Graph:
+
+@dataclass
+class ArrayGraph:
     """
-    Build a weighted undirected graph from the adjacency matrix.
+    Lightweight array-backed undirected graph.
+
+    Stores each edge once (u < v) as parallel integer/float arrays, for
+    stages that only need degrees, edge lists or a sparse matrix and not a
+    full NetworkX object.
+    """
+    nodes: list[str]
+    rows: np.ndarray
+    cols: np.ndarray
+    weights: np.ndarray
+
+    def number_of_nodes(self) -> int:
+        return len(self.nodes)
+
+    def number_of_edges(self) -> int:
+        return len(self.weights)
+
+    def degrees(self) -> np.ndarray:
+        """Unweighted degree of every node, in node order."""
+        n = len(self.nodes)
+        return np.bincount(self.rows, minlength=n) + np.bincount(self.cols, minlength=n)
+
+    def to_csr(self) -> sp.csr_matrix:
+        """Symmetric weighted adjacency as a CSR matrix."""
+        n = len(self.nodes)
+        upper = sp.coo_matrix((self.weights, (self.rows, self.cols)), shape=(n, n))
+        return (upper + upper.T).tocsr()
+
+    def to_networkx(self) -> nx.Graph:
+        G = nx.Graph()
+        G.add_nodes_from(self.nodes)
+        names = np.asarray(self.nodes, dtype=object)
+        G.add_weighted_edges_from(
+            zip(names[self.rows], names[self.cols], self.weights.tolist())
+        )
+        return G
+
+
+def build_array_graph(adj_matrix: Adjacency, tickers: Optional[list[str]] = None) -> ArrayGraph:
+    """
+    Extract the upper-triangle non-zero edges of an adjacency matrix in one
+    vectorized pass.
 
     Args:
-        adj_matrix: Filtered correlation adjacency matrix
+        adj_matrix: Filtered correlation adjacency as a SparseAdjacency
+            (from apply_threshold), DataFrame, dense array or scipy.sparse
+            matrix (symmetric or upper-triangular)
+        tickers: Node labels; required for bare arrays and sparse matrices
 
     Returns:
-        NetworkX Graph with weighted edges
+        ArrayGraph with absolute correlations as edge weights
     """
-    G = nx.Graph()
+    if isinstance(adj_matrix, SparseAdjacency):
+        tickers = adj_matrix.tickers
+        adj_matrix = adj_matrix.matrix
+    elif isinstance(adj_matrix, pd.DataFrame):
+        tickers = adj_matrix.columns.tolist()
+        adj_matrix = adj_matrix.to_numpy()
+    elif tickers is None:
+        raise ValueError("tickers are required for a bare adjacency array or matrix")
+
+    if sp.issparse(adj_matrix):
+        upper = sp.triu(adj_matrix, k=1).tocoo()
+        upper.eliminate_zeros()
+        rows, cols, weights = upper.row, upper.col, upper.data
+    else:
+        rows, cols = np.nonzero(np.triu(adj_matrix, k=1))
+        weights = adj_matrix[rows, cols]
+
+    return ArrayGraph(
+        nodes=list(tickers),
+        rows=rows.astype(np.int64, copy=False),
+        cols=cols.astype(np.int64, copy=False),
+        weights=np.abs(weights).astype(float, copy=False),
+    )
 
-    tickers = adj_matrix.columns.tolist()
-    G.add_nodes_from(tickers)
 
-    # Add edges where adjacency is non-zero
-    for i in range(len(tickers)):
-        for j in range(i + 1, len(tickers)):
-            weight = adj_matrix.iloc[i, j]
-            if weight != 0:
-                G.add_edge(tickers[i], tickers[j], weight=abs(weight))
+def build_graph(adj_matrix: Adjacency, tickers: Optional[list[str]] = None) -> nx.Graph:
+    """
+    Build a weighted undirected graph from the adjacency matrix.
+
+    Args:
+        adj_matrix: Filtered correlation adjacency (SparseAdjacency, DataFrame,
+            dense array or scipy.sparse matrix)
+        tickers: Node labels; required for bare arrays and sparse matrices
+
+    Returns:
+        NetworkX Graph with weighted edges
+    """
+    G = build_array_graph(adj_matrix, tickers).to_networkx()
 
     logger.info(f"Built graph: {G.number_of_nodes()} nodes, {G.number_of_edges()} edges")
     return G
 
 
-def compute_centrality(G: nx.Graph) -> dict:
+def select_centrality_mode(num_nodes: int, mode: str = "auto") -> str:
+    """
+    Resolve the centrality accuracy mode for a graph of the given size.
+
+    Args:
+        num_nodes: Number of nodes in the graph
+        mode: auto, exact or approximate
+
+    Returns:
+        exact or approximate
+    """
+    if mode not in CENTRALITY_MODES:
+        raise ValueError(f"Unknown centrality mode '{mode}'. Valid: {list(CENTRALITY_MODES)}")
+    if mode == "auto":
+        return "exact" if num_nodes <= CENTRALITY_EXACT_MAX_NODES else "approximate"
+    return mode
+
+
+def compute_centrality(
+    G: nx.Graph,
+    mode: str = "exact",
+    samples: int = CENTRALITY_SAMPLES,
+    seed: int = CENTRALITY_SEED,
+) -> dict:
     """
     Compute degree, betweenness, and closeness centrality for all nodes.
 
+    Betweenness is exact (Brandes) or estimated from a seeded sample of
+    pivot nodes; closeness always comes from BFS distances computed by
+    scipy.sparse.csgraph, which matches NetworkX's values.
+
     Args:
         G: NetworkX graph
+        mode: exact, approximate or auto (see select_centrality_mode)
+        samples: Number of pivot nodes for approximate betweenness
+        seed: Random seed for pivot sampling
 
     Returns:
         Dictionary of {node: {degree, betweenness, closeness}}
@@ -51,9 +164,12 @@ def compute_centrality(G: nx.Graph) -> dict:
     if G.number_of_nodes() == 0:
         return {}
 
+    mode = select_centrality_mode(G.number_of_nodes(), mode)
+    pivots = None if mode == "exact" or samples >= G.number_of_nodes() else samples
+
     degree_c = nx.degree_centrality(G)
-    betweenness_c = nx.betweenness_centrality(G, weight="weight")
-    closeness_c = nx.closeness_centrality(G)
+    betweenness_c = nx.betweenness_centrality(G, k=pivots, seed=seed, weight="weight")
+    closeness_c = _sparse_closeness(G)
 
     centralities = {}
     for node in G.nodes():
@@ -66,6 +182,34 @@ def compute_centrality(G: nx.Graph) -> dict:
     return centralities
 
 
+def _sparse_closeness(G: nx.Graph, chunk_size: int = 256) -> dict:
+    """
+    Unweighted closeness centrality (Wasserman-Faust normalization, as in
+    nx.closeness_centrality) from csgraph BFS distances, computed a chunk of
+    source rows at a time to bound memory.
+    """
+    nodes = list(G.nodes())
+    n = len(nodes)
+    if n < 2:
+        return {node: 0.0 for node in nodes}
+
+    adjacency = nx.to_scipy_sparse_array(G, nodelist=nodes, weight=None, format="csr")
+    closeness = np.zeros(n)
+
+    for lo in range(0, n, chunk_size):
+        dist = csgraph.shortest_path(
+            adjacency, directed=False, unweighted=True, indices=np.arange(lo, min(n, lo + chunk_size))
+        )
+        reachable = np.isfinite(dist)
+        reached = reachable.sum(axis=1) - 1
+        total = np.where(reachable, dist, 0).sum(axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            values = np.where(total > 0, (reached / total) * (reached / (n - 1)), 0.0)
+        closeness[lo:lo + len(values)] = values
+
+    return dict(zip(nodes, closeness.tolist()))
+
+
 def compute_influence_scores(centralities: dict) -> dict:
     """
     Compute a composite influence score for each node.
@@ -0,0 +1,89 @@
+"""
+Graph Diff Module
+Computes compact patches between successive GraphResponse snapshots
+for delta-encoded live updates.
+"""
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+_NODE_METRICS = ("influence_score", "connections")
+_CENTRALITY_METRICS = ("degree", "betweenness", "closeness")
+
+
+def diff_snapshots(prev: dict, curr: dict, tolerance: float = 1e-3) -> dict:
+    """
+    Describe how to turn one serialized GraphResponse into the next.
+
+    Args:
+        prev: Previous snapshot (GraphResponse as a JSON-compatible dict)
+        curr: Current snapshot
+        tolerance: Minimum absolute change for a weight or metric to be reported
+
+    Returns:
+        Patch dict with edges_added, edges_removed, edges_updated (each
+        [source, target, weight] or [source, target]), nodes_added,
+        nodes_removed, nodes_changed (full node entries), cluster_changes
+        ({node: cluster_id}) and the small top-level fields (stats,
+        timestamp, plus clusters/insights when they changed)
+    """
+    prev_edges = {_edge_key(e): e["weight"] for e in prev["edges"]}
+    curr_edges = {_edge_key(e): e["weight"] for e in curr["edges"]}
+
+    edges_added = [[s, t, w] for (s, t), w in curr_edges.items() if (s, t) not in prev_edges]
+    edges_removed = [[s, t] for (s, t) in prev_edges if (s, t) not in curr_edges]
+    edges_updated = [
+        [s, t, w] for (s, t), w in curr_edges.items()
+        if (s, t) in prev_edges and abs(w - prev_edges[(s, t)]) > tolerance
+    ]
+
+    prev_nodes = {n["id"]: n for n in prev["nodes"]}
+    curr_nodes = {n["id"]: n for n in curr["nodes"]}
+
+    nodes_added = [n for nid, n in curr_nodes.items() if nid not in prev_nodes]
+    nodes_removed = [nid for nid in prev_nodes if nid not in curr_nodes]
+    nodes_changed = [
+        n for nid, n in curr_nodes.items()
+        if nid in prev_nodes and _node_changed(prev_nodes[nid], n, tolerance)
+    ]
+    cluster_changes = {
+        nid: n["cluster_id"] for nid, n in curr_nodes.items()
+        if nid in prev_nodes and prev_nodes[nid]["cluster_id"] != n["cluster_id"]
+    }
+
+    patch = {
+        "edges_added": edges_added,
+        "edges_removed": edges_removed,
+        "edges_updated": edges_updated,
+        "nodes_added": nodes_added,
+        "nodes_removed": nodes_removed,
+        "nodes_changed": nodes_changed,
+        "cluster_changes": cluster_changes,
+        "stats": curr["stats"],
+        "timestamp": curr["timestamp"],
+    }
+    if curr["clusters"] != prev["clusters"]:
+        patch["clusters"] = curr["clusters"]
+    if curr["insights"] != prev["insights"]:
+        patch["insights"] = curr["insights"]
+
+    logger.info(
+        f"Graph diff: +{len(edges_added)}/-{len(edges_removed)}/~{len(edges_updated)} edges, "
+        f"{len(nodes_changed)} nodes changed, {len(cluster_changes)} reassigned"
+    )
+    return patch
+
+
+def _edge_key(edge: dict) -> tuple[str, str]:
+    s, t = edge["source"], edge["target"]
+    return (s, t) if s <= t else (t, s)
+
+
+def _node_changed(old: dict, new: dict, tolerance: float) -> bool:
+    if any(abs(new[m] - old[m]) > tolerance for m in _NODE_METRICS):
+        return True
+    return any(
+        abs(new["centrality"][m] - old["centrality"][m]) > tolerance
+        for m in _CENTRALITY_METRICS
+    )
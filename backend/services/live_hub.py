@@ -0,0 +1,250 @@
+"""
+Live Hub Module
+Shared-subscription fan-out for Server-Sent Events.
+One refresh task runs per distinct topic; its serialized events are
+delivered to every subscriber through bounded per-client queues.
+Subscribers choose full snapshots on every refresh or delta mode
+(one snapshot, then sequence-numbered patches), and a wire format:
+SSE text or length-prefixed MessagePack frames. Each event is encoded
+once per wire format in use.
+"""
+
+import asyncio
+import json
+import time
+import uuid
+import logging
+from datetime import datetime
+from typing import Awaitable, Callable, Optional
+
+from services.serialization import encode_frame
+
+logger = logging.getLogger(__name__)
+
+Producer = Callable[[], Awaitable[dict]]
+Differ = Callable[[dict, dict], dict]
+
+
+class Subscription:
+    """A single client's view of a topic: a bounded queue of encoded events."""
+
+    def __init__(self, topic: "Topic", max_queue: int, mode: str, wire: str = "sse"):
+        self.id = uuid.uuid4().hex
+        self.topic = topic
+        self.mode = mode
+        self.wire = wire
+        self.queue: asyncio.Queue[Optional[bytes]] = asyncio.Queue(maxsize=max_queue)
+        self.dropped = False
+        self.overflowed = False
+
+    def offer(self, event: bytes) -> bool:
+        """Enqueue without blocking; returns False if the client is too slow."""
+        try:
+            self.queue.put_nowait(event)
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    def reset(self, event: Optional[bytes]):
+        """Discard pending events and enqueue a single replacement event."""
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(event)
+
+    def close(self):
+        """Wake the consumer with an end-of-stream marker."""
+        self.reset(None)
+
+    async def events(self):
+        """Yield encoded events until the subscription is closed."""
+        while True:
+            event = await self.queue.get()
+            if event is None:
+                return
+            self.overflowed = False
+            yield event
+
+
+class Topic:
+    """One refresh loop shared by every subscriber with the same key."""
+
+    def __init__(
+        self, key: str, producer: Producer, differ: Differ, interval: float, heartbeat: float
+    ):
+        self.key = key
+        self.producer = producer
+        self.differ = differ
+        self.interval = interval
+        self.heartbeat = heartbeat
+        self.subscribers: set[Subscription] = set()
+        # Start from a clock-based value so sequence numbers from an earlier
+        # run of the same topic never look current to a reconnecting client
+        self.seq = int(time.time() * 1000)
+        self.snapshot: Optional[dict] = None
+        self.patch: Optional[dict] = None
+        self._encoded: dict[tuple[str, str], bytes] = {}
+        self.task: Optional[asyncio.Task] = None
+
+    def event(self, kind: str, wire: str) -> Optional[bytes]:
+        """
+        The current update/snapshot/patch event in a wire format, encoded on
+        first use and shared by every subscriber on that wire.
+        """
+        data = self.patch if kind == "patch" else self.snapshot
+        if data is None:
+            return None
+        encoded = self._encoded.get((kind, wire))
+        if encoded is None:
+            encoded = encode_event(kind, data, self.seq, wire)
+            self._encoded[(kind, wire)] = encoded
+        return encoded
+
+    def publish(self, snapshot: dict):
+        """Store a new snapshot (and the patch from the previous one) and fan it out."""
+        prev = self.snapshot
+        self.seq += 1
+        self.snapshot = snapshot
+        self.patch = None
+        if prev is not None:
+            self.patch = {"seq": self.seq, "base_seq": self.seq - 1, **self.differ(prev, snapshot)}
+        self._encoded = {}
+
+        for sub in list(self.subscribers):
+            if sub.mode == "full":
+                self.deliver(sub, self.event("update", sub.wire))
+            else:
+                self.deliver(sub, self.event("patch", sub.wire) or self.event("snapshot", sub.wire))
+
+    def broadcast(self, event: str, data: dict):
+        encoded: dict[str, bytes] = {}
+        for sub in list(self.subscribers):
+            if sub.wire not in encoded:
+                encoded[sub.wire] = encode_event(event, data, wire=sub.wire)
+            self.deliver(sub, encoded[sub.wire])
+
+    def deliver(self, sub: Subscription, event: bytes):
+        if sub.offer(event):
+            return
+        snapshot_event = self.event("snapshot", sub.wire)
+        if sub.mode == "delta" and not sub.overflowed and snapshot_event is not None:
+            # Gap: skip the backlog and resync with the latest snapshot
+            logger.info(f"Live topic {self.key}: resyncing lagging subscriber {sub.id}")
+            sub.overflowed = True
+            sub.reset(snapshot_event)
+            return
+        logger.warning(f"Live topic {self.key}: dropping slow subscriber {sub.id}")
+        sub.dropped = True
+        self.subscribers.discard(sub)
+        sub.close()
+
+    async def run(self):
+        while True:
+            try:
+                self.publish(await self.producer())
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Live topic {self.key} refresh failed: {e}")
+                self.broadcast("error", {"error": str(e)})
+
+            if not self.subscribers:
+                return  # Every subscriber was dropped
+            logger.info(f"Live topic {self.key}: seq {self.seq} sent to {len(self.subscribers)} subscriber(s)")
+
+            # Wait for the refresh interval, sending heartbeats
+            elapsed = 0.0
+            while elapsed < self.interval:
+                step = min(self.heartbeat, self.interval - elapsed)
+                await asyncio.sleep(step)
+                elapsed += step
+                ts = datetime.utcnow().isoformat() + "Z"
+                next_in = max(0, int(self.interval - elapsed))
+                self.broadcast("ping", {"ts": ts, "next_in": next_in})
+                if not self.subscribers:
+                    return
+
+
+class LiveHub:
+    """
+    Registry of live topics.
+
+    Args:
+        heartbeat: Seconds between ping events
+        max_queue: Maximum pending events per subscriber before it is
+            resynced (delta mode) or dropped
+    """
+
+    def __init__(self, heartbeat: float, max_queue: int):
+        self.heartbeat = heartbeat
+        self.max_queue = max_queue
+        self._topics: dict[str, Topic] = {}
+        self._subscriptions: dict[str, Subscription] = {}
+
+    def subscribe(
+        self,
+        key: str,
+        producer: Producer,
+        differ: Differ,
+        interval: float,
+        mode: str = "full",
+        last_seq: Optional[int] = None,
+        wire: str = "sse",
+    ) -> Subscription:
+        """
+        Join the topic for key, starting its refresh task if it is new.
+
+        A late joiner immediately receives the topic's latest state: the full
+        update in full mode, or a snapshot in delta mode unless last_seq
+        (from the client's Last-Event-ID) shows it is already current.
+        """
+        topic = self._topics.get(key)
+        if topic is None or topic.task.done():
+            topic = Topic(key, producer, differ, interval, self.heartbeat)
+            self._topics[key] = topic
+            topic.task = asyncio.create_task(topic.run())
+            logger.info(f"Live topic started: {key}")
+
+        sub = Subscription(topic, self.max_queue, mode, wire)
+        topic.subscribers.add(sub)
+        self._subscriptions[sub.id] = sub
+
+        sub.offer(encode_event("subscribed", {"subscription_id": sub.id, "mode": mode}, wire=wire))
+        if mode == "full" and topic.snapshot is not None:
+            sub.offer(topic.event("update", wire))
+        elif mode == "delta" and topic.snapshot is not None and last_seq != topic.seq:
+            sub.offer(topic.event("snapshot", wire))
+        return sub
+
+    def resync(self, subscription_id: str) -> bool:
+        """Send the latest snapshot to one subscriber; returns False if unknown."""
+        sub = self._subscriptions.get(subscription_id)
+        if sub is None or sub.dropped:
+            return False
+        if sub.topic.snapshot is not None:
+            sub.topic.deliver(sub, sub.topic.event("snapshot", sub.wire))
+        return True
+
+    def unsubscribe(self, sub: Subscription):
+        """Leave a topic; the refresh task stops when its last subscriber leaves."""
+        topic = sub.topic
+        topic.subscribers.discard(sub)
+        self._subscriptions.pop(sub.id, None)
+        if not topic.subscribers and self._topics.get(topic.key) is topic:
+            del self._topics[topic.key]
+            if topic.task is not None:
+                topic.task.cancel()
+            logger.info(f"Live topic stopped: {topic.key}")
+
+    def stats(self) -> dict:
+        return {
+            "topics": len(self._topics),
+            "subscribers": sum(len(t.subscribers) for t in self._topics.values()),
+        }
+
+
+def encode_event(event: str, data: dict, event_id: Optional[int] = None, wire: str = "sse") -> bytes:
+    """Encode one event as a Server-Sent Event or a MessagePack frame."""
+    if wire == "msgpack":
+        return encode_frame(event, data, event_id)
+    id_line = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{id_line}event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n".encode()
@@ -0,0 +1,239 @@
+"""
+Metrics Module
+In-process counters, gauges and histograms rendered in the Prometheus text
+exposition format for the /metrics endpoint. Recording is a lock and a dict
+update, so instrumenting hot paths costs next to nothing.
+
+Worker processes do not share these objects: stages that run in the pool
+return their timings (StageTimer) and the API process records them.
+Stage timings are also handed to the profile session of the current
+thread, if one is active (see services.profiler).
+"""
+
+import math
+import time
+import threading
+from contextlib import contextmanager
+from typing import Iterable, Optional
+
+# Seconds; covers cache-speed stages up to multi-minute large-universe fetches
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: Iterable[str] = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values: dict[tuple, object] = {}
+        self._lock = threading.Lock()
+        REGISTRY.register(self)
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(labels.get(name, "") for name in self.labels)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in sorted(items):
+            lines.append(f"{self.name}{_format_labels(self.labels, key)} {_format_value(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Gauge(_Metric):
+    """Value that can go up and down (last value wins)."""
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+
+class Histogram(_Metric):
+    """Distribution of observations in cumulative buckets, with sum and count."""
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Iterable[str] = (), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = [[0] * len(self.buckets), 0.0]
+            counts = series[0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            series[1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the wall time of a with-block."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = [(key, list(series[0]), series[1]) for key, series in self._values.items()]
+        for key, counts, total in sorted(items):
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, le)} {cumulative}")
+            labels = _format_labels(self.labels, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: list[_Metric] = []
+
+    def register(self, metric: _Metric):
+        self._metrics.append(metric)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text format (version 0.0.4)."""
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+# ── Stage Timing ────────────────────────────────────────────────────
+
+class ProfileSession:
+    """Per-stage wall and CPU seconds collected while a request is profiled."""
+
+    def __init__(self):
+        self.stages: dict[str, dict[str, float]] = {}
+
+    def record(self, stage: str, wall: float, cpu: Optional[float] = None):
+        entry = self.stages.setdefault(stage, {"wall_seconds": 0.0, "cpu_seconds": 0.0})
+        entry["wall_seconds"] += wall
+        if cpu is not None:
+            entry["cpu_seconds"] += cpu
+
+
+_profiling = threading.local()
+
+
+def set_profile_session(session: Optional[ProfileSession]):
+    """Attach (or with None, detach) a profile session to the current thread."""
+    _profiling.session = session
+
+
+def _record(pipeline: str, name: str, wall: float, cpu: Optional[float]):
+    STAGE_SECONDS.observe(wall, pipeline=pipeline, stage=name)
+    session = getattr(_profiling, "session", None)
+    if session is not None:
+        session.record(name, wall, cpu)
+
+
+@contextmanager
+def stage(pipeline: str, name: str):
+    """Time a with-block as one pipeline stage (wall and thread CPU time)."""
+    start, cpu_start = time.perf_counter(), time.thread_time()
+    try:
+        yield
+    finally:
+        _record(pipeline, name, time.perf_counter() - start, time.thread_time() - cpu_start)
+
+
+class StageTimer:
+    """
+    Lap timer for consecutive pipeline stages. Picklable, so worker
+    processes can return .timings and .cpu_timings ({stage: seconds})
+    with their result.
+    """
+
+    def __init__(self):
+        self.timings: dict[str, float] = {}
+        self.cpu_timings: dict[str, float] = {}
+        self._last = time.perf_counter()
+        self._last_cpu = time.thread_time()
+
+    def lap(self, stage: str):
+        """Record the time since the previous lap (or creation) under stage."""
+        now, cpu = time.perf_counter(), time.thread_time()
+        self.timings[stage] = self.timings.get(stage, 0.0) + now - self._last
+        self.cpu_timings[stage] = self.cpu_timings.get(stage, 0.0) + cpu - self._last_cpu
+        self._last, self._last_cpu = now, cpu
+
+
+def observe_stages(pipeline: str, timings: dict[str, float], cpu_timings: Optional[dict[str, float]] = None):
+    """Record stage timings returned by a worker (or a local StageTimer)."""
+    cpu_timings = cpu_timings or {}
+    for name, seconds in timings.items():
+        _record(pipeline, name, seconds, cpu_timings.get(name))
+
+
+# ── Metrics ─────────────────────────────────────────────────────────
+
+STAGE_SECONDS = Histogram(
+    "mris_stage_seconds", "Wall time of one pipeline stage.", ("pipeline", "stage"),
+)
+FETCH_BYTES = Counter(
+    "mris_fetch_bytes_total", "Bytes of price data received from the upstream source (decoded frame size).",
+)
+FETCH_TICKERS = Counter(
+    "mris_fetch_tickers_total", "Tickers requested upstream, by outcome.", ("result",),
+)
+FETCH_CHUNK_FAILURES = Counter(
+    "mris_fetch_chunk_failures_total", "Download chunks that failed after all retries.",
+)
+CACHE_REQUESTS = Counter(
+    "mris_cache_requests_total", "Cache lookups, by cache and result (hit or miss).", ("cache", "result"),
+)
+CACHE_EVICTIONS = Counter(
+    "mris_cache_evictions_total", "Entries dropped by size limit or expiry.", ("cache",),
+)
+GRAPH_NODES = Gauge("mris_graph_nodes", "Nodes in the latest network of an index.", ("index",))
+GRAPH_EDGES = Gauge("mris_graph_edges", "Edges in the latest network of an index.", ("index",))
+UNIVERSE_SIZE = Gauge(
+    "mris_universe_tickers", "Tickers with usable data in the latest analysis of an index.", ("index",),
+)
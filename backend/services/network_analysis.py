@@ -0,0 +1,156 @@
+"""
+Network Analysis Module
+Runs the threshold-dependent stages (threshold → graph → centrality →
+clustering) as one self-contained task and returns a compact, picklable
+result, so the stages can execute in a worker process.
+"""
+
+import numpy as np
+import pandas as pd
+import logging
+from dataclasses import dataclass, field
+
+from services.correlation_engine import apply_threshold, threshold_correlation_blocked
+from services.graph_builder import (
+    ArrayGraph, build_array_graph, select_centrality_mode, compute_centrality, compute_influence_scores,
+)
+from services.clustering import detect_communities
+from services.metrics import StageTimer
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class NetworkResult:
+    """
+    Compact network analysis output; edges are (u < v) index pairs into nodes.
+    timings / cpu_timings hold the wall and CPU seconds spent in each stage
+    (threshold, graph, centrality, clustering), recorded by the caller's
+    process.
+    """
+    nodes: list[str]
+    degrees: np.ndarray
+    edge_rows: np.ndarray
+    edge_cols: np.ndarray
+    edge_weights: np.ndarray
+    centralities: dict
+    influence_scores: dict
+    partition: dict
+    modularity: float
+    centrality_mode: str
+    timings: dict = field(default_factory=dict)
+    cpu_timings: dict = field(default_factory=dict)
+
+    @property
+    def number_of_nodes(self) -> int:
+        return len(self.nodes)
+
+    @property
+    def number_of_edges(self) -> int:
+        return len(self.edge_weights)
+
+
+def analyze_network(
+    corr_matrix: pd.DataFrame, threshold: float, centrality_mode: str = "auto"
+) -> NetworkResult:
+    """
+    Threshold the correlation matrix and compute graph metrics.
+
+    Args:
+        corr_matrix: Full correlation matrix
+        threshold: Minimum absolute correlation for an edge
+        centrality_mode: auto, exact or approximate
+
+    Returns:
+        NetworkResult
+    """
+    timer = StageTimer()
+    adj_matrix = apply_threshold(corr_matrix, threshold)
+    timer.lap("threshold")
+    return _analyze_adjacency(build_array_graph(adj_matrix), centrality_mode, timer)
+
+
+def analyze_standardized(
+    standardized: np.ndarray, tickers: list[str], threshold: float, centrality_mode: str = "auto"
+) -> NetworkResult:
+    """
+    Large-universe variant of analyze_network: edges come from a blocked
+    pass over standardized returns, so no dense correlation matrix exists.
+
+    Args:
+        standardized: Unit-norm centered returns, shape (n, T)
+        tickers: Labels for the rows of standardized
+        threshold: Minimum absolute correlation for an edge
+        centrality_mode: auto, exact or approximate
+
+    Returns:
+        NetworkResult
+    """
+    timer = StageTimer()
+    adj_matrix = threshold_correlation_blocked(standardized, tickers, threshold)
+    timer.lap("threshold")
+    return _analyze_adjacency(build_array_graph(adj_matrix), centrality_mode, timer)
+
+
+def _analyze_adjacency(graph: ArrayGraph, centrality_mode: str, timer: StageTimer) -> NetworkResult:
+    """Centrality, influence and clustering for a thresholded ArrayGraph."""
+    G = graph.to_networkx()
+    logger.info(f"Built graph: {G.number_of_nodes()} nodes, {G.number_of_edges()} edges")
+    timer.lap("graph")
+
+    mode = select_centrality_mode(G.number_of_nodes(), centrality_mode)
+    centralities = compute_centrality(G, mode=mode)
+    influence_scores = compute_influence_scores(centralities)
+    timer.lap("centrality")
+
+    partition, modularity = detect_communities(G)
+    timer.lap("clustering")
+
+    return NetworkResult(
+        nodes=graph.nodes,
+        degrees=graph.degrees(),
+        edge_rows=graph.rows,
+        edge_cols=graph.cols,
+        edge_weights=graph.weights,
+        centralities=centralities,
+        influence_scores=influence_scores,
+        partition=partition,
+        modularity=modularity,
+        centrality_mode=mode,
+        timings=timer.timings,
+        cpu_timings=timer.cpu_timings,
+    )
+
+
+def summarize_window(
+    corr_values: np.ndarray, tickers: list[str], threshold: float, centrality_mode: str = "auto"
+) -> dict:
+    """
+    Network statistics and per-node influence for one rolling window.
+
+    Args:
+        corr_values: Correlation matrix of the window, shape (n, n)
+        tickers: Labels for the matrix rows/columns
+        threshold: Minimum absolute correlation for an edge
+        centrality_mode: auto, exact or approximate
+
+    Returns:
+        Dict with total_edges, density, avg_degree, modularity, num_clusters,
+        mean_correlation and influence (list aligned with tickers)
+    """
+    corr_matrix = pd.DataFrame(corr_values, index=tickers, columns=tickers)
+    result = analyze_network(corr_matrix, threshold, centrality_mode)
+
+    n = result.number_of_nodes
+    m = result.number_of_edges
+    off_diagonal = corr_values[~np.eye(n, dtype=bool)]
+
+    return {
+        "total_edges": m,
+        "density": round(m / max(1, n * (n - 1) / 2), 4) if n > 1 else 0,
+        "avg_degree": round(2 * m / max(1, n), 2),
+        "modularity": result.modularity,
+        "num_clusters": len(set(result.partition.values())),
+        "mean_correlation": round(float(np.nanmean(off_diagonal)), 4) if n > 1 else 0.0,
+        "influence": [result.influence_scores.get(t, 0.0) for t in tickers],
+    }
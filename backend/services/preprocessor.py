@@ -55,3 +55,27 @@ def clean_data(returns: pd.DataFrame, max_nan_ratio: float = 0.3) -> pd.DataFram
 
     logger.info(f"Cleaned data: {returns.shape[1]} tickers, {returns.shape[0]} observations")
     return returns
+
+
+def standardize_returns(returns: pd.DataFrame) -> np.ndarray:
+    """
+    Standardize returns into a contiguous float32 array for blocked
+    correlation.
+
+    Each ticker's series is centered and scaled to unit norm, so the
+    correlation of tickers i and j is simply the dot product of rows i and j.
+    Rows are tickers so that a block of tickers is one contiguous slice.
+
+    Args:
+        returns: Cleaned log returns (tickers with zero variance must be
+            dropped beforehand)
+
+    Returns:
+        Array of shape (n_tickers, n_observations), dtype float32
+    """
+    values = returns.to_numpy(dtype=np.float64)
+    centered = values - values.mean(axis=0)
+    norms = np.sqrt((centered ** 2).sum(axis=0))
+    standardized = np.ascontiguousarray((centered / norms).T, dtype=np.float32)
+    logger.info(f"Standardized returns: {standardized.shape} float32")
+    return standardized
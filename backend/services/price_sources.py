@@ -0,0 +1,319 @@
+"""
+Price Sources Module
+Providers of daily closing prices behind one interface (PriceSource):
+yfinance downloads, a directory of per-ticker CSV/Parquet files, and a
+deterministic synthetic generator. The active source is chosen by
+config.PRICE_SOURCE, so the pipeline can run fully offline.
+"""
+
+import os
+import zlib
+import logging
+import threading
+from datetime import date, timedelta
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from config import PRICE_SOURCE, PRICE_SOURCE_DIR, SYNTHETIC_SEED, SYNTHETIC_EPOCH, SECTORS
+from services.price_store import period_to_range
+
+logger = logging.getLogger(__name__)
+
+
+class PriceSource:
+    """
+    Provider of adjusted daily closes.
+
+    Subclasses implement download(). Network sources set uses_store so their
+    requests go through the on-disk price store (one directory per name),
+    and transient_misses when tickers missing from a result (rate limits,
+    partial failures) may arrive on a retry.
+    """
+
+    name = ""
+    uses_store = False
+    transient_misses = False
+
+    def download(
+        self,
+        tickers: list[str],
+        period: Optional[str] = None,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+    ) -> pd.DataFrame:
+        """
+        Close prices for a preset period or a [start, end) date range.
+
+        Args:
+            tickers: Ticker symbols
+            period: Preset period string (1mo, 3mo, 6mo, 1y)
+            start / end: ISO dates, end exclusive (used when period is None)
+
+        Returns:
+            DataFrame with dates as index and tickers as columns; tickers
+            without data may be missing or all-NaN
+
+        Raises:
+            RuntimeError: The source failed as a whole
+        """
+        raise NotImplementedError
+
+
+def _date_range(period: Optional[str], start: Optional[str], end: Optional[str], today: date):
+    """[start, end) dates for a request, with preset periods ending at today."""
+    if period is not None:
+        date_range = period_to_range(period, today)
+        if date_range is None:
+            raise RuntimeError(f"Unsupported period '{period}'")
+        return date_range
+    return date.fromisoformat(start), date.fromisoformat(end)
+
+
+# ── yfinance ────────────────────────────────────────────────────────
+
+class YFinanceSource(PriceSource):
+    """Yahoo Finance downloads (network)."""
+
+    name = "yfinance"
+    uses_store = True
+    transient_misses = True
+
+    def __init__(self):
+        import yfinance
+        self._yf = yfinance
+
+    def download(self, tickers, period=None, start=None, end=None) -> pd.DataFrame:
+        kwargs = {"period": period} if period is not None else {"start": start, "end": end}
+        try:
+            data = self._yf.download(
+                tickers=tickers,
+                auto_adjust=True,
+                progress=False,
+                threads=True,
+                **kwargs,
+            )
+        except Exception as e:
+            logger.error(f"yfinance download failed: {e}")
+            raise RuntimeError(f"Failed to fetch price data: {e}")
+
+        return _close_prices(data, tickers)
+
+
+def _close_prices(data, tickers: list[str]) -> pd.DataFrame:
+    """Extract the Close price frame from a yfinance download result."""
+    if data is None or data.empty:
+        return pd.DataFrame()
+
+    if isinstance(data.columns, pd.MultiIndex):
+        prices = data["Close"]
+    else:
+        prices = data[["Close"]]
+        prices.columns = tickers[:1]
+
+    if prices.index.tz is not None:
+        prices.index = prices.index.tz_localize(None)
+    return prices
+
+
+# ── Local Files ─────────────────────────────────────────────────────
+
+_CLOSE_COLUMNS = ("Adj Close", "adj_close", "Close", "close", "price", "Price")
+
+
+class LocalFileSource(PriceSource):
+    """
+    One file per ticker in a directory: <TICKER>.parquet or <TICKER>.csv,
+    indexed (or with a Date/date column) by trading day, holding an
+    Adj Close / Close / price column or a single numeric column.
+
+    Preset periods end at the newest date found among the requested
+    tickers, so a static snapshot keeps producing full windows.
+
+    Args:
+        directory: Directory holding the price files
+    """
+
+    name = "local"
+
+    def __init__(self, directory: str = PRICE_SOURCE_DIR):
+        self.directory = directory
+        self._series: dict[str, tuple[float, pd.Series]] = {}
+        self._lock = threading.Lock()
+        if not os.path.isdir(directory):
+            logger.warning(f"Local price directory {directory} does not exist")
+
+    def download(self, tickers, period=None, start=None, end=None) -> pd.DataFrame:
+        series = {t: s for t in tickers if (s := self._load(t)) is not None}
+        if not series:
+            return pd.DataFrame()
+
+        newest = max(s.index.max() for s in series.values()).date()
+        first, last = _date_range(period, start, end, newest)
+        prices = pd.DataFrame(series).sort_index()
+        return prices.loc[(prices.index >= pd.Timestamp(first)) & (prices.index < pd.Timestamp(last))]
+
+    def _path(self, ticker: str) -> Optional[str]:
+        for suffix in (".parquet", ".csv"):
+            path = os.path.join(self.directory, ticker + suffix)
+            if os.path.isfile(path):
+                return path
+        return None
+
+    def _load(self, ticker: str) -> Optional[pd.Series]:
+        """Close series of one ticker, re-read when its file changes."""
+        path = self._path(ticker)
+        if path is None:
+            return None
+        mtime = os.path.getmtime(path)
+        with self._lock:
+            cached = self._series.get(ticker)
+            if cached is not None and cached[0] == mtime:
+                return cached[1]
+
+        try:
+            series = _read_close(path)
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Could not read prices for {ticker} from {path}: {e}")
+            return None
+
+        with self._lock:
+            self._series[ticker] = (mtime, series)
+        return series
+
+
+def _read_close(path: str) -> pd.Series:
+    if path.endswith(".parquet"):
+        frame = pd.read_parquet(path)
+    else:
+        frame = pd.read_csv(path)
+
+    for column in ("Date", "date", "Datetime", "timestamp"):
+        if column in frame.columns:
+            frame = frame.set_index(column)
+            break
+    frame.index = pd.to_datetime(frame.index)
+    if frame.index.tz is not None:
+        frame.index = frame.index.tz_localize(None)
+
+    column = next((c for c in _CLOSE_COLUMNS if c in frame.columns), None)
+    if column is None:
+        numeric = frame.select_dtypes("number").columns
+        if len(numeric) != 1:
+            raise ValueError("no close column")
+        column = numeric[0]
+    return frame[column].astype(float).dropna().sort_index()
+
+
+# ── Synthetic ───────────────────────────────────────────────────────
+
+_MARKET_VOL = 0.01  # daily volatility of the common market factor
+_SECTOR_VOL = 0.009  # daily volatility of each sector factor
+_IDIO_VOL = 0.006  # typical daily idiosyncratic volatility
+_DRIFT = 0.0002  # daily drift
+_UNKNOWN_SECTORS = 12  # pseudo-sectors for tickers outside config.SECTORS
+
+
+class SyntheticSource(PriceSource):
+    """
+    Deterministic prices from a seeded multi-factor model.
+
+    Daily log returns are drift + beta_m·market + beta_s·sector + noise,
+    with one factor series per sector (config.SECTORS, or a pseudo-sector
+    derived from the ticker name) and per-ticker loadings, volatility and
+    starting price drawn from the ticker's own seed. Every series starts at
+    SYNTHETIC_EPOCH, so a ticker's price on a given day is the same for any
+    request, universe size or history length.
+
+    Args:
+        seed: Base seed of all random streams
+        epoch: First trading day of the synthetic calendar
+    """
+
+    name = "synthetic"
+
+    def __init__(self, seed: int = SYNTHETIC_SEED, epoch: str = SYNTHETIC_EPOCH):
+        self.seed = seed
+        self.epoch = pd.Timestamp(epoch)
+        self._factors: dict[str, np.ndarray] = {}
+        self._lock = threading.Lock()
+
+    def download(self, tickers, period=None, start=None, end=None) -> pd.DataFrame:
+        first, last = _date_range(period, start, end, date.today())
+        calendar = pd.bdate_range(self.epoch, max(pd.Timestamp(last) - timedelta(days=1), self.epoch))
+        window = (calendar >= pd.Timestamp(first)) & (calendar < pd.Timestamp(last))
+        if not window.any():
+            return pd.DataFrame()
+
+        n = len(calendar)
+        market = self._factor("market", _MARKET_VOL, n)
+        values = np.empty((int(window.sum()), len(tickers)))
+        for j, ticker in enumerate(tickers):
+            values[:, j] = self._prices(ticker, market, n)[window]
+        return pd.DataFrame(values, index=calendar[window], columns=tickers)
+
+    def _stream(self, *key) -> np.random.Generator:
+        return np.random.default_rng([self.seed, *key])
+
+    def _factor(self, name: str, vol: float, n: int) -> np.ndarray:
+        """First n daily returns of a factor; longer requests extend the same stream."""
+        with self._lock:
+            values = self._factors.get(name)
+            if values is None or len(values) < n:
+                values = self._factors[name] = self._stream(zlib.crc32(name.encode())).normal(0.0, vol, n)
+        return values[:n]
+
+    @staticmethod
+    def sector(ticker: str) -> str:
+        """Sector whose factor drives ticker: config.SECTORS or a pseudo-sector."""
+        return SECTORS.get(ticker) or f"synthetic-{zlib.crc32(ticker.encode()) % _UNKNOWN_SECTORS}"
+
+    def _prices(self, ticker: str, market: np.ndarray, n: int) -> np.ndarray:
+        tag = zlib.crc32(ticker.encode())
+        sector = self.sector(ticker)
+
+        rng = self._stream(tag, 1)
+        beta_market = rng.uniform(0.6, 1.4)
+        beta_sector = rng.uniform(0.5, 1.3)
+        vol = _IDIO_VOL * rng.uniform(0.6, 1.6)
+        start_price = rng.uniform(20.0, 500.0)
+        noise = self._stream(tag, 2).normal(0.0, vol, n)
+
+        returns = _DRIFT + beta_market * market + beta_sector * self._factor(sector, _SECTOR_VOL, n) + noise
+        return start_price * np.exp(np.cumsum(returns))
+
+
+# ── Selection ───────────────────────────────────────────────────────
+
+_SOURCES = {
+    "yfinance": YFinanceSource,
+    "local": LocalFileSource,
+    "synthetic": SyntheticSource,
+}
+
+_source: Optional[PriceSource] = None
+_source_lock = threading.Lock()
+
+
+def make_price_source(name: str = PRICE_SOURCE) -> PriceSource:
+    """
+    Create a price source by name (yfinance, local or synthetic), falling
+    back to yfinance for unknown names.
+    """
+    factory = _SOURCES.get(name)
+    if factory is None:
+        logger.warning(f"Unknown price source '{name}'; using yfinance")
+        factory = YFinanceSource
+    source = factory()
+    logger.info(f"Price source: {source.name}")
+    return source
+
+
+def get_price_source() -> PriceSource:
+    """Return the process-wide price source selected by config.PRICE_SOURCE."""
+    global _source
+    with _source_lock:
+        if _source is None:
+            _source = make_price_source()
+        return _source
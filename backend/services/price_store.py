@@ -0,0 +1,349 @@
+"""
+Price Store Module
+Persistent on-disk store of daily closing prices (one Parquet file per ticker)
+with a JSON metadata index of the date range each file covers.
+Serves repeat requests from disk and downloads only missing tickers or the
+missing leading/trailing days.
+"""
+
+import os
+import re
+import json
+import time
+import logging
+import threading
+from datetime import date, timedelta
+from typing import Callable, Optional
+from urllib.parse import quote
+
+import pandas as pd
+
+from config import PRICE_STORE_ENABLED, PRICE_STORE_DIR, PRICE_STORE_MAX_STALENESS
+
+logger = logging.getLogger(__name__)
+
+# Relative tolerance when comparing an overlapping bar against the stored one.
+# A larger difference means the provider re-adjusted the history (split/dividend).
+_ADJUSTMENT_TOLERANCE = 1e-4
+
+_PERIOD_PATTERN = re.compile(r"^(\d+)(d|wk|mo|y)$")
+
+Downloader = Callable[[list[str], date, date], pd.DataFrame]
+
+
+def period_to_range(period: str, today: Optional[date] = None) -> Optional[tuple[date, date]]:
+    """
+    Translate a preset period string into a [start, end) date range.
+
+    Args:
+        period: Period string such as 1mo, 3mo, 6mo, 1y
+        today: Reference date (defaults to today)
+
+    Returns:
+        Tuple of (start, end) with end exclusive, or None for periods that
+        have no fixed length (e.g. ytd, max)
+    """
+    match = _PERIOD_PATTERN.match(period or "")
+    if not match:
+        return None
+
+    today = today or date.today()
+    amount, unit = int(match.group(1)), match.group(2)
+    offsets = {
+        "d": pd.DateOffset(days=amount),
+        "wk": pd.DateOffset(weeks=amount),
+        "mo": pd.DateOffset(months=amount),
+        "y": pd.DateOffset(years=amount),
+    }
+    start = (pd.Timestamp(today) - offsets[unit]).date()
+    return start, today + timedelta(days=1)
+
+
+class PriceStore:
+    """
+    Ticker-keyed Parquet store with a coverage index.
+
+    The index maps each ticker to the [start, end) range that has been
+    downloaded for it and the time of the last download, so a request can be
+    answered from disk and topped up with only the missing ranges.
+    Downloads that return nothing for a ticker (delisted or unknown
+    symbols) are recorded as an empty range, so repeat requests within it
+    do not hit the source again until max_staleness has passed.
+    """
+
+    def __init__(self, root: str, max_staleness: int = PRICE_STORE_MAX_STALENESS):
+        self.root = root
+        self.max_staleness = max_staleness
+        self._index_path = os.path.join(root, "index.json")
+        self._index: dict[str, dict] = {}
+        self._index_mtime = 0.0
+        self._series: dict[str, tuple[float, pd.Series]] = {}
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    # ── Public API ──────────────────────────────────────────────────
+
+    def get_prices(
+        self, tickers: list[str], start: date, end: date, download: Downloader
+    ) -> pd.DataFrame:
+        """
+        Return closing prices for [start, end), downloading only what is missing.
+
+        Args:
+            tickers: Ticker symbols
+            start: First date (inclusive)
+            end: Last date (exclusive)
+            download: Callable(tickers, start, end) returning a Close-price DataFrame
+
+        Returns:
+            DataFrame with dates as index and tickers as columns
+        """
+        with self._lock:
+            self._reload_index()
+            plan = self._plan(tickers, start, end)
+
+        if plan:
+            fetched = sum(len(group) for group in plan.values())
+            logger.info(
+                f"Price store: {len(tickers) - fetched}/{len(tickers)} tickers served from disk, "
+                f"{fetched} topped up in {len(plan)} request(s)"
+            )
+        else:
+            logger.info(f"Price store: all {len(tickers)} tickers served from disk")
+
+        readjusted = []
+        for (fetch_start, fetch_end), group in plan.items():
+            data = download(group, fetch_start, fetch_end)
+            readjusted += self._merge(group, data, fetch_start, fetch_end)
+
+        if readjusted:
+            # History was re-adjusted upstream: replace the whole stored range
+            with self._lock:
+                starts = [min(start, self._covered_start(t, start)) for t in readjusted]
+            full_start = min(starts)
+            logger.info(f"Price store: re-downloading {len(readjusted)} re-adjusted tickers")
+            data = download(readjusted, full_start, end)
+            self._merge(readjusted, data, full_start, end, replace=True)
+
+        return self._read(tickers, start, end)
+
+    # ── Planning ────────────────────────────────────────────────────
+
+    def _plan(self, tickers: list[str], start: date, end: date) -> dict[tuple[date, date], list[str]]:
+        """Group tickers by the date range that must be downloaded for them."""
+        now = time.time()
+        today = date.today()
+        plan: dict[tuple[date, date], list[str]] = {}
+
+        for ticker in tickers:
+            meta = self._index.get(ticker)
+            fetch = self._missing_range(meta, start, end, now, today)
+            if fetch is None:
+                continue
+            if meta and self._known_empty(meta, *fetch, now):
+                continue  # Recently returned no data for this range — don't hammer upstream
+            plan.setdefault(fetch, []).append(ticker)
+
+        return plan
+
+    def _missing_range(
+        self, meta: Optional[dict], start: date, end: date, now: float, today: date
+    ) -> Optional[tuple[date, date]]:
+        """Range to download for one ticker so that [start, end) is covered, or None."""
+        if not meta or "start" not in meta:
+            return start, end
+
+        covered_start = date.fromisoformat(meta["start"])
+        covered_end = date.fromisoformat(meta["end"])
+        last_bar = date.fromisoformat(meta["last_bar"])
+
+        need_head = start < covered_start
+        need_tail = end > covered_end or (
+            covered_end > today and now - meta["updated"] > self.max_staleness
+        )
+
+        if need_head and need_tail:
+            return start, end
+        if need_head:
+            # Overlap one stored bar so re-adjustments can be detected
+            return start, covered_start + timedelta(days=1)
+        if need_tail:
+            return last_bar, end
+        return None
+
+    def _empty_range(self, meta: dict, now: float) -> Optional[tuple[date, date]]:
+        """[start, end) a recent download found no data in, or None once it has expired."""
+        empty = meta.get("empty")
+        if not empty or now - meta.get("failed_at", 0) >= self.max_staleness:
+            return None
+        return date.fromisoformat(empty[0]), date.fromisoformat(empty[1])
+
+    def _known_empty(self, meta: dict, start: date, end: date, now: float) -> bool:
+        """Whether a recent download found no data for the ticker over all of [start, end)."""
+        empty = self._empty_range(meta, now)
+        return empty is not None and empty[0] <= start and end <= empty[1]
+
+    def _covered_start(self, ticker: str, default: date) -> date:
+        meta = self._index.get(ticker) or {}
+        return date.fromisoformat(meta["start"]) if "start" in meta else default
+
+    # ── Writing ─────────────────────────────────────────────────────
+
+    def _merge(
+        self,
+        tickers: list[str],
+        data: pd.DataFrame,
+        start: date,
+        end: date,
+        replace: bool = False,
+    ) -> list[str]:
+        """
+        Merge downloaded closes into the store.
+
+        Returns:
+            Tickers whose overlapping bars disagree with the stored history
+        """
+        now = time.time()
+        readjusted = []
+
+        with self._lock:
+            self._reload_index()
+
+            for ticker in tickers:
+                series = data[ticker].dropna() if ticker in data.columns else pd.Series(dtype=float)
+                meta = self._index.get(ticker, {})
+
+                if series.empty:
+                    lo, hi = start, end
+                    empty = self._empty_range(meta, now)
+                    if empty is not None and empty[0] <= end and start <= empty[1]:
+                        lo, hi = min(lo, empty[0]), max(hi, empty[1])  # extend the known gap
+                    self._index[ticker] = {
+                        **meta, "failed_at": now, "empty": [lo.isoformat(), hi.isoformat()],
+                    }
+                    continue
+
+                existing = None if replace else self._load_series(ticker)
+
+                if existing is not None and not existing.empty:
+                    overlap = existing.index.intersection(series.index)
+                    if len(overlap) and not _bars_match(existing[overlap], series[overlap]):
+                        readjusted.append(ticker)
+                        continue
+                    series = pd.concat([existing[~existing.index.isin(series.index)], series])
+                    series = series.sort_index()
+                    new_start = min(start, date.fromisoformat(meta["start"]))
+                    new_end = max(end, date.fromisoformat(meta["end"]))
+                else:
+                    new_start, new_end = start, end
+
+                self._write_series(ticker, series)
+                self._index[ticker] = {
+                    "start": new_start.isoformat(),
+                    "end": new_end.isoformat(),
+                    "last_bar": series.index[-1].date().isoformat(),
+                    "updated": now,
+                }
+
+            self._save_index()
+
+        return readjusted
+
+    def _write_series(self, ticker: str, series: pd.Series):
+        path = self._path(ticker)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        series.rename("close").to_frame().to_parquet(tmp_path)
+        os.replace(tmp_path, path)
+        self._series[ticker] = (time.time(), series)
+
+    def _save_index(self):
+        tmp_path = f"{self._index_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self._index, f)
+        os.replace(tmp_path, self._index_path)
+        self._index_mtime = os.stat(self._index_path).st_mtime
+
+    # ── Reading ─────────────────────────────────────────────────────
+
+    def _read(self, tickers: list[str], start: date, end: date) -> pd.DataFrame:
+        columns = {}
+        with self._lock:
+            for ticker in tickers:
+                series = self._load_series(ticker)
+                if series is not None:
+                    columns[ticker] = series
+
+        if not columns:
+            return pd.DataFrame()
+
+        prices = pd.DataFrame(columns)
+        lo, hi = pd.Timestamp(start), pd.Timestamp(end)
+        return prices[(prices.index >= lo) & (prices.index < hi)]
+
+    def _load_series(self, ticker: str) -> Optional[pd.Series]:
+        """Load a ticker's stored closes, reusing the in-memory copy if still current."""
+        meta = self._index.get(ticker)
+        if not meta or "start" not in meta:
+            return None
+
+        cached = self._series.get(ticker)
+        if cached and cached[0] >= meta["updated"]:
+            return cached[1]
+
+        path = self._path(ticker)
+        if not os.path.exists(path):
+            return None
+
+        series = pd.read_parquet(path)["close"]
+        self._series[ticker] = (time.time(), series)
+        return series
+
+    def _reload_index(self):
+        """Pick up index changes written by other worker processes."""
+        try:
+            mtime = os.stat(self._index_path).st_mtime
+        except FileNotFoundError:
+            return
+        if mtime != self._index_mtime:
+            with open(self._index_path) as f:
+                self._index = json.load(f)
+            self._index_mtime = mtime
+
+    def _path(self, ticker: str) -> str:
+        return os.path.join(self.root, quote(ticker, safe="") + ".parquet")
+
+
+def _bars_match(old: pd.Series, new: pd.Series) -> bool:
+    rel = ((new - old).abs() / old.abs().clip(lower=1e-12)).max()
+    return bool(rel <= _ADJUSTMENT_TOLERANCE)
+
+
+# ── Shared Instance ─────────────────────────────────────────────────
+
+_stores: dict[str, PriceStore] = {}
+_store_available = PRICE_STORE_ENABLED
+_store_lock = threading.Lock()
+
+
+def get_price_store(source: str = "yfinance") -> Optional[PriceStore]:
+    """
+    Return the process-wide price store for a price source (each source
+    keeps its own directory under PRICE_STORE_DIR), or None if disabled.
+    """
+    global _store_available
+    if not _store_available:
+        return None
+
+    with _store_lock:
+        store = _stores.get(source)
+        if store is None:
+            try:
+                import pyarrow  # noqa: F401 — Parquet engine
+            except ImportError:
+                logger.warning("pyarrow is not installed; price store disabled")
+                _store_available = False
+                return None
+            root = os.path.join(PRICE_STORE_DIR, source)
+            store = _stores[source] = PriceStore(root)
+            logger.info(f"Price store ready at {root}")
+        return store
@@ -0,0 +1,253 @@
+"""
+Profiler Module
+On-demand profiling of a single admin-requested pipeline run. The run
+executes inline in one thread (no worker pool, no caches) while a sampler
+thread records its call stacks, tracemalloc tracks allocations and every
+instrumented stage reports wall and CPU time. The result is saved as a
+JSON report plus a folded-stack file (flamegraph.pl / speedscope input).
+
+Requests without the profile flag only pay for one query-parameter lookup.
+"""
+
+import os
+import re
+import sys
+import hmac
+import json
+import time
+import uuid
+import logging
+import threading
+import tracemalloc
+from collections import Counter
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from typing import Any, Callable, Optional
+
+from fastapi import HTTPException, Request
+
+from config import (
+    ADMIN_TOKEN, PROFILE_DIR, PROFILE_SAMPLE_INTERVAL, PROFILE_TOP_ALLOCATIONS, PROFILE_KEEP,
+)
+from services.executor import run_inline
+from services.metrics import ProfileSession, set_profile_session
+
+logger = logging.getLogger(__name__)
+
+# tracemalloc and the sampler are process-wide: one profile at a time
+_lock = threading.Lock()
+
+_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+
+def admin_authorized(token: Optional[str]) -> bool:
+    """Whether token matches the configured admin token (never true when none is set)."""
+    if not ADMIN_TOKEN or not token:
+        return False
+    return hmac.compare_digest(token.encode(), ADMIN_TOKEN.encode())
+
+
+def profile_requested(request: Request) -> bool:
+    """
+    Whether a request asks to be profiled (?profile=1).
+
+    The admin token is read from the X-Admin-Token header or, for clients
+    that cannot set headers (EventSource), the admin_token query parameter.
+
+    Raises:
+        HTTPException 403: profiling requested without a valid admin token
+    """
+    if request.query_params.get("profile") not in ("1", "true"):
+        return False
+    token = request.headers.get("x-admin-token") or request.query_params.get("admin_token")
+    if not admin_authorized(token):
+        raise HTTPException(status_code=403, detail="Profiling requires a valid admin token")
+    return True
+
+
+@dataclass
+class ProfileReport:
+    """Outcome of one profiled run; folded holds 'frame;frame;... count' lines."""
+    id: str
+    endpoint: str
+    params: dict
+    created: str
+    wall_seconds: float
+    cpu_seconds: float
+    peak_memory_bytes: int
+    stages: dict
+    top_allocations: list
+    samples: int
+    sample_interval: float
+    error: Optional[str]
+    folded: str
+
+    def summary(self) -> dict:
+        """Report without the folded stacks."""
+        data = asdict(self)
+        data.pop("folded")
+        return data
+
+
+class _Sampler(threading.Thread):
+    """Samples one thread's Python stack at a fixed interval."""
+
+    def __init__(self, thread_id: int, interval: float):
+        super().__init__(name="mris-profiler", daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._halt = threading.Event()
+
+    def run(self):
+        while not self._halt.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def stop(self):
+        self._halt.set()
+        self.join()
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+def profile_call(endpoint: str, params: dict, func: Callable[..., Any], *args) -> tuple[Any, ProfileReport]:
+    """
+    Run func(*args) in the calling thread under the profiler and save the report.
+
+    Pipeline stages submitted to the worker pool run inline so they are
+    sampled too. Wall times include tracemalloc's overhead. If func raises,
+    the report is still saved (with error set) and the exception propagates.
+
+    Args:
+        endpoint: Label stored with the report (e.g. "analyze")
+        params: Request parameters stored with the report
+        func: Blocking function to profile
+
+    Returns:
+        (func's result, ProfileReport)
+    """
+    with _lock:
+        session = ProfileSession()
+        sampler = _Sampler(threading.get_ident(), PROFILE_SAMPLE_INTERVAL)
+        tracemalloc.start()
+        sampler.start()
+        set_profile_session(session)
+        wall_start, cpu_start = time.perf_counter(), time.thread_time()
+        error = None
+        try:
+            with run_inline():
+                result = func(*args)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            wall, cpu = time.perf_counter() - wall_start, time.thread_time() - cpu_start
+            set_profile_session(None)
+            sampler.stop()
+            _, peak = tracemalloc.get_traced_memory()
+            allocations = tracemalloc.take_snapshot().statistics("lineno")[:PROFILE_TOP_ALLOCATIONS]
+            tracemalloc.stop()
+
+            report = ProfileReport(
+                id=uuid.uuid4().hex,
+                endpoint=endpoint,
+                params=params,
+                created=datetime.utcnow().isoformat() + "Z",
+                wall_seconds=round(wall, 4),
+                cpu_seconds=round(cpu, 4),
+                peak_memory_bytes=peak,
+                stages={
+                    name: {k: round(v, 4) for k, v in times.items()}
+                    for name, times in session.stages.items()
+                },
+                top_allocations=[
+                    {"site": str(stat.traceback[0]), "bytes": stat.size, "count": stat.count}
+                    for stat in allocations
+                ],
+                samples=sum(sampler.stacks.values()),
+                sample_interval=PROFILE_SAMPLE_INTERVAL,
+                error=error,
+                folded=sampler.folded(),
+            )
+            _save(report)
+            logger.info(
+                f"Profiled {endpoint} in {wall:.2f}s (cpu {cpu:.2f}s, peak {peak / 1e6:.1f} MB): {report.id}"
+            )
+    return result, report
+
+
+# ── Storage ─────────────────────────────────────────────────────────
+
+def _path(profile_id: str, suffix: str) -> str:
+    return os.path.join(PROFILE_DIR, f"{profile_id}{suffix}")
+
+
+def _save(report: ProfileReport):
+    try:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        with open(_path(report.id, ".json"), "w") as f:
+            json.dump(report.summary(), f, indent=2)
+        with open(_path(report.id, ".folded"), "w") as f:
+            f.write(report.folded)
+        _prune()
+    except OSError as e:
+        logger.warning(f"Could not save profile {report.id}: {e}")
+
+
+def _prune():
+    """Delete all but the PROFILE_KEEP newest profiles."""
+    reports = sorted(
+        (f for f in os.listdir(PROFILE_DIR) if f.endswith(".json")),
+        key=lambda f: os.path.getmtime(os.path.join(PROFILE_DIR, f)),
+        reverse=True,
+    )
+    for name in reports[PROFILE_KEEP:]:
+        for suffix in (".json", ".folded"):
+            try:
+                os.remove(_path(name[:-5], suffix))
+            except FileNotFoundError:
+                pass
+
+
+def list_profiles() -> list[dict]:
+    """Saved profile summaries (without allocations or stages), newest first."""
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+    summaries = []
+    for name in os.listdir(PROFILE_DIR):
+        if not name.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(PROFILE_DIR, name)) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            continue
+        summaries.append({
+            k: data.get(k) for k in ("id", "endpoint", "params", "created", "wall_seconds", "error")
+        })
+    summaries.sort(key=lambda s: s["created"] or "", reverse=True)
+    return summaries
+
+
+def load_profile(profile_id: str, folded: bool = False) -> Optional[Any]:
+    """
+    A saved profile's JSON summary, or its folded stacks as text.
+
+    Returns:
+        dict / str, or None if no such profile exists
+    """
+    if not _ID_PATTERN.match(profile_id):
+        return None
+    try:
+        with open(_path(profile_id, ".folded" if folded else ".json")) as f:
+            return f.read() if folded else json.load(f)
+    except FileNotFoundError:
+        return None
@@ -0,0 +1,155 @@
+"""
+Refresh Scheduler Module
+Keeps the response cache warm: stale entries are served immediately while a
+background recomputation replaces them (stale-while-revalidate), and the
+most requested keys are recomputed shortly before they expire.
+"""
+
+import time
+import asyncio
+import logging
+from typing import Any, Callable, Optional
+
+from fastapi.concurrency import run_in_threadpool
+
+from services.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# Keys tracked for popularity; the least popular are forgotten beyond this
+_MAX_TRACKED = 500
+
+
+class RefreshScheduler:
+    """
+    Background revalidation and popularity-driven refresh for one cache.
+
+    Every request records its key with an exponentially decayed hit count
+    and the zero-argument function that recomputes (and re-caches) its
+    entry. A periodic pass recomputes the top_n most popular keys whose
+    entries are missing or within `ahead` seconds of expiring. All
+    recomputations go through the shared SingleFlight, so they coalesce
+    with concurrent misses for the same key.
+
+    Args:
+        name: Label used in log messages
+        cache: Response cache holding entries with an age property
+        inflight: SingleFlight shared with the request path
+        ttl: Seconds an entry counts as fresh
+        ahead: Refresh popular entries this many seconds before ttl
+        top_n: Number of popular keys kept warm
+        interval: Seconds between scheduler passes
+        halflife: Seconds for a key's popularity to halve
+    """
+
+    def __init__(
+        self,
+        name: str,
+        cache,
+        inflight: SingleFlight,
+        ttl: float,
+        ahead: float,
+        top_n: int,
+        interval: float,
+        halflife: float,
+    ):
+        self.name = name
+        self.cache = cache
+        self.inflight = inflight
+        self.ttl = ttl
+        self.ahead = ahead
+        self.top_n = top_n
+        self.interval = interval
+        self.halflife = halflife
+        self._popularity: dict[str, tuple[float, float]] = {}
+        self._refreshers: dict[str, Callable[[], Any]] = {}
+        self._pending: set[str] = set()
+        self._tasks: set[asyncio.Task] = set()
+        self._loop_task: Optional[asyncio.Task] = None
+
+    # ── Popularity ──────────────────────────────────────────────────
+
+    def record(self, key: str, refresh: Callable[[], Any]):
+        """Count one request for key and remember how to recompute it."""
+        now = time.time()
+        score, last = self._popularity.get(key, (0.0, now))
+        self._popularity[key] = (score * self._decay(now - last) + 1.0, now)
+        self._refreshers[key] = refresh
+
+        if len(self._popularity) > _MAX_TRACKED:
+            coldest = min(self._popularity, key=lambda k: self._score(k, now))
+            self._popularity.pop(coldest)
+            self._refreshers.pop(coldest, None)
+
+    def hottest(self) -> list[str]:
+        """The top_n keys by decayed request count."""
+        now = time.time()
+        ranked = sorted(self._popularity, key=lambda k: self._score(k, now), reverse=True)
+        return ranked[: self.top_n]
+
+    def _decay(self, elapsed: float) -> float:
+        return 0.5 ** (elapsed / self.halflife)
+
+    def _score(self, key: str, now: float) -> float:
+        score, last = self._popularity[key]
+        return score * self._decay(now - last)
+
+    # ── Revalidation ────────────────────────────────────────────────
+
+    def revalidate(self, key: str) -> bool:
+        """
+        Start a background recomputation of key unless one is pending.
+
+        Returns:
+            True if a recomputation was scheduled
+        """
+        refresh = self._refreshers.get(key)
+        if refresh is None or key in self._pending:
+            return False
+        self._pending.add(key)
+        task = asyncio.get_running_loop().create_task(self._refresh(key, refresh))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return True
+
+    async def _refresh(self, key: str, refresh: Callable[[], Any]):
+        start = time.perf_counter()
+        try:
+            await self.inflight.run(key, refresh)
+            logger.info(f"Refreshed {self.name} entry {key} in {time.perf_counter() - start:.2f}s")
+        except Exception as e:
+            logger.warning(f"Background refresh of {self.name} entry {key} failed: {e}")
+        finally:
+            self._pending.discard(key)
+
+    async def _age(self, key: str) -> Optional[float]:
+        entry = await run_in_threadpool(self.cache.get, key) if self.cache.shared else self.cache.get(key)
+        return None if entry is None else entry.age
+
+    async def run(self):
+        """Scheduler loop: refresh popular entries that are missing or about to expire."""
+        while True:
+            await asyncio.sleep(self.interval)
+            for key in self.hottest():
+                try:
+                    age = await self._age(key)
+                except Exception as e:
+                    logger.warning(f"{self.name} refresh lookup failed: {e}")
+                    continue
+                if age is None or age >= self.ttl - self.ahead:
+                    self.revalidate(key)
+
+    def start(self):
+        if self._loop_task is None:
+            self._loop_task = asyncio.get_running_loop().create_task(self.run())
+            logger.info(f"{self.name} refresh scheduler started (top {self.top_n}, every {self.interval}s)")
+
+    async def stop(self):
+        """Cancel the scheduler loop and any pending background refreshes."""
+        tasks = list(self._tasks)
+        if self._loop_task is not None:
+            tasks.append(self._loop_task)
+            self._loop_task = None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,163 @@
+"""
+Response Cache Module
+Cache entries that hold final response bytes: the serialized body, its
+gzip/brotli-compressed variants and a strong ETag, all computed once at
+insert time. Cache hits are answered with the stored bytes, honouring
+Accept-Encoding and If-None-Match (304), without touching pydantic.
+"""
+
+import gzip
+import time
+import hashlib
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+from fastapi import Request, Response
+from pydantic import BaseModel
+
+from config import COMPRESS_MIN_BYTES, GZIP_LEVEL, BROTLI_QUALITY
+from services.serialization import MEDIA_JSON
+
+logger = logging.getLogger(__name__)
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+# Encodings offered, preferred first
+_CODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+@dataclass
+class EncodedBody:
+    """One media type's body, its compressed variants and their ETags."""
+    media_type: str
+    body: bytes
+    etag: str
+    compressed: dict[str, bytes] = field(default_factory=dict)
+
+    @classmethod
+    def build(cls, body: bytes, media_type: str) -> "EncodedBody":
+        digest = hashlib.sha256(body).hexdigest()[:32]
+        compressed = {}
+        if len(body) >= COMPRESS_MIN_BYTES:
+            compressed["gzip"] = gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+            if brotli is not None:
+                compressed["br"] = brotli.compress(body, quality=BROTLI_QUALITY)
+        return cls(media_type=media_type, body=body, etag=f'"{digest}"', compressed=compressed)
+
+    def tag(self, coding: Optional[str]) -> str:
+        """Strong ETag of the identity body or of one content-coding of it."""
+        return self.etag if coding is None else f'{self.etag[:-1]}-{coding}"'
+
+    def matches(self, if_none_match: Optional[str]) -> bool:
+        """Whether an If-None-Match header names any variant of this body."""
+        if not if_none_match:
+            return False
+        if if_none_match.strip() == "*":
+            return True
+        tags = {t.strip().removeprefix("W/") for t in if_none_match.split(",")}
+        return any(self.tag(c) in tags for c in (None, *self.compressed))
+
+
+@dataclass
+class CachedResponse:
+    """
+    Pre-serialized pipeline result. The JSON body is built at insert time;
+    other media types are encoded from it on first request and kept.
+    created is the computation time, used to tell fresh from stale entries.
+    """
+    variants: dict[str, EncodedBody]
+    created: float = field(default_factory=time.time)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    @classmethod
+    def from_model(cls, model: BaseModel) -> "CachedResponse":
+        body = EncodedBody.build(model.model_dump_json().encode(), MEDIA_JSON)
+        return cls(variants={MEDIA_JSON: body})
+
+    def variant(self, media_type: str, encode: Optional[Callable[[bytes], bytes]] = None) -> EncodedBody:
+        """
+        Body for a media type, creating it with encode(json_bytes) if needed.
+        Falls back to JSON when no encoder is given.
+        """
+        body = self.variants.get(media_type)
+        if body is not None:
+            return body
+        if encode is None:
+            return self.variants[MEDIA_JSON]
+        with self._lock:
+            if media_type not in self.variants:
+                self.variants[media_type] = EncodedBody.build(
+                    encode(self.variants[MEDIA_JSON].body), media_type
+                )
+            return self.variants[media_type]
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.created
+
+    def __getstate__(self):
+        return {"variants": self.variants, "created": self.created}
+
+    def __setstate__(self, state):
+        self.variants = state["variants"]
+        self.created = state["created"]
+        self._lock = threading.Lock()
+
+
+def select_coding(accept_encoding: Optional[str], available) -> Optional[str]:
+    """
+    Content-coding to send: the offered coding with the highest q-value
+    (ties broken by server preference), or None for identity.
+    """
+    if not accept_encoding or not available:
+        return None
+    q = {}
+    for part in accept_encoding.split(","):
+        fields = [f.strip() for f in part.split(";")]
+        coding, weight = fields[0].lower(), 1.0
+        for param in fields[1:]:
+            if param.startswith("q="):
+                try:
+                    weight = float(param[2:])
+                except ValueError:
+                    weight = 0.0
+        q[coding] = weight
+    candidates = [
+        (q.get(c, q.get("*", 0.0)), -rank, c)
+        for rank, c in enumerate(_CODINGS) if c in available
+    ]
+    candidates = [c for c in candidates if c[0] > 0]
+    return max(candidates)[2] if candidates else None
+
+
+def cached_response(body: EncodedBody, request: Request, cache_status: str) -> Response:
+    """
+    Answer a request from stored bytes: 304 when If-None-Match matches,
+    otherwise the best compressed (or identity) body with its ETag.
+
+    Args:
+        body: Encoded body for the negotiated media type
+        request: Incoming request (for Accept-Encoding / If-None-Match)
+        cache_status: Value of the X-Cache header (HIT, STALE or MISS)
+    """
+    headers = {
+        "Vary": "Accept, Accept-Encoding",
+        "Cache-Control": "no-cache",
+        "X-Cache": cache_status,
+    }
+
+    # A 304 carries the ETag the matching 200 would have carried
+    coding = select_coding(request.headers.get("accept-encoding"), body.compressed)
+    headers["ETag"] = body.tag(coding)
+    if body.matches(request.headers.get("if-none-match")):
+        return Response(status_code=304, headers=headers)
+
+    if coding is not None:
+        headers["Content-Encoding"] = coding
+        return Response(content=body.compressed[coding], media_type=body.media_type, headers=headers)
+    return Response(content=body.body, media_type=body.media_type, headers=headers)
@@ -0,0 +1,222 @@
+"""
+Rolling Correlation Module
+Stateful windowed correlation that updates in O(n²) per new observation
+instead of recomputing returns.corr() over the whole window.
+Supports equal weights or exponential weighting (halflife) and
+periodically resyncs exactly from the buffered rows to bound drift.
+"""
+
+import numpy as np
+import pandas as pd
+import logging
+import threading
+from collections import OrderedDict, deque
+from typing import Optional
+
+from config import ROLLING_RESYNC_EVERY, ROLLING_MAX_ENGINES
+
+logger = logging.getLogger(__name__)
+
+
+class RollingCorrelation:
+    """
+    Windowed Pearson correlation maintained from running weighted sums.
+
+    Keeps W = Σw, S = Σw·x and P = Σw·x·xᵀ over the buffered rows, where
+    w = λ^age (λ = 1 for equal weights). Adding or evicting a row is a
+    rank-1 update; the correlation is derived from the centered cross-product
+    P − S·Sᵀ/W, whose normalization cancels out.
+
+    Args:
+        window: Maximum number of rows kept by push() (None = unbounded;
+            sync() trims to the supplied frame instead)
+        halflife: Exponential-weighting halflife in rows (None = equal weights)
+        resync_every: Incremental updates between exact recomputations
+    """
+
+    def __init__(
+        self,
+        window: Optional[int] = None,
+        halflife: Optional[float] = None,
+        resync_every: int = ROLLING_RESYNC_EVERY,
+    ):
+        self.window = window
+        self.halflife = halflife
+        self.decay = 0.5 ** (1.0 / halflife) if halflife else 1.0
+        self.resync_every = resync_every
+        self.tickers: list[str] = []
+        self._rows: deque[tuple[pd.Timestamp, np.ndarray]] = deque()
+        self._updates = 0
+        self._w = 0.0
+        self._s: Optional[np.ndarray] = None
+        self._p: Optional[np.ndarray] = None
+        self.lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    # ── State Management ────────────────────────────────────────────
+
+    def reset(self, returns: pd.DataFrame):
+        """Rebuild the state exactly from a returns frame."""
+        if self.window is not None:
+            returns = returns.iloc[-self.window:]
+        self.tickers = returns.columns.tolist()
+        values = returns.to_numpy(dtype=float)
+        self._rows = deque(zip(returns.index, values))
+        self._resync()
+
+    def push(self, timestamp: pd.Timestamp, row: np.ndarray):
+        """Append one observation, evicting the oldest if the window is full."""
+        if self.window is not None and len(self._rows) >= self.window:
+            self._evict()
+
+        row = np.asarray(row, dtype=float)
+        self._w = self.decay * self._w + 1.0
+        self._s = self.decay * self._s + row
+        self._p = self.decay * self._p
+        self._p += np.outer(row, row)
+        self._rows.append((timestamp, row))
+        self._count_update()
+
+    def _evict(self):
+        """Remove the oldest buffered row from the running sums."""
+        _, row = self._rows.popleft()
+        weight = self.decay ** len(self._rows)  # age of the oldest row before removal
+        self._w -= weight
+        self._s -= weight * row
+        self._p -= weight * np.outer(row, row)
+        self._count_update()
+
+    def _count_update(self):
+        self._updates += 1
+        if self._updates >= self.resync_every:
+            self._resync()
+
+    def _resync(self):
+        """Recompute the running sums exactly from the buffered rows."""
+        n = len(self.tickers)
+        if not self._rows:
+            self._w, self._s, self._p = 0.0, np.zeros(n), np.zeros((n, n))
+        else:
+            values = np.vstack([row for _, row in self._rows])
+            weights = self.decay ** np.arange(len(values) - 1, -1, -1, dtype=float)
+            self._w = float(weights.sum())
+            self._s = weights @ values
+            self._p = (values * weights[:, None]).T @ values
+        self._updates = 0
+
+    # ── Frame Alignment ─────────────────────────────────────────────
+
+    def _retract(self):
+        """Remove the newest buffered row (e.g. a still-moving intraday bar)."""
+        _, row = self._rows.pop()
+        self._w = (self._w - 1.0) / self.decay
+        self._s = (self._s - row) / self.decay
+        self._p = (self._p - np.outer(row, row)) / self.decay
+        self._count_update()
+
+    def sync(self, returns: pd.DataFrame) -> pd.DataFrame:
+        """
+        Bring the state in line with a cleaned returns frame and return its
+        correlation matrix.
+
+        If the frame extends the buffered rows (same tickers, leading
+        overlap unchanged), only the dropped leading rows, revised trailing
+        rows and new rows are applied; otherwise the state is rebuilt.
+
+        Args:
+            returns: Cleaned log returns covering the desired window
+
+        Returns:
+            Correlation matrix as DataFrame
+        """
+        matched = self._matching_prefix(returns)
+        if not matched:
+            logger.info(f"Rolling correlation: full rebuild ({returns.shape[1]} tickers)")
+            self.reset(returns)
+            return self.correlation()
+
+        start = returns.index[0]
+        dropped = 0
+        while self._rows[0][0] < start:
+            self._evict()
+            dropped += 1
+
+        revised = len(self._rows) - matched
+        for _ in range(revised):
+            self._retract()
+
+        new_rows = returns.iloc[matched:]
+        for timestamp, row in zip(new_rows.index, new_rows.to_numpy(dtype=float)):
+            self.push(timestamp, row)
+
+        logger.info(
+            f"Rolling correlation: -{dropped}/~{revised}/+{len(new_rows) - revised} rows "
+            f"({returns.shape[1]} tickers, window {len(self._rows)})"
+        )
+        return self.correlation()
+
+    def _matching_prefix(self, returns: pd.DataFrame) -> int:
+        """
+        Number of leading frame rows already buffered unchanged (0 means the
+        state cannot be extended and must be rebuilt).
+        """
+        if not self._rows or returns.columns.tolist() != self.tickers:
+            return 0
+        kept = [(ts, row) for ts, row in self._rows if ts >= returns.index[0]]
+        if not kept or len(kept) > len(returns):
+            return 0
+        if not returns.index[:len(kept)].equals(pd.Index([ts for ts, _ in kept])):
+            return 0
+        # Rows whose values changed (revised bars, re-adjusted prices) are replaced
+        overlap = returns.iloc[:len(kept)].to_numpy(dtype=float)
+        same = np.isclose(overlap, np.vstack([row for _, row in kept]), rtol=1e-9, atol=1e-12).all(axis=1)
+        return len(kept) if same.all() else int(np.argmin(same))
+
+    # ── Output ──────────────────────────────────────────────────────
+
+    def correlation(self) -> pd.DataFrame:
+        """Current correlation matrix as a DataFrame indexed by ticker."""
+        if self._w <= 0:
+            values = np.full((len(self.tickers),) * 2, np.nan)
+        else:
+            centered = self._p - np.outer(self._s, self._s) / self._w
+            std = np.sqrt(np.clip(np.diag(centered), 0.0, None))
+            with np.errstate(divide="ignore", invalid="ignore"):
+                values = centered / np.outer(std, std)
+            values = np.clip(values, -1.0, 1.0)
+            np.fill_diagonal(values, np.where(std > 0, 1.0, np.nan))
+        return pd.DataFrame(values, index=self.tickers, columns=self.tickers)
+
+
+# ── Engine Registry ─────────────────────────────────────────────────
+
+_engines: OrderedDict[str, RollingCorrelation] = OrderedDict()
+_engines_lock = threading.Lock()
+
+
+def rolling_correlation(key: str, returns: pd.DataFrame, halflife: Optional[float] = None) -> pd.DataFrame:
+    """
+    Correlation matrix of a returns frame, updated incrementally from the
+    engine kept for key (one per universe and window).
+
+    Args:
+        key: Engine identity, e.g. the (index, date range) cache key
+        returns: Cleaned log returns for the current window
+        halflife: Exponential-weighting halflife in rows (None = equal weights)
+
+    Returns:
+        Correlation matrix as DataFrame
+    """
+    with _engines_lock:
+        engine = _engines.get(key)
+        if engine is None or engine.halflife != halflife:
+            engine = RollingCorrelation(halflife=halflife)
+            _engines[key] = engine
+        _engines.move_to_end(key)
+        while len(_engines) > ROLLING_MAX_ENGINES:
+            _engines.popitem(last=False)
+
+    with engine.lock:
+        return engine.sync(returns)
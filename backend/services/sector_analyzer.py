@@ -1,6 +1,8 @@
 """
 Sector Analyzer Module
-Computes sector-level correlations from individual stock returns.
+Computes sector-level correlations from the stock correlation matrix.
+Aggregation is a single indicator-matrix product (Mᵀ·C·M) rather than a
+loop over ticker pairs.
 """
 
 import numpy as np
@@ -10,64 +12,76 @@ import logging
 logger = logging.getLogger(__name__)
 
 
-def compute_sector_heatmap(returns: pd.DataFrame, sector_map: dict) -> dict:
+def compute_sector_heatmap(corr_matrix: pd.DataFrame, sector_map: dict) -> dict:
     """
     Compute average pairwise correlation between sectors.
 
+    With M the (tickers × sectors) indicator matrix, Mᵀ·C·M holds the sum
+    of correlations for every sector pair and Mᵀ·V·M (V = non-NaN mask) the
+    number of pairs, so all averages come from two matrix products.
+
     Args:
-        returns: DataFrame of cleaned log returns (columns = tickers)
+        corr_matrix: Stock correlation matrix (index = columns = tickers)
         sector_map: dict mapping ticker -> sector name
 
     Returns:
-        dict with keys: sectors (list), matrix (2D list), sector_stocks (dict)
+        dict with keys: sectors (list), matrix (2D list), sector_stocks (dict),
+        sector_stats (list of {sector, size, intra_correlation, inter_correlation})
     """
-    # Map each column to its sector
-    ticker_sectors = {}
-    for col in returns.columns:
-        sector = sector_map.get(col, "Other")
-        ticker_sectors[col] = sector
-
-    # Group columns by sector
-    sector_groups = {}
-    for ticker, sector in ticker_sectors.items():
-        sector_groups.setdefault(sector, []).append(ticker)
-
-    sectors = sorted(sector_groups.keys())
+    tickers = corr_matrix.columns.tolist()
+    ticker_sectors = [sector_map.get(t, "Other") for t in tickers]
+
+    sectors = sorted(set(ticker_sectors))
     n = len(sectors)
+    sector_groups = {s: [t for t, ts in zip(tickers, ticker_sectors) if ts == s] for s in sectors}
 
     if n < 2:
-        return {"sectors": sectors, "matrix": [[1.0]], "sector_stocks": sector_groups}
-
-    # Compute full correlation matrix
-    corr = returns.corr()
-
-    # Compute average cross-sector correlations
-    matrix = np.zeros((n, n))
-    for i, s1 in enumerate(sectors):
-        for j, s2 in enumerate(sectors):
-            tickers_1 = sector_groups[s1]
-            tickers_2 = sector_groups[s2]
-
-            if i == j:
-                # Intra-sector correlation
-                if len(tickers_1) > 1:
-                    pairs = []
-                    for a in range(len(tickers_1)):
-                        for b in range(a + 1, len(tickers_1)):
-                            t1, t2 = tickers_1[a], tickers_1[b]
-                            if t1 in corr.index and t2 in corr.index:
-                                pairs.append(corr.loc[t1, t2])
-                    matrix[i][j] = float(np.mean(pairs)) if pairs else 1.0
-                else:
-                    matrix[i][j] = 1.0
-            else:
-                # Inter-sector correlation
-                pairs = []
-                for t1 in tickers_1:
-                    for t2 in tickers_2:
-                        if t1 in corr.index and t2 in corr.index:
-                            pairs.append(corr.loc[t1, t2])
-                matrix[i][j] = float(np.mean(pairs)) if pairs else 0.0
+        return {
+            "sectors": sectors,
+            "matrix": [[1.0]],
+            "sector_stocks": {s: [_clean(t) for t in ts] for s, ts in sector_groups.items()},
+            "sector_stats": [],
+        }
+
+    # Indicator matrix: one column per sector
+    position = {s: i for i, s in enumerate(sectors)}
+    membership = np.zeros((len(tickers), n))
+    membership[np.arange(len(tickers)), [position[s] for s in ticker_sectors]] = 1.0
+
+    values = corr_matrix.to_numpy(dtype=float)
+    valid = ~np.isnan(values)
+    values = np.where(valid, values, 0.0)
+
+    sums = membership.T @ values @ membership
+    counts = membership.T @ valid.astype(float) @ membership
+
+    # Remove self-correlations from the diagonal blocks
+    sums[np.diag_indices(n)] -= membership.T @ np.diag(values)
+    counts[np.diag_indices(n)] -= membership.T @ np.diag(valid).astype(float)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        matrix = sums / counts
+
+    # Sectors without pairs: 1.0 on the diagonal (single stock), 0.0 across
+    empty = counts <= 0
+    matrix[empty] = 0.0
+    matrix[np.diag_indices(n)] = np.where(np.diag(empty), 1.0, np.diag(matrix))
+
+    # Average correlation of each sector with all stocks outside it
+    off_sums = sums.sum(axis=1) - np.diag(sums)
+    off_counts = counts.sum(axis=1) - np.diag(counts)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        inter = np.where(off_counts > 0, off_sums / off_counts, 0.0)
+
+    sector_stats = [
+        {
+            "sector": s,
+            "size": len(sector_groups[s]),
+            "intra_correlation": round(float(matrix[i, i]), 3),
+            "inter_correlation": round(float(inter[i]), 3),
+        }
+        for i, s in enumerate(sectors)
+    ]
 
     logger.info(f"Computed sector heatmap: {n} sectors")
 
@@ -75,6 +89,7 @@ def compute_sector_heatmap(returns: pd.DataFrame, sector_map: dict) -> dict:
         "sectors": sectors,
         "matrix": matrix.round(3).tolist(),
         "sector_stocks": {s: [_clean(t) for t in ts] for s, ts in sector_groups.items()},
+        "sector_stats": sector_stats,
     }
 
 
@@ -0,0 +1,188 @@
+"""
+Serialization Module
+Wire formats for analysis results, chosen by HTTP content negotiation:
+JSON (default), MessagePack and a columnar Arrow IPC stream. The binary
+formats use a columnar layout (node arrays, edges as integer index pairs
+with float32 weights) built from the same GraphResponse as the JSON body.
+"""
+
+import json
+import struct
+import logging
+import importlib.util
+from typing import Optional
+
+import msgpack
+import numpy as np
+
+from models import GraphResponse
+
+logger = logging.getLogger(__name__)
+
+MEDIA_JSON = "application/json"
+MEDIA_MSGPACK = "application/msgpack"
+MEDIA_ARROW = "application/vnd.apache.arrow.stream"
+MEDIA_MSGPACK_FRAMES = "application/vnd.mris.msgpack-frames"
+
+_ALIASES = {
+    "application/x-msgpack": MEDIA_MSGPACK,
+    "application/vnd.msgpack": MEDIA_MSGPACK,
+    "application/vnd.apache.arrow.file": MEDIA_ARROW,
+}
+
+# pyarrow is optional and only imported when an Arrow body is first encoded
+if importlib.util.find_spec("pyarrow") is not None:
+    SUPPORTED_MEDIA_TYPES = (MEDIA_JSON, MEDIA_MSGPACK, MEDIA_ARROW)
+else:  # pragma: no cover - optional dependency
+    SUPPORTED_MEDIA_TYPES = (MEDIA_JSON, MEDIA_MSGPACK)
+
+
+def negotiate(accept: Optional[str], supported: tuple = SUPPORTED_MEDIA_TYPES) -> str:
+    """
+    Pick the response media type from an Accept header.
+
+    Media ranges are ranked by q-value, then by order of appearance; */*,
+    application/* and a missing header select JSON.
+
+    Args:
+        accept: Raw Accept header value
+        supported: Media types the endpoint can produce, preferred first
+
+    Returns:
+        One of supported (JSON when nothing better matches)
+    """
+    if not accept:
+        return supported[0]
+
+    ranked = []
+    for position, part in enumerate(accept.split(",")):
+        fields = [f.strip() for f in part.split(";")]
+        media = _ALIASES.get(fields[0].lower(), fields[0].lower())
+        q = 1.0
+        for param in fields[1:]:
+            if param.startswith("q="):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        if q > 0:
+            ranked.append((-q, position, media))
+
+    for _, _, media in sorted(ranked):
+        if media in supported:
+            return media
+        if media in ("*/*", "application/*"):
+            return supported[0]
+    return supported[0]
+
+
+# ── Columnar Layout ─────────────────────────────────────────────────
+
+def to_columnar(response: GraphResponse) -> dict:
+    """
+    Columnar form of a GraphResponse.
+
+    nodes holds one array per field (symbol is omitted: it equals id);
+    edges hold source/target as indices into nodes.id. Everything else
+    (stats, clusters, insights, request echo) is carried unchanged.
+    """
+    nodes = response.nodes
+    position = {node.id: i for i, node in enumerate(nodes)}
+    meta = response.model_dump(mode="json", exclude={"nodes", "edges"})
+
+    return {
+        **meta,
+        "format": "columnar",
+        "nodes": {
+            "id": [n.id for n in nodes],
+            "influence_score": [n.influence_score for n in nodes],
+            "cluster_id": [n.cluster_id for n in nodes],
+            "degree": [n.centrality.degree for n in nodes],
+            "betweenness": [n.centrality.betweenness for n in nodes],
+            "closeness": [n.centrality.closeness for n in nodes],
+            "connections": [n.connections for n in nodes],
+        },
+        "edges": {
+            "source": [position[e.source] for e in response.edges],
+            "target": [position[e.target] for e in response.edges],
+            "weight": [e.weight for e in response.edges],
+        },
+    }
+
+
+def _to_arrow(columnar: dict) -> bytes:
+    """
+    Arrow IPC stream with one single-row record batch: each node/edge array
+    is a list column (node_*, edge_*), and the remaining fields are JSON in
+    the schema metadata under b"mris".
+    """
+    import pyarrow as pa
+
+    nodes, edges = columnar["nodes"], columnar["edges"]
+    meta = {k: v for k, v in columnar.items() if k not in ("nodes", "edges")}
+    columns = {
+        "node_id": pa.array([nodes["id"]], pa.list_(pa.string())),
+        "node_influence_score": pa.array([nodes["influence_score"]], pa.list_(pa.float32())),
+        "node_cluster_id": pa.array([nodes["cluster_id"]], pa.list_(pa.int32())),
+        "node_degree": pa.array([nodes["degree"]], pa.list_(pa.float32())),
+        "node_betweenness": pa.array([nodes["betweenness"]], pa.list_(pa.float32())),
+        "node_closeness": pa.array([nodes["closeness"]], pa.list_(pa.float32())),
+        "node_connections": pa.array([nodes["connections"]], pa.list_(pa.int32())),
+        "edge_source": pa.array([edges["source"]], pa.list_(pa.int32())),
+        "edge_target": pa.array([edges["target"]], pa.list_(pa.int32())),
+        "edge_weight": pa.array([edges["weight"]], pa.list_(pa.float32())),
+    }
+    table = pa.table(columns).replace_schema_metadata({b"mris": json.dumps(meta).encode()})
+
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def _to_msgpack(columnar: dict) -> bytes:
+    """
+    MessagePack map of the columnar layout; the edge arrays are packed as
+    little-endian binary (source/target int32, weight float32, see
+    edges.dtype) so clients can view them as typed arrays without parsing.
+    """
+    edges = columnar["edges"]
+    packed = {
+        **columnar,
+        "edges": {
+            "source": np.asarray(edges["source"], dtype="<i4").tobytes(),
+            "target": np.asarray(edges["target"], dtype="<i4").tobytes(),
+            "weight": np.asarray(edges["weight"], dtype="<f4").tobytes(),
+            "dtype": {"source": "int32", "target": "int32", "weight": "float32"},
+        },
+    }
+    return msgpack.packb(packed)
+
+
+def encode_response(response: GraphResponse, media_type: str) -> bytes:
+    """
+    Serialize a GraphResponse in the negotiated media type.
+
+    Args:
+        response: Pipeline output
+        media_type: One of SUPPORTED_MEDIA_TYPES
+
+    Returns:
+        Response body bytes
+    """
+    if media_type == MEDIA_MSGPACK:
+        return _to_msgpack(to_columnar(response))
+    if media_type == MEDIA_ARROW:
+        return _to_arrow(to_columnar(response))
+    return response.model_dump_json().encode()
+
+
+# ── Live Frames ─────────────────────────────────────────────────────
+
+def encode_frame(event: str, data: dict, event_id: Optional[int] = None) -> bytes:
+    """
+    One length-prefixed MessagePack frame for binary live streams: a 4-byte
+    big-endian length followed by a map {event, id, data}.
+    """
+    body = msgpack.packb({"event": event, "id": event_id, "data": data})
+    return struct.pack(">I", len(body)) + body
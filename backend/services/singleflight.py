@@ -0,0 +1,53 @@
+"""
+Single-Flight Module
+Coalesces identical concurrent calls so that only one computation runs per key.
+"""
+
+import asyncio
+import functools
+import logging
+from typing import Any, Callable
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """
+    Runs a blocking function at most once per key at a time.
+
+    The first caller for a key starts the function on the default executor;
+    concurrent callers with the same key await the same future and receive
+    the same result or exception. The key is released once the call
+    finishes, so later callers start a fresh computation (normally after
+    the result has been cached by the function itself).
+
+    Args:
+        name: Label used in log messages
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight: dict[str, asyncio.Future] = {}
+
+    async def run(self, key: str, func: Callable[..., Any], *args, **kwargs) -> Any:
+        future = self._inflight.get(key)
+
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(None, functools.partial(func, *args, **kwargs))
+            self._inflight[key] = future
+            future.add_done_callback(functools.partial(self._release, key))
+        else:
+            logger.info(f"Coalesced duplicate {self.name} request: {key}")
+
+        # Shield so a disconnecting caller doesn't cancel the shared computation
+        return await asyncio.shield(future)
+
+    def _release(self, key: str, future: asyncio.Future):
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+        if not future.cancelled():
+            future.exception()  # Mark retrieved even if every waiter went away
+
+    def __len__(self) -> int:
+        return len(self._inflight)
@@ -0,0 +1,135 @@
+"""
+Warm-Up Module
+Deferred loading of the API's heavy dependencies. The app binds its port and
+answers lightweight routes at once; the scientific stack and the pipeline
+routers are imported by a background task, and the time spent in each step
+is kept for the /health/startup report.
+
+Only the standard library is imported here.
+"""
+
+import sys
+import time
+import asyncio
+import logging
+import importlib
+from typing import Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Imported in this order, so each entry's time excludes what came before it
+HEAVY_MODULES = (
+    "numpy",
+    "pandas",
+    "scipy.sparse.csgraph",
+    "networkx",
+    "community",
+    "msgpack",
+)
+
+# Client libraries only a given price source needs (unknown names fall back to yfinance)
+SOURCE_MODULES = {
+    "yfinance": ("yfinance",),
+    "local": (),
+    "synthetic": (),
+}
+
+
+def heavy_modules(price_source: str) -> tuple[str, ...]:
+    """HEAVY_MODULES plus what the configured price source imports."""
+    return HEAVY_MODULES + SOURCE_MODULES.get(price_source, SOURCE_MODULES["yfinance"])
+
+
+class Warmup:
+    """
+    State and timings of the background warm-up.
+
+    Args:
+        started: perf_counter() value at the start of the app import
+    """
+
+    def __init__(self, started: float):
+        self.started = started
+        self.timings: dict[str, float] = {}
+        self.imports: dict[str, Optional[float]] = {}
+        self.ready = False
+        self.error: Optional[str] = None
+        self._event: Optional[asyncio.Event] = None
+
+    def reset(self):
+        """Prepare a fresh readiness event (call from the running event loop)."""
+        self.ready = False
+        self.error = None
+        self._event = asyncio.Event()
+
+    def mark(self, name: str):
+        """Record the time from process start to now under name."""
+        self.timings[name] = round(time.perf_counter() - self.started, 4)
+
+    def import_modules(self, names: Iterable[str]):
+        """
+        Import modules one by one, timing each. Modules that are already
+        loaded record 0; missing optional modules are recorded as None.
+        """
+        for name in names:
+            if name in sys.modules:
+                self.imports.setdefault(name, 0.0)
+                continue
+            start = time.perf_counter()
+            try:
+                importlib.import_module(name)
+            except ImportError:
+                self.imports[name] = None
+                continue
+            self.imports[name] = round(time.perf_counter() - start, 4)
+
+    def finish(self, error: Optional[str] = None):
+        """Mark the warm-up complete (successfully or not) and release waiting requests."""
+        self.error = error
+        self.ready = True
+        self.mark("ready")
+        if self._event is not None:
+            self._event.set()
+
+        slowest = sorted(
+            ((s, n) for n, s in self.imports.items() if s), reverse=True
+        )[:5]
+        logger.info(
+            f"Warm-up complete in {self.timings['ready']:.2f}s "
+            f"(serving since {self.timings.get('serving', 0):.2f}s); slowest imports: "
+            + ", ".join(f"{n} {s:.2f}s" for s, n in slowest)
+        )
+
+    async def wait(self):
+        if not self.ready and self._event is not None:
+            await self._event.wait()
+
+    def report(self) -> dict:
+        return {
+            "ready": self.ready,
+            "error": self.error,
+            "uptime_seconds": round(time.perf_counter() - self.started, 2),
+            "timings": self.timings,
+            "imports": self.imports,
+        }
+
+
+class WarmupGate:
+    """
+    ASGI middleware that holds requests until the warm-up has finished,
+    except for paths in open_paths, which never need the heavy modules.
+    """
+
+    def __init__(self, app, warmup: Warmup, open_paths: Iterable[str]):
+        self.app = app
+        self.warmup = warmup
+        self.open_paths = frozenset(open_paths)
+
+    async def __call__(self, scope, receive, send):
+        if (
+            not self.warmup.ready
+            and scope["type"] in ("http", "websocket")
+            and scope["path"] not in self.open_paths
+        ):
+            await self.warmup.wait()
+        await self.app(scope, receive, send)
@@ -0,0 +1,33 @@
+"""
+Shared test setup: keep every test offline and in-process, and provide
+seeded returns with real correlation structure.
+"""
+
+import os
+
+os.environ.setdefault("MRIS_PRICE_SOURCE", "synthetic")
+os.environ.setdefault("MRIS_PRICE_STORE", "0")
+os.environ.setdefault("MRIS_PIPELINE_WORKERS", "0")
+os.environ.setdefault("MRIS_CACHE_BACKEND", "memory")
+os.environ.setdefault("MRIS_CACHE_PREWARM", "0")
+
+import numpy as np
+import pandas as pd
+import pytest
+
+
+def make_returns(n_tickers: int = 40, n_days: int = 120, seed: int = 0) -> pd.DataFrame:
+    """Daily returns driven by a market factor and four group factors."""
+    rng = np.random.default_rng(seed)
+    market = rng.normal(0, 0.01, n_days)
+    groups = rng.normal(0, 0.01, (4, n_days))
+    values = np.column_stack([
+        market + groups[i % 4] + rng.normal(0, 0.008, n_days) for i in range(n_tickers)
+    ])
+    index = pd.bdate_range("2024-01-01", periods=n_days)
+    return pd.DataFrame(values, index=index, columns=[f"T{i:03d}" for i in range(n_tickers)])
+
+
+@pytest.fixture
+def returns() -> pd.DataFrame:
+    return make_returns()
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.correlation_engine import apply_threshold, threshold_correlation_blocked
+from services.preprocessor import standardize_returns
+from tests.conftest import make_returns
+
+
+def _dense_edges(corr: pd.DataFrame, threshold: float) -> dict:
+    """{(i, j): correlation} for i < j with |correlation| >= threshold."""
+    values = corr.to_numpy()
+    rows, cols = np.nonzero(np.triu(np.abs(values) >= threshold, k=1))
+    return {(int(i), int(j)): values[i, j] for i, j in zip(rows, cols)}
+
+
+def _sparse_edges(adj) -> dict:
+    coo = adj.matrix.tocoo()
+    return {(int(i), int(j)): w for i, j, w in zip(coo.row, coo.col, coo.data)}
+
+
+@pytest.mark.parametrize("threshold", [0.3, 0.5, 0.7])
+@pytest.mark.parametrize("block_size", [7, 64])
+def test_apply_threshold_matches_dense(returns, threshold, block_size):
+    corr = returns.corr()
+    adj = apply_threshold(corr, threshold, block_size=block_size)
+    expected = _dense_edges(corr, threshold)
+
+    assert adj.tickers == corr.columns.tolist()
+    actual = _sparse_edges(adj)
+    assert actual.keys() == expected.keys()
+    assert np.allclose([actual[k] for k in expected], list(expected.values()))
+
+
+def test_apply_threshold_drops_nan_correlations(returns):
+    corr = returns.corr()
+    corr.iloc[0, 1] = corr.iloc[1, 0] = np.nan
+    assert (0, 1) not in _sparse_edges(apply_threshold(corr, 0.0))
+
+
+@pytest.mark.parametrize("threshold", [0.4, 0.6])
+@pytest.mark.parametrize("block_size", [5, 16, 1000])
+def test_blocked_threshold_matches_dense(threshold, block_size):
+    data = make_returns(n_tickers=53, n_days=90, seed=3)
+    tickers = data.columns.tolist()
+    adj = threshold_correlation_blocked(standardize_returns(data), tickers, threshold, block_size=block_size)
+    expected = _dense_edges(data.corr(), threshold)
+
+    assert adj.tickers == tickers
+    actual = _sparse_edges(adj)
+    assert actual.keys() == expected.keys()
+    assert np.allclose([actual[k] for k in expected], list(expected.values()), atol=1e-9)
@@ -0,0 +1,78 @@
+import networkx as nx
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+from services.correlation_engine import apply_threshold
+from services.graph_builder import build_array_graph, build_graph, _sparse_closeness
+
+
+def _reference_graph(corr: pd.DataFrame, threshold: float) -> nx.Graph:
+    """Graph built edge by edge from the dense matrix."""
+    G = nx.Graph()
+    G.add_nodes_from(corr.columns)
+    tickers = corr.columns.tolist()
+    for i in range(len(tickers)):
+        for j in range(i + 1, len(tickers)):
+            if abs(corr.iat[i, j]) >= threshold:
+                G.add_edge(tickers[i], tickers[j], weight=abs(corr.iat[i, j]))
+    return G
+
+
+def _edges(G: nx.Graph) -> dict:
+    return {frozenset((u, v)): w for u, v, w in G.edges(data="weight")}
+
+
+def test_build_graph_matches_reference(returns):
+    corr = returns.corr()
+    G = build_graph(apply_threshold(corr, 0.5))
+    expected = _reference_graph(corr, 0.5)
+
+    assert set(G.nodes) == set(expected.nodes)
+    actual, wanted = _edges(G), _edges(expected)
+    assert 0 < len(wanted) < len(corr) * (len(corr) - 1) / 2
+    assert actual.keys() == wanted.keys()
+    assert np.allclose([actual[k] for k in wanted], list(wanted.values()))
+
+
+def test_array_graph_accepts_every_adjacency_form(returns):
+    corr = returns.corr()
+    tickers = corr.columns.tolist()
+    values = np.where(corr.abs() >= 0.5, corr, 0.0)
+    np.fill_diagonal(values, 0.0)
+    dense = pd.DataFrame(values, index=tickers, columns=tickers)
+
+    graphs = [
+        build_array_graph(apply_threshold(corr, 0.5)),
+        build_array_graph(dense),
+        build_array_graph(dense.to_numpy(), tickers),
+        build_array_graph(sp.csr_matrix(dense.to_numpy()), tickers),
+    ]
+    reference = graphs[1]
+    for graph in graphs:
+        assert graph.nodes == tickers
+        assert graph.number_of_edges() == reference.number_of_edges()
+        assert np.array_equal(graph.degrees(), reference.degrees())
+        assert (graph.to_csr() != reference.to_csr()).nnz == 0
+
+
+def test_sparse_closeness_matches_networkx():
+    # Several components, isolated nodes and chains of different lengths
+    G = nx.disjoint_union_all([
+        nx.gnp_random_graph(60, 0.05, seed=1),
+        nx.path_graph(7),
+        nx.star_graph(5),
+        nx.empty_graph(3),
+    ])
+    expected = nx.closeness_centrality(G)
+    for chunk_size in (1, 16, 256):
+        actual = _sparse_closeness(G, chunk_size=chunk_size)
+        assert actual.keys() == expected.keys()
+        assert np.allclose([actual[n] for n in expected], list(expected.values()))
+
+
+def test_sparse_closeness_tiny_graphs():
+    assert _sparse_closeness(nx.Graph()) == {}
+    single = nx.Graph()
+    single.add_node("A")
+    assert _sparse_closeness(single) == {"A": 0.0}
@@ -0,0 +1,73 @@
+from datetime import date
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from services.price_store import PriceStore
+
+
+class FakeSource:
+    """Downloader with deterministic closes per (ticker, day); records every call."""
+
+    def __init__(self, missing=()):
+        self.calls = []
+        self.missing = set(missing)
+        self.scale = 1.0
+
+    def __call__(self, tickers, start, end):
+        self.calls.append((list(tickers), start, end))
+        index = pd.bdate_range(start, end, inclusive="left")
+        return pd.DataFrame(
+            {t: self.scale * (100.0 + index.dayofyear.to_numpy() + ord(t[0])) for t in tickers if t not in self.missing},
+            index=index,
+        )
+
+
+@pytest.fixture
+def store(tmp_path):
+    return PriceStore(str(tmp_path))
+
+
+def test_repeat_request_served_from_disk(store):
+    source = FakeSource()
+    first = store.get_prices(["A", "B"], date(2024, 1, 1), date(2024, 3, 1), source)
+    second = store.get_prices(["A", "B"], date(2024, 1, 1), date(2024, 3, 1), source)
+
+    assert len(source.calls) == 1
+    pd.testing.assert_frame_equal(first, second, check_freq=False)
+
+
+def test_partial_top_up_downloads_only_missing_tickers_and_days(store):
+    source = FakeSource()
+    store.get_prices(["A"], date(2024, 1, 1), date(2024, 3, 1), source)
+    prices = store.get_prices(["A", "B"], date(2024, 1, 1), date(2024, 4, 1), source)
+
+    assert sorted(source.calls[1:]) == [
+        (["A"], date(2024, 2, 29), date(2024, 4, 1)),  # tail, overlapping the last stored bar
+        (["B"], date(2024, 1, 1), date(2024, 4, 1)),
+    ]
+    expected = pd.bdate_range("2024-01-01", "2024-04-01", inclusive="left")
+    assert list(prices.columns) == ["A", "B"]
+    assert prices.index.equals(expected)
+    assert not prices.isna().any().any()
+
+
+def test_missing_ticker_is_not_refetched(store):
+    source = FakeSource(missing={"X"})
+    store.get_prices(["A", "X"], date(2024, 1, 1), date(2024, 3, 1), source)
+    prices = store.get_prices(["A", "X"], date(2024, 1, 1), date(2024, 3, 1), source)
+
+    assert len(source.calls) == 1
+    assert list(prices.columns) == ["A"]
+
+
+def test_readjusted_history_is_replaced(store):
+    source = FakeSource()
+    store.get_prices(["A"], date(2024, 1, 1), date(2024, 3, 1), source)
+    source.scale = 0.5  # e.g. a 2:1 split re-adjusts the whole history
+    prices = store.get_prices(["A"], date(2024, 1, 1), date(2024, 4, 1), source)
+
+    assert source.calls[-1] == (["A"], date(2024, 1, 1), date(2024, 4, 1))
+    assert prices["A"].iloc[0] == pytest.approx(0.5 * (100.0 + 1 + ord("A")))
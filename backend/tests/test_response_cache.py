@@ -0,0 +1,87 @@
+import gzip
+
+import pytest
+from starlette.requests import Request
+
+from config import COMPRESS_MIN_BYTES
+from services import response_cache
+from services.response_cache import EncodedBody, cached_response, select_coding
+from services.serialization import MEDIA_JSON
+
+BODY = b'{"nodes": [' + b'{"id": "AAA"}, ' * (COMPRESS_MIN_BYTES // 8) + b'{}]}'
+
+
+def _request(**headers) -> Request:
+    raw = [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()]
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": raw})
+
+
+@pytest.fixture
+def body() -> EncodedBody:
+    return EncodedBody.build(BODY, MEDIA_JSON)
+
+
+def test_identity_without_accept_encoding(body):
+    response = cached_response(body, _request(), "HIT")
+    assert response.status_code == 200
+    assert response.body == BODY
+    assert "content-encoding" not in response.headers
+    assert response.headers["etag"] == body.etag
+    assert response.headers["x-cache"] == "HIT"
+
+
+def test_gzip_variant(body):
+    response = cached_response(body, _request(accept_encoding="gzip"), "MISS")
+    assert response.headers["content-encoding"] == "gzip"
+    assert gzip.decompress(response.body) == BODY
+    assert response.headers["etag"] == body.tag("gzip") != body.etag
+
+
+@pytest.mark.skipif(response_cache.brotli is None, reason="brotli not installed")
+def test_brotli_preferred(body):
+    response = cached_response(body, _request(accept_encoding="gzip, br"), "HIT")
+    assert response.headers["content-encoding"] == "br"
+    assert response_cache.brotli.decompress(response.body) == BODY
+    assert response.headers["etag"] == body.tag("br")
+
+
+def test_q_values_and_refusals(body):
+    assert select_coding("gzip;q=0", body.compressed) is None
+    assert select_coding("identity", body.compressed) is None
+    assert select_coding("br;q=0.1, gzip;q=0.9", body.compressed) == "gzip"
+    assert select_coding("*", body.compressed) == response_cache._CODINGS[0]
+
+
+def test_small_bodies_are_not_compressed():
+    small = EncodedBody.build(b'{"ok": true}', MEDIA_JSON)
+    response = cached_response(small, _request(accept_encoding="gzip"), "HIT")
+    assert "content-encoding" not in response.headers
+    assert response.body == b'{"ok": true}'
+
+
+@pytest.mark.parametrize("coding", [None, "gzip"])
+def test_not_modified_carries_the_variant_etag(body, coding):
+    first = cached_response(body, _request(accept_encoding=coding or "identity"), "HIT")
+    etag = first.headers["etag"]
+
+    again = cached_response(body, _request(accept_encoding=coding or "identity", if_none_match=etag), "HIT")
+    assert again.status_code == 304
+    assert again.body == b""
+    assert again.headers["etag"] == etag
+
+
+def test_not_modified_across_variants(body):
+    # A tag from the gzip variant still validates an identity request, and the
+    # 304 names the variant this request would have received
+    gzip_tag = body.tag("gzip")
+    response = cached_response(body, _request(if_none_match=f'W/{gzip_tag}'), "HIT")
+    assert response.status_code == 304
+    assert response.headers["etag"] == body.etag
+
+
+def test_stale_etag_gets_full_body(body):
+    other = EncodedBody.build(BODY + b" ", MEDIA_JSON)
+    response = cached_response(body, _request(if_none_match=other.etag), "STALE")
+    assert response.status_code == 200
+    assert response.body == BODY
+    assert response.headers["vary"] == "Accept, Accept-Encoding"
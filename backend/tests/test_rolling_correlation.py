@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+
+from services.rolling_correlation import RollingCorrelation
+from tests.conftest import make_returns
+
+
+def _assert_matches_pandas(actual: pd.DataFrame, frame: pd.DataFrame):
+    expected = frame.corr()
+    assert actual.index.tolist() == expected.index.tolist()
+    assert np.allclose(actual.to_numpy(), expected.to_numpy(), atol=1e-9)
+
+
+def test_slide_forward_matches_full_recompute():
+    data = make_returns(n_tickers=12, n_days=200)
+    engine = RollingCorrelation(resync_every=10_000)
+    engine.sync(data.iloc[:120])
+
+    for end in range(121, 200, 7):
+        window = data.iloc[end - 120:end]
+        _assert_matches_pandas(engine.sync(window), window)
+    assert len(engine) == 120
+
+
+def test_revised_trailing_rows_are_replaced():
+    data = make_returns(n_tickers=10, n_days=100)
+    engine = RollingCorrelation(resync_every=10_000)
+    engine.sync(data.iloc[:80])
+
+    revised = data.iloc[:81].copy()
+    revised.iloc[-3:] *= 1.5  # the last two stored bars moved, plus one new bar
+    _assert_matches_pandas(engine.sync(revised), revised)
+
+
+def test_changed_tickers_rebuild():
+    data = make_returns(n_tickers=10, n_days=60)
+    engine = RollingCorrelation()
+    engine.sync(data)
+
+    fewer = data.drop(columns=["T003"])
+    result = engine.sync(fewer)
+    assert "T003" not in result.columns
+    _assert_matches_pandas(result, fewer)
+
+
+def test_push_keeps_a_bounded_window():
+    data = make_returns(n_tickers=8, n_days=90)
+    engine = RollingCorrelation(window=30, resync_every=10_000)
+    engine.reset(data.iloc[:30])
+    for timestamp, row in data.iloc[30:].iterrows():
+        engine.push(timestamp, row.to_numpy())
+
+    assert len(engine) == 30
+    _assert_matches_pandas(engine.correlation(), data.iloc[-30:])
+
+
+def test_halflife_weights_recent_rows_more():
+    data = make_returns(n_tickers=6, n_days=80)
+    engine = RollingCorrelation(halflife=20)
+    result = engine.sync(data)
+
+    weights = 0.5 ** (np.arange(len(data))[::-1] / 20)
+    values = data.to_numpy()
+    mean = weights @ values / weights.sum()
+    centered = values - mean
+    cov = (centered * weights[:, None]).T @ centered
+    std = np.sqrt(np.diag(cov))
+    assert np.allclose(result.to_numpy(), cov / np.outer(std, std), atol=1e-9)
@@ -0,0 +1,33 @@
+import numpy as np
+
+from services.sector_analyzer import compute_sector_heatmap
+
+
+def _reference(corr, sector_map):
+    """Average pairwise correlation per sector pair, by explicit loops."""
+    sectors = sorted(set(sector_map.values()))
+    members = {s: [t for t in corr.columns if sector_map[t] == s] for s in sectors}
+    matrix = np.zeros((len(sectors), len(sectors)))
+    for i, a in enumerate(sectors):
+        for j, b in enumerate(sectors):
+            pairs = [corr.at[x, y] for x in members[a] for y in members[b] if x != y]
+            pairs = [p for p in pairs if not np.isnan(p)]
+            matrix[i, j] = np.mean(pairs) if pairs else (1.0 if i == j else 0.0)
+    return sectors, matrix
+
+
+def test_heatmap_matches_pairwise_loops(returns):
+    corr = returns.corr()
+    corr.iloc[2, 5] = corr.iloc[5, 2] = np.nan  # missing pairs are skipped
+    tickers = corr.columns.tolist()
+    sector_map = {t: f"S{i % 5}" for i, t in enumerate(tickers)}
+    sector_map[tickers[-1]] = "Solo"  # a single-stock sector
+
+    result = compute_sector_heatmap(corr, sector_map)
+    sectors, expected = _reference(corr, sector_map)
+
+    assert result["sectors"] == sectors
+    assert np.allclose(result["matrix"], expected.round(3), atol=1e-3)
+    solo = sectors.index("Solo")
+    assert result["matrix"][solo][solo] == 1.0
+    assert {s["sector"]: s["size"] for s in result["sector_stats"]}["Solo"] == 1
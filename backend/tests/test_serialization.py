@@ -0,0 +1,97 @@
+import json
+
+import msgpack
+import numpy as np
+import pytest
+
+from models import (
+    CentralityMetrics, ClusterInfo, EdgeData, GraphResponse, NetworkStats, NodeData,
+)
+from services.serialization import (
+    MEDIA_ARROW, MEDIA_JSON, MEDIA_MSGPACK, SUPPORTED_MEDIA_TYPES,
+    encode_response, negotiate, to_columnar,
+)
+
+
+def _response() -> GraphResponse:
+    ids = ["AAA", "BBB", "CCC"]
+    nodes = [
+        NodeData(
+            id=t, symbol=t, influence_score=0.5 + i / 10, cluster_id=i % 2,
+            centrality=CentralityMetrics(degree=0.5, betweenness=0.1 * i, closeness=0.25),
+            connections=2 - i % 2,
+        )
+        for i, t in enumerate(ids)
+    ]
+    edges = [EdgeData(source="AAA", target="BBB", weight=0.81), EdgeData(source="CCC", target="AAA", weight=-0.65)]
+    return GraphResponse(
+        nodes=nodes,
+        edges=edges,
+        clusters=[ClusterInfo(cluster_id=0, size=2, members=["AAA", "CCC"]), ClusterInfo(cluster_id=1, size=1, members=["BBB"])],
+        stats=NetworkStats(total_nodes=3, total_edges=2, density=2 / 3, avg_degree=4 / 3, modularity=0.1, num_clusters=2),
+        index="TEST",
+        period="3mo",
+        threshold=0.6,
+        timestamp="2024-06-28T00:00:00",
+    )
+
+
+@pytest.mark.parametrize("accept, expected", [
+    (None, MEDIA_JSON),
+    ("", MEDIA_JSON),
+    ("*/*", MEDIA_JSON),
+    ("text/html", MEDIA_JSON),
+    ("application/msgpack", MEDIA_MSGPACK),
+    ("application/x-msgpack", MEDIA_MSGPACK),
+    ("application/json;q=0.5, application/msgpack", MEDIA_MSGPACK),
+    ("application/msgpack;q=0.2, application/json", MEDIA_JSON),
+    ("application/msgpack;q=0, */*", MEDIA_JSON),
+    ("text/html, application/msgpack;q=0.9", MEDIA_MSGPACK),
+])
+def test_negotiate(accept, expected):
+    assert negotiate(accept) == expected
+
+
+def test_negotiate_respects_supported():
+    assert negotiate("application/msgpack", supported=(MEDIA_JSON,)) == MEDIA_JSON
+
+
+def test_columnar_edges_index_nodes():
+    columnar = to_columnar(_response())
+    ids = columnar["nodes"]["id"]
+    pairs = [(ids[s], ids[t]) for s, t in zip(columnar["edges"]["source"], columnar["edges"]["target"])]
+    assert pairs == [("AAA", "BBB"), ("CCC", "AAA")]
+    assert columnar["stats"]["total_edges"] == 2
+
+
+def test_json_round_trip():
+    response = _response()
+    assert GraphResponse.model_validate(json.loads(encode_response(response, MEDIA_JSON))) == response
+
+
+def test_msgpack_round_trip():
+    response = _response()
+    packed = msgpack.unpackb(encode_response(response, MEDIA_MSGPACK))
+    expected = to_columnar(response)
+
+    assert packed["nodes"] == expected["nodes"]
+    assert packed["clusters"] == expected["clusters"]
+    edges = packed["edges"]
+    assert np.frombuffer(edges["source"], "<i4").tolist() == expected["edges"]["source"]
+    assert np.frombuffer(edges["target"], "<i4").tolist() == expected["edges"]["target"]
+    assert np.allclose(np.frombuffer(edges["weight"], "<f4"), expected["edges"]["weight"])
+
+
+@pytest.mark.skipif(MEDIA_ARROW not in SUPPORTED_MEDIA_TYPES, reason="pyarrow not installed")
+def test_arrow_round_trip():
+    import pyarrow as pa
+
+    response = _response()
+    table = pa.ipc.open_stream(encode_response(response, MEDIA_ARROW)).read_all()
+    expected = to_columnar(response)
+
+    assert table.column("node_id")[0].as_py() == expected["nodes"]["id"]
+    assert table.column("edge_source")[0].as_py() == expected["edges"]["source"]
+    assert np.allclose(table.column("edge_weight")[0].as_py(), expected["edges"]["weight"])
+    meta = json.loads(table.schema.metadata[b"mris"])
+    assert meta["index"] == "TEST" and meta["stats"] == expected["stats"]
@@ -0,0 +1,85 @@
+import asyncio
+import threading
+
+import pytest
+
+from services.singleflight import SingleFlight
+
+
+def test_concurrent_callers_share_one_call():
+    flight = SingleFlight("test")
+    calls = []
+    release = threading.Event()
+
+    def compute(value):
+        calls.append(value)
+        release.wait(5)
+        return value * 2
+
+    async def main():
+        waiters = [asyncio.create_task(flight.run("k", compute, 21)) for _ in range(10)]
+        await asyncio.sleep(0.05)
+        assert len(flight) == 1
+        release.set()
+        return await asyncio.gather(*waiters)
+
+    assert asyncio.run(main()) == [42] * 10
+    assert calls == [21]
+    assert len(flight) == 0
+
+
+def test_distinct_keys_run_separately_and_later_calls_recompute():
+    flight = SingleFlight("test")
+    calls = []
+
+    def compute(key):
+        calls.append(key)
+        return key
+
+    async def main():
+        first = await asyncio.gather(flight.run("a", compute, "a"), flight.run("b", compute, "b"))
+        second = await flight.run("a", compute, "a")
+        return first, second
+
+    assert asyncio.run(main()) == (["a", "b"], "a")
+    assert sorted(calls) == ["a", "a", "b"]
+
+
+def test_exception_reaches_every_waiter():
+    flight = SingleFlight("test")
+    release = threading.Event()
+
+    def fail():
+        release.wait(5)
+        raise ValueError("boom")
+
+    async def main():
+        waiters = [asyncio.create_task(flight.run("k", fail)) for _ in range(3)]
+        await asyncio.sleep(0.05)
+        release.set()
+        return await asyncio.gather(*waiters, return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert all(isinstance(r, ValueError) for r in results)
+    assert len(flight) == 0
+
+
+def test_cancelled_waiter_does_not_cancel_shared_call():
+    flight = SingleFlight("test")
+    release = threading.Event()
+
+    def compute():
+        release.wait(5)
+        return "done"
+
+    async def main():
+        leaver = asyncio.create_task(flight.run("k", compute))
+        stayer = asyncio.create_task(flight.run("k", compute))
+        await asyncio.sleep(0.05)
+        leaver.cancel()
+        release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await leaver
+        return await stayer
+
+    assert asyncio.run(main()) == "done"